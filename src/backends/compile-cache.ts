@@ -0,0 +1,141 @@
+/**
+ * Persistent Compile Cache
+ *
+ * Stores backend build artifacts on disk, keyed by a hash of the source the
+ * backend generated, so a new process skips external toolchain work (WAT
+ * assembly, llc) for programs it has already compiled.
+ */
+
+import { createHash } from 'crypto';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+
+/**
+ * Bumped when the layout of cached artifacts changes, so stale entries are
+ * never read back
+ */
+const CACHE_FORMAT = 1;
+
+/**
+ * Default cache location: ~/.ioc/compile-cache
+ */
+export function defaultCompileCacheDir(): string {
+  return path.join(os.homedir(), '.ioc', 'compile-cache');
+}
+
+/**
+ * Bytes held by each cache directory: its size when this process last
+ * scanned it, plus what the process has written since. Writes only rescan a
+ * directory (to evict) once this passes the limit, rather than on every set.
+ */
+const trackedBytes = new Map<string, number>();
+
+export class CompileCache {
+  private dir: string;
+  private maxBytes: number;
+
+  constructor(dir: string = defaultCompileCacheDir(), maxBytes = 256 * 1024 * 1024) {
+    this.dir = dir;
+    this.maxBytes = maxBytes;
+  }
+
+  /**
+   * Cache key for an artifact built from the given inputs (backend name,
+   * options, generated source)
+   */
+  static key(...parts: string[]): string {
+    const hash = createHash('sha1');
+    hash.update(`ioc-cache-v${CACHE_FORMAT}\0${process.version}\0${process.arch}`);
+    for (const part of parts) {
+      hash.update('\0');
+      hash.update(part);
+    }
+    return hash.digest('hex');
+  }
+
+  /**
+   * Read a cached artifact, or undefined on a miss or an unreadable entry
+   */
+  get(key: string): Uint8Array | undefined {
+    const file = this.pathFor(key);
+    try {
+      const data = fs.readFileSync(file);
+      // Refresh the modification time so eviction is least-recently-used
+      const now = new Date();
+      fs.utimesSync(file, now, now);
+      return new Uint8Array(data.buffer, data.byteOffset, data.byteLength);
+    } catch {
+      return undefined;
+    }
+  }
+
+  /**
+   * Store an artifact. Failures are ignored: the cache only ever saves work.
+   */
+  set(key: string, data: Uint8Array): void {
+    const file = this.pathFor(key);
+    // Write under a unique name and rename, so readers never see a partial file
+    const tmpFile = `${file}.${process.pid}.${Date.now()}.tmp`;
+    try {
+      fs.mkdirSync(this.dir, { recursive: true });
+      fs.writeFileSync(tmpFile, data);
+      let replacedBytes = 0;
+      try {
+        replacedBytes = fs.statSync(file).size;
+      } catch {
+        // New entry
+      }
+      fs.renameSync(tmpFile, file);
+      this.track(data.byteLength - replacedBytes);
+    } catch {
+      try {
+        fs.unlinkSync(tmpFile);
+      } catch {
+        // Nothing was written
+      }
+    }
+  }
+
+  private pathFor(key: string): string {
+    return path.join(this.dir, `${key}.bin`);
+  }
+
+  /**
+   * Account for a write of `delta` bytes, evicting once the directory may no
+   * longer fit. The first write to a directory in this process scans it.
+   */
+  private track(delta: number): void {
+    const dir = path.resolve(this.dir);
+    const known = trackedBytes.get(dir);
+    let total = known === undefined ? undefined : known + delta;
+    if (total === undefined || total > this.maxBytes) total = this.evict();
+    trackedBytes.set(dir, total);
+  }
+
+  /**
+   * Delete least-recently-used entries until the cache fits in maxBytes,
+   * returning the bytes that remain
+   */
+  private evict(): number {
+    const entries = fs
+      .readdirSync(this.dir)
+      .filter((name) => name.endsWith('.bin'))
+      .map((name) => {
+        const file = path.join(this.dir, name);
+        const stats = fs.statSync(file);
+        return { file, size: stats.size, mtime: stats.mtimeMs };
+      });
+
+    let total = entries.reduce((sum, entry) => sum + entry.size, 0);
+    if (total <= this.maxBytes) return total;
+
+    entries.sort((a, b) => a.mtime - b.mtime);
+    for (const entry of entries) {
+      if (total <= this.maxBytes) break;
+      fs.unlinkSync(entry.file);
+      total -= entry.size;
+    }
+    return total;
+  }
+}
@@ -47,6 +47,7 @@ export * from './javascript-backend';
 export * from './wasm-backend';
 export * from './llvm-backend';
 export * from './backend-selector';
+export * from './compile-cache';
 
 // Re-export singleton
 export { backendSelector } from './backend-selector';
@@ -6,7 +6,7 @@
  */
 
 import type { IOCProgram, IOCNodeParams } from '../dsl/ioc-format';
-import { IOCIntentType, validateIOCProgram } from '../dsl/ioc-format';
+import { IOCIntentType, getExecutionOrder, validateIOCProgram } from '../dsl/ioc-format';
 import {
   compilePredicateFunction,
   compileTransformFunction,
@@ -133,7 +133,7 @@ export class JavaScriptBackend implements CompilationBackend {
           if (params.keyTransform) {
             const keyFn = compileTransformFunction(params.keyTransform);
             compiled.set(node.id, (input: any[]) => {
-              const sorted = [...input].sort((a, b) => {
+              const sorted = input.slice().sort((a, b) => {
                 const ka = keyFn(a);
                 const kb = keyFn(b);
                 return ka < kb ? -1 : ka > kb ? 1 : 0;
@@ -142,7 +142,7 @@ export class JavaScriptBackend implements CompilationBackend {
             });
           } else {
             compiled.set(node.id, (input: any[]) => {
-              const sorted = [...input].sort();
+              const sorted = input.slice().sort();
               return params.descending ? sorted.reverse() : sorted;
             });
           }
@@ -192,7 +192,7 @@ export class JavaScriptBackend implements CompilationBackend {
 
     // Build execution function
     const inputNodes = program.nodes.filter((n) => n.type === IOCIntentType.INPUT);
-    const executionOrder = this.getExecutionOrder(program);
+    const executionOrder = getExecutionOrder(program);
 
     return (...args: any[]) => {
       const results = new Map<string, any>();
@@ -251,35 +251,6 @@ export class JavaScriptBackend implements CompilationBackend {
     };
   }
 
-  /**
-   * Get topological execution order
-   */
-  private getExecutionOrder(program: IOCProgram): string[] {
-    const nodeMap = new Map(program.nodes.map((n) => [n.id, n]));
-    const visited = new Set<string>();
-    const order: string[] = [];
-
-    const visit = (nodeId: string) => {
-      if (visited.has(nodeId)) return;
-      visited.add(nodeId);
-
-      const node = nodeMap.get(nodeId);
-      if (!node) return;
-
-      for (const inputId of node.inputs) {
-        visit(inputId);
-      }
-
-      order.push(nodeId);
-    };
-
-    for (const outputId of program.outputs) {
-      visit(outputId);
-    }
-
-    return order;
-  }
-
   estimateCompilationTime(program: IOCProgram): number {
     // JavaScript compilation is very fast: ~1ms per node
     return program.nodes.length * 1;
@@ -11,6 +11,7 @@ import { BackendType } from './types';
 import type { SafePredicate, SafeTransform, ComparisonOp } from '../dsl/safe-types';
 import { getExecutionOrder } from '../dsl/ioc-format';
 import { JavaScriptBackend } from './javascript-backend';
+import { CompileCache } from './compile-cache';
 import { execSync } from 'child_process';
 import * as fs from 'fs';
 import * as path from 'path';
@@ -606,6 +607,20 @@ export class LLVMBackend implements CompilationBackend {
     program: IOCProgram,
     options: Partial<CompilationOptions>
   ): Promise<{ execute: Function; codeSize: number }> {
+    const optLevel = options.optimizationLevel || 0;
+
+    // llc only runs to measure the object file, so a cached size skips it
+    const cache = options.persistentCache ? new CompileCache(options.cacheDir) : undefined;
+    const cacheKey = cache ? CompileCache.key(this.type, `O${optLevel}`, llvmIR) : '';
+    const cachedSize = cache?.get(cacheKey);
+    if (cachedSize) {
+      const jsResult = await new JavaScriptBackend().compile(program, options);
+      return {
+        execute: jsResult.execute,
+        codeSize: Number(new TextDecoder().decode(cachedSize)),
+      };
+    }
+
     // Write LLVM IR to temporary file
     const tmpDir = os.tmpdir();
     const irFile = path.join(tmpDir, `ioc_${Date.now()}.ll`);
@@ -615,12 +630,12 @@ export class LLVMBackend implements CompilationBackend {
       fs.writeFileSync(irFile, llvmIR);
 
       // Compile to object file
-      const optLevel = options.optimizationLevel || 0;
       execSync(`llc -O${optLevel} -filetype=obj -o ${objFile} ${irFile}`);
 
       // Get code size
       const stats = fs.statSync(objFile);
       const codeSize = stats.size;
+      cache?.set(cacheKey, new TextEncoder().encode(String(codeSize)));
 
       // Clean up temporary files
       fs.unlinkSync(irFile);
@@ -55,6 +55,12 @@ export interface CompilationOptions {
 
   /** Enable bounds checking (affects performance) */
   boundsChecking?: boolean;
+
+  /** Reuse toolchain output from earlier processes via an on-disk cache */
+  persistentCache?: boolean;
+
+  /** Directory for the persistent cache (default ~/.ioc/compile-cache) */
+  cacheDir?: string;
 }
 
 /**
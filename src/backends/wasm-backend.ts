@@ -10,6 +10,7 @@ import type { CompilationBackend, CompilationOptions, CompilationResult } from '
 import { BackendType } from './types';
 import type { SafePredicate, SafeTransform, ReductionOp, ComparisonOp } from '../dsl/safe-types';
 import { getExecutionOrder } from '../dsl/ioc-format';
+import { CompileCache } from './compile-cache';
 
 /**
  * WebAssembly Text Format (WAT) code generator
@@ -121,7 +122,7 @@ export class WebAssemblyBackend implements CompilationBackend {
       const { wat, literals } = this.generateWAT(program, options);
 
       // Compile WAT to binary WASM
-      const wasmBinary = await this.compileWAT(wat);
+      const wasmBinary = await this.compileWATCached(wat, options);
 
       // Create import object with helper functions and pre-store literals
       const imports = this.createImports(literals);
@@ -1328,6 +1329,30 @@ export class WebAssemblyBackend implements CompilationBackend {
     }
   }
 
+  /**
+   * Assemble WAT, reusing a binary from the persistent cache when enabled.
+   * The binary depends only on the WAT text, which is the whole key.
+   */
+  private async compileWATCached(
+    wat: string,
+    options: Partial<CompilationOptions>
+  ): Promise<Uint8Array> {
+    if (!options.persistentCache) {
+      return this.compileWAT(wat);
+    }
+
+    const cache = new CompileCache(options.cacheDir);
+    const key = CompileCache.key(this.type, wat);
+    const cached = cache.get(key);
+    if (cached) {
+      return cached;
+    }
+
+    const wasmBinary = await this.compileWAT(wat);
+    cache.set(key, wasmBinary);
+    return wasmBinary;
+  }
+
   /**
    * Create import object for WebAssembly instance with JavaScript helper functions
    */
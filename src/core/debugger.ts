@@ -1,6 +1,7 @@
 // IOC Debugger - Tools for debugging optimized execution
 
-import { Graph, IntentNode, IntentType } from './graph';
+import { Aggregation, Graph, IntentNode, IntentType, initialAccumulators } from './graph';
+import { previewJSON } from './preview';
 import { ProvenanceTracker } from './provenance';
 
 export interface ExecutionTrace {
@@ -18,6 +19,8 @@ export interface NodeExecution {
   executionCount: number;
   totalTime: number;
   averageTime: number;
+  /** Sample standard deviation of execution time (0 until a second run) */
+  timeStdDev: number;
   inputs: any[][];
   outputs: any[];
   errors: Error[];
@@ -53,6 +56,18 @@ export interface BugFindingResult {
   testedNodes: string[];
 }
 
+/**
+ * Index of the first NaN in an array, or -1. `v !== v` only holds for NaN,
+ * so no per-item type check is needed.
+ */
+function indexOfNaN(values: ArrayLike<unknown>): number {
+  for (let i = 0, n = values.length; i < n; i++) {
+    const v = values[i];
+    if (v !== v) return i;
+  }
+  return -1;
+}
+
 export class DebugMode {
   enabled = true;
   traceExecution = false;
@@ -102,14 +117,16 @@ export class DebugMode {
 
     // Check for NaN in numeric data
     if (this.checkNaN) {
-      if (typeof output === 'number' && isNaN(output)) {
+      if (Number.isNaN(output)) {
         errors.push(`Node ${node.id.substring(0, 8)}... returned NaN`);
-      } else if (Array.isArray(output)) {
-        for (let i = 0; i < output.length; i++) {
-          if (typeof output[i] === 'number' && isNaN(output[i])) {
-            errors.push(`Node ${node.id.substring(0, 8)}... returned NaN at index ${i}`);
-            break;
-          }
+      } else if (
+        Array.isArray(output) ||
+        output instanceof Float64Array ||
+        output instanceof Float32Array
+      ) {
+        const index = indexOfNaN(output);
+        if (index !== -1) {
+          errors.push(`Node ${node.id.substring(0, 8)}... returned NaN at index ${index}`);
         }
       }
     }
@@ -132,27 +149,34 @@ export class DebugMode {
       return 'No execution traces recorded';
     }
 
-    const lines: string[] = ['Execution Trace Summary:', '='.repeat(60)];
-
-    const totalTime = this.executionTraces.reduce((sum, t) => sum + t.executionTime, 0);
-    const errors = this.executionTraces.filter((t) => t.error);
-
-    lines.push(`Total operations: ${this.executionTraces.length}`);
-    lines.push(`Total time: ${totalTime.toFixed(2)}ms`);
-    lines.push(`Errors: ${errors.length}`);
-    lines.push('');
-
-    lines.push('Trace:');
-    this.executionTraces.forEach((trace, i) => {
+    // One pass builds the per-trace lines and the totals for the header
+    const traceLines: string[] = [];
+    let totalTime = 0;
+    let errorCount = 0;
+    for (let i = 0; i < this.executionTraces.length; i++) {
+      const trace = this.executionTraces[i]!;
+      totalTime += trace.executionTime;
       const status = trace.error ? 'ERROR' : 'OK';
-      lines.push(
+      traceLines.push(
         `  ${i + 1}. [${status}] ${trace.nodeId.substring(0, 8)}... ` +
           `(${trace.intentType}) - ${trace.executionTime.toFixed(2)}ms`
       );
       if (trace.error) {
-        lines.push(`      Error: ${trace.error.message}`);
+        errorCount++;
+        traceLines.push(`      Error: ${trace.error.message}`);
       }
-    });
+    }
+
+    const lines: string[] = [
+      'Execution Trace Summary:',
+      '='.repeat(60),
+      `Total operations: ${this.executionTraces.length}`,
+      `Total time: ${totalTime.toFixed(2)}ms`,
+      `Errors: ${errorCount}`,
+      '',
+      'Trace:',
+      ...traceLines,
+    ];
 
     return lines.join('\n');
   }
@@ -164,6 +188,8 @@ export class IOCDebugger {
   debugMode: DebugMode;
   private executionTraces: Map<string, ExecutionTrace[]> = new Map();
   private nodeExecutions: Map<string, NodeExecution> = new Map();
+  /** Running sum of squared deviations per node (Welford) */
+  private nodeTimeM2: Map<string, number> = new Map();
 
   constructor(graph: Graph, provenance?: ProvenanceTracker) {
     this.graph = graph;
@@ -183,15 +209,19 @@ export class IOCDebugger {
     const executionOrder = this.graph.getExecutionOrder();
     const nodeResults: Map<string, any> = new Map();
 
+    // Resolve timing/memory probes once rather than per node
+    const now = performance.now.bind(performance);
+    const heapUsed =
+      typeof process !== 'undefined' && typeof process.memoryUsage === 'function'
+        ? () => process.memoryUsage().heapUsed
+        : () => 0;
+
     for (const nodeId of executionOrder) {
       const node = this.graph.nodes.get(nodeId);
       if (!node) continue;
 
-      const startTime = performance.now();
-      const startMemory =
-        typeof process !== 'undefined' && typeof process.memoryUsage === 'function'
-          ? process.memoryUsage().heapUsed
-          : 0;
+      const startTime = now();
+      const startMemory = heapUsed();
 
       try {
         const inputs = node.inputs.map((inputId) => nodeResults.get(inputId));
@@ -220,6 +250,16 @@ export class IOCDebugger {
             break;
           }
 
+          case IntentType.FILTER_MAP: {
+            const fmPred = node.params['predicate'] as Function;
+            const fmTransform = node.params['transform'] as Function;
+            output = [];
+            for (const item of inputs[0] || []) {
+              if (fmPred(item)) output.push(fmTransform(item));
+            }
+            break;
+          }
+
           case IntentType.REDUCE: {
             const reduceOp = node.params['operation'] as Function;
             const initial = node.params['initial'];
@@ -229,7 +269,7 @@ export class IOCDebugger {
 
           case IntentType.SORT: {
             const compareFn = node.params['compareFn'] as ((a: any, b: any) => number) | undefined;
-            output = [...(inputs[0] || [])].sort(compareFn);
+            output = (inputs[0] || []).slice().sort(compareFn);
             break;
           }
 
@@ -247,6 +287,25 @@ export class IOCDebugger {
             break;
           }
 
+          case IntentType.AGGREGATE_BY: {
+            const keyFn = node.params['keyFn'] as Function;
+            const aggregations = node.params['aggregations'] as Record<string, Aggregation>;
+            const aggregated = new Map();
+            for (const item of inputs[0] || []) {
+              const key = keyFn(item);
+              let acc = aggregated.get(key);
+              if (!acc) {
+                acc = initialAccumulators(aggregations);
+                aggregated.set(key, acc);
+              }
+              for (const [name, { operation }] of Object.entries(aggregations)) {
+                acc[name] = operation(acc[name], item);
+              }
+            }
+            output = aggregated;
+            break;
+          }
+
           case IntentType.JOIN: {
             const leftKey = node.params['leftKey'] as Function;
             const rightKey = node.params['rightKey'] as Function;
@@ -292,11 +351,8 @@ export class IOCDebugger {
 
         nodeResults.set(nodeId, output);
 
-        const endTime = performance.now();
-        const endMemory =
-          typeof process !== 'undefined' && typeof process.memoryUsage === 'function'
-            ? process.memoryUsage().heapUsed
-            : 0;
+        const endTime = now();
+        const endMemory = heapUsed();
 
         const trace: ExecutionTrace = {
           nodeId,
@@ -322,7 +378,7 @@ export class IOCDebugger {
           intentType: node.intentType,
           inputs: node.inputs.map((inputId) => nodeResults.get(inputId)),
           output: null,
-          executionTime: performance.now() - startTime,
+          executionTime: now() - startTime,
           error: error as Error,
         };
 
@@ -345,9 +401,16 @@ export class IOCDebugger {
     for (const trace of traces) {
       const existing = this.nodeExecutions.get(trace.nodeId);
       if (existing) {
+        // Welford's online update keeps mean and variance in one pass
         existing.executionCount++;
         existing.totalTime += trace.executionTime;
-        existing.averageTime = existing.totalTime / existing.executionCount;
+        const delta = trace.executionTime - existing.averageTime;
+        existing.averageTime += delta / existing.executionCount;
+        const m2 =
+          (this.nodeTimeM2.get(trace.nodeId) ?? 0) +
+          delta * (trace.executionTime - existing.averageTime);
+        this.nodeTimeM2.set(trace.nodeId, m2);
+        existing.timeStdDev = Math.sqrt(m2 / (existing.executionCount - 1));
         existing.inputs.push(trace.inputs);
         existing.outputs.push(trace.output);
         if (trace.error) {
@@ -359,6 +422,7 @@ export class IOCDebugger {
           executionCount: 1,
           totalTime: trace.executionTime,
           averageTime: trace.executionTime,
+          timeStdDev: 0,
           inputs: [trace.inputs],
           outputs: [trace.output],
           errors: trace.error ? [trace.error] : [],
@@ -418,6 +482,14 @@ export class IOCDebugger {
       return null;
     }
 
+    // Nodes only depend on earlier nodes in execution order, so the trace of a
+    // prefix run is identical to that node's trace in the full run above.
+    // Index it once instead of re-tracing a partial graph at every step.
+    const traceByNode = new Map<string, ExecutionTrace>();
+    for (const trace of traces) {
+      traceByNode.set(trace.nodeId, trace);
+    }
+
     let left = 0;
     let right = executionOrder.length - 1;
     let buggyNodeId: string | null = null;
@@ -429,11 +501,7 @@ export class IOCDebugger {
       if (!nodeId) break;
       testedNodes.push(nodeId);
 
-      const partialGraph = this.createPartialGraph(executionOrder.slice(0, mid + 1));
-      const partialDebugger = new IOCDebugger(partialGraph, this.provenance);
-      const partialTraces = partialDebugger.trace(data, false);
-
-      const nodeTrace = partialTraces.find((t) => t.nodeId === nodeId);
+      const nodeTrace = traceByNode.get(nodeId);
       if (nodeTrace?.error) {
         buggyNodeId = nodeId;
         right = mid - 1;
@@ -450,7 +518,7 @@ export class IOCDebugger {
     }
 
     if (buggyNodeId) {
-      const buggyTrace = traces.find((t) => t.nodeId === buggyNodeId);
+      const buggyTrace = traceByNode.get(buggyNodeId);
       return {
         buggyNodeId,
         nodeId: buggyNodeId,
@@ -464,30 +532,6 @@ export class IOCDebugger {
     return null;
   }
 
-  private createPartialGraph(nodeIds: string[]): Graph {
-    const partial = new Graph();
-    const nodeIdSet = new Set(nodeIds);
-
-    for (const nodeId of nodeIds) {
-      const node = this.graph.nodes.get(nodeId);
-      if (node) {
-        partial.nodes.set(nodeId, {
-          ...node,
-          inputs: node.inputs.filter((id) => nodeIdSet.has(id)),
-        });
-      }
-    }
-
-    if (nodeIds.length > 0) {
-      const lastId = nodeIds[nodeIds.length - 1];
-      if (lastId) {
-        partial.outputs = [lastId];
-      }
-    }
-
-    return partial;
-  }
-
   private checkForDeviation(trace: ExecutionTrace | undefined, expectedOutput: any): boolean {
     if (!trace) return false;
 
@@ -512,25 +556,30 @@ export class IOCDebugger {
   }
 
   /**
-   * Compare execution with and without optimizations
+   * Compare execution with and without optimizations.
+   *
+   * Both runs read the same `data` object; it is never copied. Every built-in
+   * intent produces fresh output (sort copies before sorting), so the original
+   * run cannot change what the optimized run sees unless a user-supplied
+   * callback mutates its arguments.
    */
   compareOptimizations(data: Record<string, any>, optimizationPasses?: string[]): ComparisonResult {
-    const originalGraph = this.graph.clone();
+    // Tracing only reads the graph, so the original side runs in place
+    const originalGraph = this.graph;
     const originalDebugger = new IOCDebugger(originalGraph, this.provenance);
 
     const startOriginal = performance.now();
     const originalTraces = originalDebugger.trace(data, false);
     const originalTime = performance.now() - startOriginal;
 
-    const originalOutput =
-      originalGraph.outputs.length === 1
-        ? originalTraces.find((t) => t.nodeId === originalGraph.outputs[0])?.output
-        : originalGraph.outputs.map((id) => originalTraces.find((t) => t.nodeId === id)?.output);
+    const originalOutput = this.collectOutputs(originalGraph, originalTraces);
 
-    const optimizedGraph = this.graph.clone();
+    // Only a graph that is actually going to be optimized needs its own copy
+    const skipOptimization = optimizationPasses !== undefined && optimizationPasses.length === 0;
+    const optimizedGraph = skipOptimization ? this.graph : this.graph.fork();
     if (optimizationPasses === undefined) {
       optimizedGraph.optimize();
-    } else if (optimizationPasses.length > 0) {
+    } else if (!skipOptimization) {
       optimizedGraph.optimize(optimizationPasses);
     }
 
@@ -540,10 +589,7 @@ export class IOCDebugger {
     const optimizedTraces = optimizedDebugger.trace(data, false);
     const optimizedTime = performance.now() - startOptimized;
 
-    const optimizedOutput =
-      optimizedGraph.outputs.length === 1
-        ? optimizedTraces.find((t) => t.nodeId === optimizedGraph.outputs[0])?.output
-        : optimizedGraph.outputs.map((id) => optimizedTraces.find((t) => t.nodeId === id)?.output);
+    const optimizedOutput = this.collectOutputs(optimizedGraph, optimizedTraces);
 
     const resultsMatch = JSON.stringify(originalOutput) === JSON.stringify(optimizedOutput);
     const speedup = originalTime / optimizedTime;
@@ -586,6 +632,19 @@ export class IOCDebugger {
     };
   }
 
+  /**
+   * Pick the output value(s) of a graph out of its execution traces
+   */
+  private collectOutputs(graph: Graph, traces: ExecutionTrace[]): any {
+    const byNode = new Map<string, ExecutionTrace>();
+    for (const trace of traces) {
+      byNode.set(trace.nodeId, trace);
+    }
+    return graph.outputs.length === 1
+      ? byNode.get(graph.outputs[0]!)?.output
+      : graph.outputs.map((id) => byNode.get(id)?.output);
+  }
+
   /**
    * Format comparison report as human-readable string
    */
@@ -602,12 +661,12 @@ export class IOCDebugger {
       'Original Execution:',
       `  Nodes: ${comparison.original.nodeCount}`,
       `  Time: ${comparison.original.executionTime.toFixed(2)}ms`,
-      `  Result: ${JSON.stringify(comparison.original.result).substring(0, 100)}`,
+      `  Result: ${previewJSON(comparison.original.result)}`,
       '',
       'Optimized Execution:',
       `  Nodes: ${comparison.optimized.nodeCount}`,
       `  Time: ${comparison.optimized.executionTime.toFixed(2)}ms`,
-      `  Result: ${JSON.stringify(comparison.optimized.result).substring(0, 100)}`,
+      `  Result: ${previewJSON(comparison.optimized.result)}`,
       '',
       'Comparison:',
       `  Results Match: ${comparison.comparison.resultsMatch ? 'YES' : 'NO'}`,
@@ -649,6 +708,7 @@ export class IOCDebugger {
     this.debugMode.clearTraces();
     this.executionTraces.clear();
     this.nodeExecutions.clear();
+    this.nodeTimeM2.clear();
   }
 
   /**
@@ -674,7 +734,7 @@ export class IOCDebugger {
       if (typeof value === 'function') {
         lines.push(`  ${key}: <function>`);
       } else {
-        lines.push(`  ${key}: ${JSON.stringify(value)}`);
+        lines.push(`  ${key}: ${previewJSON(value)}`);
       }
     }
 
@@ -697,7 +757,7 @@ export class IOCDebugger {
         }
       }
 
-      if (prov.parentNodes.length > 0) {
+      if (prov.hasParents()) {
         lines.push(
           `  Derived from: ${prov.parentNodes.map((p) => p.substring(0, 8) + '...').join(', ')}`
         );
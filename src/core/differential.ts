@@ -1,6 +1,10 @@
 // Differential Testing - Compare different execution strategies
 
-import { Graph } from './graph';
+import { Graph, IntentType } from './graph';
+import { GraphOptimizer } from './optimizer';
+import { previewJSON } from './preview';
+import { isListLike } from './types';
+import { SolverKernel } from '../solvers/kernel';
 
 export interface ExecutionResult {
   strategyName: string;
@@ -11,6 +15,13 @@ export interface ExecutionResult {
   metadata: Record<string, any>;
 }
 
+export interface TimingOptions {
+  /** Timed runs per execution; the median is reported (default 1) */
+  repeats?: number;
+  /** Untimed runs before measuring, to let the JIT settle (default 0) */
+  warmup?: number;
+}
+
 export interface DifferentialTestResult {
   executions: ExecutionResult[];
   baselineName: string;
@@ -19,59 +30,102 @@ export interface DifferentialTestResult {
   performanceComparison: Record<string, number>;
 }
 
+/**
+ * Kernel optimization goal used to realize each named strategy
+ */
+const STRATEGY_MODES: Record<string, 'speed' | 'memory' | 'balanced'> = {
+  naive: 'memory',
+  optimized: 'balanced',
+  vectorized: 'speed',
+};
+
+export interface DifferentialTesterOptions {
+  /** Relative tolerance when comparing numbers (default 0: exact) */
+  rtol?: number;
+  /** Absolute tolerance when comparing numbers (default 0: exact) */
+  atol?: number;
+  /** Stop running strategies after the first mismatch (default false) */
+  failFast?: boolean;
+}
+
+/**
+ * Runs a graph under several strategies and compares the results.
+ *
+ * Inputs are passed to every execution as-is, without copying. Compiled
+ * kernels never mutate their arguments (sort copies before sorting), so
+ * executions cannot observe each other through shared input data.
+ */
 export class DifferentialTester {
   private graph: Graph;
-
-  constructor(graph: Graph) {
+  // Compiled functions keyed by optimization goal and graph fingerprint, so
+  // clones and re-optimized copies of the same graph reuse one compile
+  private compiledByFingerprint: Map<string, Function> = new Map();
+  // One kernel per graph serves every strategy, sharing its size estimates
+  // and strategy decisions instead of redoing them per optimization goal
+  private kernels: WeakMap<Graph, SolverKernel> = new WeakMap();
+  private inputNames: WeakMap<Graph, { version: number; names: string[] }> = new WeakMap();
+  // Optimized copies keyed by source fingerprint and pass list
+  private optimizedGraphs: Map<string, Graph> = new Map();
+
+  private rtol: number;
+  private atol: number;
+  private failFast: boolean;
+
+  constructor(graph: Graph, options: DifferentialTesterOptions = {}) {
     this.graph = graph;
+    this.rtol = options.rtol ?? 0;
+    this.atol = options.atol ?? 0;
+    this.failFast = options.failFast ?? false;
   }
 
   /**
-   * Test the graph with multiple execution strategies
+   * Test the graph with multiple execution strategies. With `repeats > 1`,
+   * each execution reports the median time and records the fastest run in
+   * `metadata.minTime`.
    */
-  testAllStrategies(data: Record<string, any>, strategies?: string[]): DifferentialTestResult {
+  testAllStrategies(
+    data: Record<string, any>,
+    strategies?: string[],
+    timing: TimingOptions = {}
+  ): DifferentialTestResult {
     const strategyNames = strategies || ['naive', 'optimized'];
     const executions: ExecutionResult[] = [];
     const baselineName = 'naive';
 
-    // Execute with each strategy
-    for (const strategyName of strategyNames) {
-      const result = this.executeWithStrategy(strategyName, data);
-      executions.push(result);
-    }
-
-    // Compare results
-    const baseline = executions.find((e) => e.strategyName === baselineName);
-    if (!baseline) {
+    const baselineIndex = strategyNames.indexOf(baselineName);
+    if (baselineIndex < 0) {
       throw new Error(`Baseline strategy '${baselineName}' not found`);
     }
 
+    // The baseline runs first so every other strategy is compared as soon as
+    // it finishes; with failFast the remaining strategies are then skipped
+    const baseline = this.executeWithStrategy(baselineName, data, timing);
+    const timeBaseline = baseline.error === undefined && baseline.executionTime > 0;
+
     let allMatch = true;
     const mismatches: Array<[string, string]> = [];
+    const performanceComparison: Record<string, number> = {};
+
+    for (let i = 0; i < strategyNames.length; i++) {
+      const strategyName = strategyNames[i]!;
+      const exec =
+        i === baselineIndex ? baseline : this.executeWithStrategy(strategyName, data, timing);
+      executions.push(exec);
+
+      if (timeBaseline && exec.error === undefined) {
+        performanceComparison[exec.strategyName] = baseline.executionTime / exec.executionTime;
+      }
 
-    for (const exec of executions) {
       if (exec.strategyName === baselineName) continue;
 
-      // Compare results
-      if (exec.error === undefined && baseline.error === undefined) {
-        if (!this.resultsEqual(baseline.result, exec.result)) {
-          allMatch = false;
-          mismatches.push([baselineName, exec.strategyName]);
-        }
-      } else if ((exec.error === undefined) !== (baseline.error === undefined)) {
+      const matches =
+        exec.error === undefined && baseline.error === undefined
+          ? this.resultsEqual(baseline.result, exec.result)
+          : (exec.error === undefined) === (baseline.error === undefined);
+      if (!matches) {
         allMatch = false;
         mismatches.push([baselineName, exec.strategyName]);
-      }
-    }
-
-    // Calculate performance comparison
-    const performanceComparison: Record<string, number> = {};
-    if (baseline.error === undefined && baseline.executionTime > 0) {
-      for (const exec of executions) {
-        if (exec.error === undefined) {
-          const speedup = baseline.executionTime / exec.executionTime;
-          performanceComparison[exec.strategyName] = speedup;
-        }
+        if (this.failFast) break;
       }
     }
 
@@ -98,12 +152,7 @@ export class DifferentialTester {
     executions.push(unoptimized);
 
     // Execute with optimization
-    const optimizedGraph = this.graph.clone();
-    if (optimizationPasses) {
-      optimizedGraph.optimize(optimizationPasses);
-    } else {
-      optimizedGraph.optimize();
-    }
+    const optimizedGraph = this.getOptimizedGraph(optimizationPasses);
 
     const optimized = this.executeGraph(optimizedGraph, data, 'optimized');
     executions.push(optimized);
@@ -150,81 +199,159 @@ export class DifferentialTester {
   }
 
   /**
-   * Execute graph with a specific strategy
-   *
-   * @deprecated This method is a placeholder for future strategy-specific execution.
-   * Currently returns stub data. To actually execute a graph, use SolverKernel.compile()
-   * and call the resulting function.
-   *
-   * Future implementation will:
-   * - Compile the graph with the specified strategy (naive/optimized/vectorized)
-   * - Execute with the provided data
-   * - Return actual results and timing information
+   * Optimize a copy of the graph, reusing the copy made for an earlier call
+   * with the same graph state and passes. Optimization runs synchronously, so
+   * the graph is final before it is compiled.
    */
-  private executeWithStrategy(strategyName: string, _data: Record<string, any>): ExecutionResult {
-    const start = performance.now();
+  private getOptimizedGraph(optimizationPasses?: string[]): Graph {
+    // An empty pass list leaves the graph unchanged, so no copy is needed
+    if (optimizationPasses !== undefined && optimizationPasses.length === 0) {
+      return this.graph;
+    }
+
+    const key = `${this.graph.fingerprint()}:${optimizationPasses?.join(',') ?? '*'}`;
+    let optimized = this.optimizedGraphs.get(key);
+    if (!optimized) {
+      optimized = new GraphOptimizer(this.graph.fork()).optimize(optimizationPasses);
+      this.optimizedGraphs.set(key, optimized);
+    }
+    return optimized;
+  }
+
+  /**
+   * Execute the graph with a specific strategy
+   */
+  private executeWithStrategy(
+    strategyName: string,
+    data: Record<string, any>,
+    timing: TimingOptions = {}
+  ): ExecutionResult {
+    const optimizeFor = STRATEGY_MODES[strategyName];
+    if (!optimizeFor) {
+      return this.errorResult(
+        strategyName,
+        this.graph,
+        new Error(`Unknown strategy: ${strategyName}`)
+      );
+    }
+    return this.execute(this.graph, optimizeFor, data, strategyName, timing);
+  }
+
+  /**
+   * Execute a graph and return result
+   */
+  private executeGraph(graph: Graph, data: Record<string, any>, label: string): ExecutionResult {
+    return this.execute(graph, 'balanced', data, label);
+  }
+
+  /**
+   * Compile (or reuse) a graph's kernel and time its execution. Compilation
+   * and warmup happen outside the timed region, so only steady-state
+   * execution is reported.
+   */
+  private execute(
+    graph: Graph,
+    optimizeFor: 'speed' | 'memory' | 'balanced',
+    data: Record<string, any>,
+    label: string,
+    timing: TimingOptions = {}
+  ): ExecutionResult {
+    let compiled: Function;
+    try {
+      compiled = this.getCompiled(graph, optimizeFor);
+    } catch (e) {
+      return this.errorResult(label, graph, e as Error);
+    }
+
+    // Arguments are bound before the clock starts; no copy is made
+    const args = this.getInputNames(graph).map((name) => data[name]);
+    const repeats = Math.max(1, Math.floor(timing.repeats ?? 1));
+    const warmup = Math.max(0, Math.floor(timing.warmup ?? 0));
+    const times = new Array<number>(repeats);
     let result: any;
     let error: Error | undefined;
 
     try {
-      // STUB: Strategy-specific execution not yet implemented
-      // For actual execution, use:
-      //   import { SolverKernel } from '../solvers/kernel';
-      //   const kernel = new SolverKernel(this.graph);
-      //   const compiled = kernel.compile(strategyName === 'optimized' ? 'speed' : 'balanced');
-      //   result = compiled(data);
-      result = null;
+      for (let i = 0; i < warmup; i++) {
+        compiled(...args);
+      }
+      for (let i = 0; i < repeats; i++) {
+        const start = performance.now();
+        try {
+          result = compiled(...args);
+        } finally {
+          times[i] = performance.now() - start;
+        }
+      }
     } catch (e) {
       error = e as Error;
     }
 
-    const executionTime = performance.now() - start;
+    // A failing run stops the loop; only runs that happened are reported
+    const measured = times.filter((t) => t !== undefined).sort((a, b) => a - b);
+    const executionTime = measured.length > 0 ? median(measured) : 0;
+    const metadata: Record<string, any> = { optimizeFor };
+    if (repeats > 1 && measured.length > 0) {
+      metadata['minTime'] = measured[0];
+      metadata['repeats'] = measured.length;
+    }
 
     return {
-      strategyName,
+      strategyName: label,
       result,
       executionTime,
-      nodeCount: this.graph.nodes.size,
+      nodeCount: graph.nodes.size,
       error,
-      metadata: {},
+      metadata,
     };
   }
 
   /**
-   * Execute a graph and return result
-   *
-   * @deprecated This method is a placeholder for future graph execution.
-   * Currently returns stub data. To actually execute a graph, use SolverKernel.compile()
-   * and call the resulting function.
-   *
-   * Future implementation will:
-   * - Compile the graph
-   * - Execute with the provided data
-   * - Return actual results and timing information
+   * Get the compiled function for a graph, compiling on the first request
    */
-  private executeGraph(graph: Graph, _data: Record<string, any>, label: string): ExecutionResult {
-    const start = performance.now();
-    let result: any;
-    let error: Error | undefined;
+  private getCompiled(graph: Graph, optimizeFor: 'speed' | 'memory' | 'balanced'): Function {
+    const key = `${optimizeFor}:${graph.fingerprint()}`;
+    let compiled = this.compiledByFingerprint.get(key);
+    if (!compiled) {
+      let kernel = this.kernels.get(graph);
+      if (!kernel) {
+        kernel = new SolverKernel(graph);
+        this.kernels.set(graph, kernel);
+      }
+      compiled = kernel.compile(optimizeFor);
+      this.compiledByFingerprint.set(key, compiled);
+    }
+    return compiled;
+  }
 
-    try {
-      // STUB: Graph execution not yet implemented
-      // For actual execution, use:
-      //   import { SolverKernel } from '../solvers/kernel';
-      //   const kernel = new SolverKernel(graph);
-      //   const compiled = kernel.compile('balanced');
-      //   result = compiled(data);
-      result = null;
-    } catch (e) {
-      error = e as Error;
+  /**
+   * Input names in the order the compiled function takes them
+   */
+  private getInputNames(graph: Graph): string[] {
+    const cached = this.inputNames.get(graph);
+    if (cached && cached.version === graph.version) {
+      return cached.names;
     }
 
-    const executionTime = performance.now() - start;
+    const names: string[] = [];
+    for (const nodeId of graph.getNodesOfType(IntentType.INPUT)) {
+      const name = graph.nodes.get(nodeId)!.params['name'];
+      if (typeof name === 'string') {
+        names.push(name);
+      }
+    }
+    this.inputNames.set(graph, { version: graph.version, names });
+    return names;
+  }
 
+  /**
+   * Build the result for an execution that failed before it could run
+   */
+  private errorResult(label: string, graph: Graph, error: Error): ExecutionResult {
     return {
       strategyName: label,
-      result,
-      executionTime,
+      result: undefined,
+      executionTime: 0,
       nodeCount: graph.nodes.size,
       error,
       metadata: {},
@@ -235,11 +362,64 @@ export class DifferentialTester {
    * Compare two results for equality
    */
   private resultsEqual(result1: any, result2: any): boolean {
-    try {
-      return JSON.stringify(result1) === JSON.stringify(result2);
-    } catch {
-      return result1 === result2;
+    return this.valuesEqual(result1, result2);
+  }
+
+  /**
+   * Structural equality with early exit. Numbers honour rtol/atol and NaN
+   * equals NaN; arrays, typed arrays, Maps, Sets and plain objects are
+   * compared element-wise without serializing either side.
+   */
+  private valuesEqual(a: any, b: any): boolean {
+    if (a === b) return true;
+
+    if (typeof a === 'number' && typeof b === 'number') {
+      if (Number.isNaN(a) || Number.isNaN(b)) return Number.isNaN(a) && Number.isNaN(b);
+      return Math.abs(a - b) <= this.atol + this.rtol * Math.abs(b);
+    }
+
+    if (a === null || b === null || typeof a !== 'object' || typeof b !== 'object') {
+      return false;
+    }
+    if (Object.getPrototypeOf(a) !== Object.getPrototypeOf(b)) return false;
+
+    if (isListLike(a)) {
+      const right = b as ArrayLike<unknown>;
+      if (a.length !== right.length) return false;
+      for (let i = 0; i < a.length; i++) {
+        if (!this.valuesEqual(a[i], right[i])) return false;
+      }
+      return true;
+    }
+
+    if (a instanceof Map) {
+      if (a.size !== b.size) return false;
+      for (const [key, value] of a) {
+        if (!b.has(key) || !this.valuesEqual(value, b.get(key))) return false;
+      }
+      return true;
     }
+
+    if (a instanceof Set) {
+      if (a.size !== b.size) return false;
+      for (const value of a) {
+        if (!b.has(value)) return false;
+      }
+      return true;
+    }
+
+    if (a instanceof Date) {
+      return a.getTime() === b.getTime();
+    }
+
+    const keys = Object.keys(a);
+    if (keys.length !== Object.keys(b).length) return false;
+    for (const key of keys) {
+      if (!Object.prototype.hasOwnProperty.call(b, key) || !this.valuesEqual(a[key], b[key])) {
+        return false;
+      }
+    }
+    return true;
   }
 
   /**
@@ -269,9 +449,7 @@ export class DifferentialTester {
       if (exec.error) {
         lines.push(`    Error: ${exec.error.message}`);
       } else {
-        const resultStr = JSON.stringify(exec.result);
-        const preview = resultStr.length > 100 ? resultStr.substring(0, 97) + '...' : resultStr;
-        lines.push(`    Result: ${preview}`);
+        lines.push(`    Result: ${previewJSON(exec.result)}`);
       }
     }
 
@@ -301,11 +479,24 @@ export class DifferentialTester {
 }
 
 /**
- * Run differential tests on multiple test cases
+ * Median of an ascending-sorted, non-empty list
+ */
+function median(sorted: number[]): number {
+  const mid = sorted.length >> 1;
+  return sorted.length % 2 === 1 ? sorted[mid]! : (sorted[mid - 1]! + sorted[mid]!) / 2;
+}
+
+/**
+ * Run differential tests on multiple test cases.
+ *
+ * Cases share one tester, so the graph is optimized once and each variant is
+ * compiled once; per case only execution remains. Cases run in-process:
+ * graph params are closures, which cannot be handed to worker threads.
  */
 export function createTestSuite(
   graph: Graph,
-  testCases: Array<Record<string, any>>
+  testCases: Array<Record<string, any>>,
+  optimizationPasses?: string[]
 ): DifferentialTestResult[] {
   const tester = new DifferentialTester(graph);
   const results: DifferentialTestResult[] = [];
@@ -313,7 +504,7 @@ export function createTestSuite(
   for (let i = 0; i < testCases.length; i++) {
     const testCase = testCases[i];
     if (testCase) {
-      const result = tester.testWithOptimizations(testCase);
+      const result = tester.testWithOptimizations(testCase, optimizationPasses);
       results.push(result);
     }
   }
@@ -3,9 +3,9 @@
  * Represents programs as DAGs of semantic intents
  */
 
-import { randomUUID } from 'crypto';
+import { createHash } from 'crypto';
 import type { IOCType } from './types.js';
-import { AnyType, inferType } from './types.js';
+import { ANY_TYPE, inferType } from './types.js';
 
 /**
  * Types of semantic intents
@@ -21,10 +21,14 @@ export enum IntentType {
   CONSTANT = 'constant',
   SORT = 'sort',
   GROUP_BY = 'group_by',
+  // Group by `keyFn` and fold each group into named accumulators
+  AGGREGATE_BY = 'aggregate_by',
   JOIN = 'join',
   FLATTEN = 'flatten',
   DISTINCT = 'distinct',
   ASSERT = 'assert',
+  // Produced by the optimizer: filter by `predicate`, then map by `transform`
+  FILTER_MAP = 'filter_map',
 }
 
 /**
@@ -34,38 +38,139 @@ export interface IntentMetadata {
   parallelizable?: boolean;
   vectorizable?: boolean;
   fusible?: boolean;
+  /** Reuse the previous output while the inputs are unchanged (see Graph.memoize) */
+  memoize?: boolean;
   [key: string]: unknown;
 }
 
 /**
- * Node in the intent graph representing a semantic goal
+ * Node in the intent graph representing a semantic goal.
+ *
+ * Nodes may be shared between a graph and its forks, so the structural
+ * fields are read-only: passes swap in an updated copy (Graph.replaceNode)
+ * instead of editing a node in place.
  */
 export interface IntentNode {
-  id: string;
-  intentType: IntentType;
-  inputs: string[];
-  params: Record<string, unknown>;
-  outputType: IOCType;
+  readonly id: string;
+  readonly intentType: IntentType;
+  readonly inputs: string[];
+  readonly params: Record<string, unknown>;
+  readonly outputType: IOCType;
+  // Builder-created nodes share frozen metadata; assign a new object to change it
   metadata: IntentMetadata;
 }
 
+/**
+ * One named accumulator of Graph.aggregateBy: `operation` folds each element
+ * of a group into the running value, which starts at `initial` per group
+ */
+export interface Aggregation {
+  operation: (acc: any, item: any) => unknown;
+  initial: unknown;
+}
+
+/**
+ * Fresh accumulators for one group of Graph.aggregateBy, keyed by name.
+ * Object initial values (arrays, Sets, Maps, Dates, ...) are structured-cloned
+ * so groups never share one instance, and the record has no prototype, so any
+ * name (`__proto__` included) is stored as a plain own field.
+ */
+export function initialAccumulators(
+  aggregations: Record<string, Aggregation>
+): Record<string, unknown> {
+  const acc: Record<string, unknown> = Object.create(null);
+  for (const [name, { initial }] of Object.entries(aggregations)) {
+    acc[name] =
+      typeof initial === 'object' && initial !== null ? structuredClone(initial) : initial;
+  }
+  return acc;
+}
+
 /**
  * Optimization mode for compilation
  */
 export type OptimizationMode = 'speed' | 'memory' | 'balanced';
 
+/**
+ * Metadata shared by every node of a kind instead of allocated per node.
+ * Frozen so a stray write cannot leak into unrelated nodes; nodes that need
+ * their own metadata get a fresh object.
+ */
+const NO_METADATA: IntentMetadata = Object.freeze({});
+const PARALLEL_METADATA: IntentMetadata = Object.freeze({ parallelizable: true });
+const VECTOR_METADATA: IntentMetadata = Object.freeze({
+  parallelizable: true,
+  vectorizable: true,
+});
+
+/**
+ * Stable per-process identities for callbacks, used by Graph.fingerprint().
+ * Two graphs only share a fingerprint when they hold the very same functions.
+ */
+const callbackIds: WeakMap<Function, number> = new WeakMap();
+let nextCallbackId = 0;
+
+function callbackId(fn: Function): number {
+  let id = callbackIds.get(fn);
+  if (id === undefined) {
+    id = nextCallbackId++;
+    callbackIds.set(fn, id);
+  }
+  return id;
+}
+
 /**
  * Intent Graph - represents a program as a DAG
  */
 export class Graph {
   nodes: Map<string, IntentNode> = new Map();
   outputs: string[] = [];
+  private _version = 0;
+  // Never reset or reused, so ids stay unique even after nodes are removed
+  private nodeCounter = 0;
+  private executionOrderCache?: {
+    version: number;
+    order: readonly string[];
+    reachable?: ReadonlySet<string>;
+  };
+  private consumersCache?: { version: number; consumers: Map<string, string[]> };
+  private typeIndexCache?: { version: number; byType: Map<IntentType, string[]> };
+  private fingerprintCache?: { version: number; fingerprint: string };
+  private outputSetCache?: { version: number; outputs: ReadonlySet<string> };
+
+  /**
+   * Fuse map -> map and filter -> filter while building. When a new map
+   * (filter) reads a map (filter) that nothing else reads yet, the two
+   * become one node with a composed callable and the earlier node is
+   * removed, so no intermediate list is produced for it. Off by default;
+   * with it on, the id of a node that gets fused away is no longer valid.
+   */
+  fusionEnabled = false;
+
+  /**
+   * Mutation counter, bumped whenever the graph structure changes.
+   * Derived data (compiled functions, orders) can be cached against it.
+   */
+  get version(): number {
+    return this._version;
+  }
+
+  /**
+   * Mark the graph as modified.
+   *
+   * Builder methods do this automatically; code that edits `nodes`,
+   * `outputs` or node fields directly must call it afterwards.
+   */
+  touch(): void {
+    this._version++;
+  }
 
   /**
    * Generate unique node ID
    */
   private generateId(prefix: string = 'node'): string {
-    return `${prefix}_${randomUUID().slice(0, 8)}`;
+    this.nodeCounter++;
+    return `${prefix}_${this.nodeCounter.toString(16).padStart(8, '0')}`;
   }
 
   /**
@@ -73,9 +178,128 @@ export class Graph {
    */
   private addNode(node: IntentNode): string {
     this.nodes.set(node.id, node);
+    this.touchNode(node.id, undefined, node);
     return node.id;
   }
 
+  /**
+   * Bump the version after the node stored under `nodeId` changed from
+   * `previous` to `next` (either missing for an add or a removal). Current
+   * consumer and intent-type indexes are patched for just that node and
+   * carried over instead of being rebuilt; their lists are replaced rather
+   * than edited, since callers may hold them. Removing a node the cached
+   * reachable set doesn't contain leaves the execution order as it was, so
+   * that is carried over too and dead-code sweeps don't invalidate it. Node
+   * edits never change the outputs, so their set is always carried over.
+   */
+  private touchNode(nodeId: string, previous?: IntentNode, next?: IntentNode): void {
+    const outputsIndexed = this.outputSetCache?.version === this._version;
+    const orderCache = this.executionOrderCache;
+    const orderKept =
+      !next &&
+      orderCache?.version === this._version &&
+      orderCache.reachable !== undefined &&
+      !orderCache.reachable.has(nodeId);
+    const consumersCache = this.consumersCache;
+    const consumersIndexed = consumersCache?.version === this._version;
+    const typeIndexCache = this.typeIndexCache;
+    const typesIndexed = typeIndexCache?.version === this._version;
+    this.touch();
+
+    if (consumersIndexed) {
+      const { consumers } = consumersCache;
+      const oldInputs = previous?.inputs ?? [];
+      const newInputs = next?.inputs ?? [];
+      for (const inputId of new Set(oldInputs)) {
+        if (newInputs.includes(inputId)) continue;
+        const list = consumers.get(inputId);
+        if (list) consumers.set(inputId, list.filter((id) => id !== nodeId));
+      }
+      for (const inputId of new Set(newInputs)) {
+        if (oldInputs.includes(inputId)) continue;
+        consumers.set(inputId, [...(consumers.get(inputId) ?? []), nodeId]);
+      }
+      consumersCache.version = this._version;
+    }
+
+    if (typesIndexed) {
+      const { byType } = typeIndexCache;
+      if (previous && previous.intentType !== next?.intentType) {
+        const list = byType.get(previous.intentType) ?? [];
+        byType.set(previous.intentType, list.filter((id) => id !== nodeId));
+      }
+      if (next && next.intentType !== previous?.intentType) {
+        byType.set(next.intentType, [...(byType.get(next.intentType) ?? []), nodeId]);
+      }
+      typeIndexCache.version = this._version;
+    }
+
+    if (orderKept) orderCache!.version = this._version;
+    if (outputsIndexed) this.outputSetCache!.version = this._version;
+  }
+
+  /**
+   * Bump the version after an edit that leaves every edge and intent alone,
+   * keeping current indexes current
+   */
+  private touchKeepingIndexes(): void {
+    const consumersIndexed = this.consumersCache?.version === this._version;
+    const typesIndexed = this.typeIndexCache?.version === this._version;
+    this.touch();
+    if (consumersIndexed) this.consumersCache!.version = this._version;
+    if (typesIndexed) this.typeIndexCache!.version = this._version;
+  }
+
+  /**
+   * Whether a new `intentType` node reading `input` may absorb it: same
+   * per-element intent and nothing else consumes or outputs it yet.
+   */
+  private canFuseInto(input: IntentNode, intentType: IntentType): boolean {
+    return (
+      this.fusionEnabled &&
+      input.intentType === intentType &&
+      input.inputs.length === 1 &&
+      this.getConsumers(input.id).length === 0 &&
+      !this.isOutput(input.id)
+    );
+  }
+
+  /**
+   * Swap in an updated copy of an existing node. Nodes may be shared with
+   * forks, so edits replace them rather than changing them in place.
+   */
+  replaceNode(node: IntentNode): void {
+    const previous = this.nodes.get(node.id);
+    if (!previous) throw new Error(`Node not found: ${node.id}`);
+
+    this.nodes.set(node.id, node);
+    if (previous.inputs === node.inputs && previous.intentType === node.intentType) {
+      this.touchKeepingIndexes();
+    } else {
+      this.touchNode(node.id, previous, node);
+    }
+  }
+
+  /**
+   * Delete a node. Nodes that still read it are left dangling, so callers
+   * remove or rewire those too.
+   */
+  removeNode(nodeId: string): void {
+    const node = this.nodes.get(nodeId);
+    if (!node) return;
+
+    this.nodes.delete(nodeId);
+    this.touchNode(nodeId, node);
+  }
+
+  /**
+   * Replace the list of output nodes
+   */
+  setOutputs(outputIds: string[]): void {
+    this.outputs = outputIds;
+    this.touchKeepingIndexes();
+  }
+
   /**
    * Get a node by ID
    */
@@ -106,8 +330,8 @@ export class Graph {
       intentType: IntentType.INPUT,
       inputs: [],
       params: { name },
-      outputType: typeHint || new AnyType(),
-      metadata: {},
+      outputType: typeHint || ANY_TYPE,
+      metadata: NO_METADATA,
     };
     return this.addNode(node);
   }
@@ -122,7 +346,7 @@ export class Graph {
       inputs: [],
       params: { value },
       outputType: inferType(value),
-      metadata: {},
+      metadata: NO_METADATA,
     };
     return this.addNode(node);
   }
@@ -134,13 +358,22 @@ export class Graph {
     const input = this.getNode(inputNode);
     if (!input) throw new Error(`Node not found: ${inputNode}`);
 
+    let source = inputNode;
+    let test = predicate;
+    if (this.canFuseInto(input, IntentType.FILTER)) {
+      const first = input.params['predicate'] as (x: unknown) => boolean;
+      this.removeNode(input.id);
+      source = input.inputs[0]!;
+      test = (x: unknown) => first(x) && predicate(x);
+    }
+
     const node: IntentNode = {
       id: this.generateId('filter'),
       intentType: IntentType.FILTER,
-      inputs: [inputNode],
-      params: { predicate },
+      inputs: [source],
+      params: { predicate: test },
       outputType: input.outputType,
-      metadata: { parallelizable: true },
+      metadata: PARALLEL_METADATA,
     };
     return this.addNode(node);
   }
@@ -152,13 +385,22 @@ export class Graph {
     const input = this.getNode(inputNode);
     if (!input) throw new Error(`Node not found: ${inputNode}`);
 
+    let source = inputNode;
+    let apply = transform;
+    if (this.canFuseInto(input, IntentType.MAP)) {
+      const first = input.params['transform'] as (x: unknown) => unknown;
+      this.removeNode(input.id);
+      source = input.inputs[0]!;
+      apply = (x: unknown) => transform(first(x));
+    }
+
     const node: IntentNode = {
       id: this.generateId('map'),
       intentType: IntentType.MAP,
-      inputs: [inputNode],
-      params: { transform },
-      outputType: new AnyType(), // Could infer from transform
-      metadata: { parallelizable: true, vectorizable: true },
+      inputs: [source],
+      params: { transform: apply },
+      outputType: ANY_TYPE, // Could infer from transform
+      metadata: VECTOR_METADATA,
     };
     return this.addNode(node);
   }
@@ -179,8 +421,8 @@ export class Graph {
       intentType: IntentType.REDUCE,
       inputs: [inputNode],
       params: { operation, initial },
-      outputType: new AnyType(),
-      metadata: {},
+      outputType: ANY_TYPE,
+      metadata: NO_METADATA,
     };
     return this.addNode(node);
   }
@@ -198,7 +440,7 @@ export class Graph {
       inputs: [inputNode],
       params: { compareFn },
       outputType: input.outputType,
-      metadata: {},
+      metadata: NO_METADATA,
     };
     return this.addNode(node);
   }
@@ -215,8 +457,35 @@ export class Graph {
       intentType: IntentType.GROUP_BY,
       inputs: [inputNode],
       params: { keyFn },
-      outputType: new AnyType(), // Map<Key, List<Value>>
-      metadata: {},
+      outputType: ANY_TYPE, // Map<Key, List<Value>>
+      metadata: NO_METADATA,
+    };
+    return this.addNode(node);
+  }
+
+  /**
+   * Group elements by key and fold each group into named accumulators in a
+   * single pass, e.g. `{ total: { operation: (sum, s) => sum + s.price,
+   * initial: 0 }, count: { operation: (n) => n + 1, initial: 0 } }`. Unlike
+   * groupBy followed by per-group reductions, no per-group list is built and
+   * each element is visited once. The output is a Map from each key to a
+   * record of the accumulated values (see initialAccumulators).
+   */
+  aggregateBy(
+    inputNode: string,
+    keyFn: (x: unknown) => unknown,
+    aggregations: Record<string, Aggregation>
+  ): string {
+    const input = this.getNode(inputNode);
+    if (!input) throw new Error(`Node not found: ${inputNode}`);
+
+    const node: IntentNode = {
+      id: this.generateId('aggregate'),
+      intentType: IntentType.AGGREGATE_BY,
+      inputs: [inputNode],
+      params: { keyFn, aggregations },
+      outputType: ANY_TYPE, // Map<Key, Record<Name, Value>>
+      metadata: NO_METADATA,
     };
     return this.addNode(node);
   }
@@ -240,8 +509,8 @@ export class Graph {
       intentType: IntentType.JOIN,
       inputs: [leftNode, rightNode],
       params: { leftKey, rightKey },
-      outputType: new AnyType(),
-      metadata: {},
+      outputType: ANY_TYPE,
+      metadata: NO_METADATA,
     };
     return this.addNode(node);
   }
@@ -258,8 +527,8 @@ export class Graph {
       intentType: IntentType.FLATTEN,
       inputs: [inputNode],
       params: { depth },
-      outputType: new AnyType(),
-      metadata: {},
+      outputType: ANY_TYPE,
+      metadata: NO_METADATA,
     };
     return this.addNode(node);
   }
@@ -277,11 +546,31 @@ export class Graph {
       inputs: [inputNode],
       params: { keyFn },
       outputType: input.outputType,
-      metadata: {},
+      metadata: NO_METADATA,
     };
     return this.addNode(node);
   }
 
+  /**
+   * Memoize a node in compiled functions: while every input holds the same
+   * value (===) as on the previous call, the node returns its previous
+   * output instead of recomputing it. Suits expensive nodes (sort, groupBy,
+   * join) whose inputs stay fixed across calls. An input array mutated in
+   * place between calls is not noticed, and a memoized output returned
+   * to the caller is shared between calls.
+   */
+  memoize(nodeId: string): string {
+    const node = this.getNode(nodeId);
+    if (!node) throw new Error(`Node not found: ${nodeId}`);
+
+    if (!node.metadata.memoize) {
+      // Replaced rather than edited: nodes may be shared with forks
+      this.nodes.set(nodeId, { ...node, metadata: { ...node.metadata, memoize: true } });
+      this.touchKeepingIndexes();
+    }
+    return nodeId;
+  }
+
   /**
    * Mark node as output
    */
@@ -291,59 +580,198 @@ export class Graph {
 
     if (!this.outputs.includes(nodeId)) {
       this.outputs.push(nodeId);
+      this.touchKeepingIndexes();
     }
     return nodeId;
   }
 
   /**
-   * Get topological execution order
+   * Get topological execution order.
+   *
+   * Post-order DFS from the outputs, run with an explicit stack so long
+   * chains of nodes cannot overflow the call stack. The order matches a
+   * recursive walk: each node's inputs in declaration order, then the node.
+   *
+   * The result is cached until the graph version changes, so the returned
+   * array is shared and read-only.
    */
-  getExecutionOrder(): string[] {
+  getExecutionOrder(): readonly string[] {
+    if (this.executionOrderCache?.version === this._version) {
+      return this.executionOrderCache.order;
+    }
+
     const visited = new Set<string>();
     const order: string[] = [];
+    // Each frame is a node plus the index of the next input to visit
+    const stack: Array<{ id: string; inputs: string[]; next: number }> = [];
 
-    const visit = (nodeId: string) => {
+    const enter = (nodeId: string) => {
       if (visited.has(nodeId)) return;
       visited.add(nodeId);
 
       const node = this.getNode(nodeId);
       if (!node) return;
-
-      // Visit dependencies first
-      for (const inputId of node.inputs) {
-        visit(inputId);
-      }
-
-      order.push(nodeId);
+      stack.push({ id: nodeId, inputs: node.inputs, next: 0 });
     };
 
     // Start from outputs
     for (const outputId of this.outputs) {
-      visit(outputId);
+      enter(outputId);
+
+      while (stack.length > 0) {
+        const frame = stack[stack.length - 1]!;
+        if (frame.next < frame.inputs.length) {
+          // Visit dependencies first
+          enter(frame.inputs[frame.next++]!);
+        } else {
+          stack.pop();
+          order.push(frame.id);
+        }
+      }
     }
 
+    this.executionOrderCache = { version: this._version, order };
     return order;
   }
 
   /**
-   * Visualize graph as ASCII
+   * Ids of the nodes that contribute to an output: the execution order as a
+   * set. Cached with the order until the graph version changes.
+   */
+  getReachable(): ReadonlySet<string> {
+    const order = this.getExecutionOrder();
+    const cache = this.executionOrderCache!;
+    return (cache.reachable ??= new Set(order));
+  }
+
+  /**
+   * Ids of the nodes that take `nodeId` as an input. A node reading the
+   * same input twice is listed once.
+   *
+   * The reverse adjacency index is built in one pass over all edges, then
+   * patched by addNode/replaceNode/removeNode rather than rebuilt, so
+   * optimizer passes can query it after every rewrite. Editing `nodes`
+   * directly and calling touch() forces a rebuild. The returned array is
+   * shared and read-only.
+   */
+  getConsumers(nodeId: string): readonly string[] {
+    if (this.consumersCache?.version !== this._version) {
+      const consumers = new Map<string, string[]>();
+      for (const node of this.nodes.values()) {
+        for (const inputId of node.inputs) {
+          let list = consumers.get(inputId);
+          if (!list) {
+            list = [];
+            consumers.set(inputId, list);
+          }
+          if (list[list.length - 1] !== node.id) list.push(node.id);
+        }
+      }
+      this.consumersCache = { version: this._version, consumers };
+    }
+    return this.consumersCache.consumers.get(nodeId) ?? [];
+  }
+
+  /**
+   * Whether `nodeId` is an output, without scanning the output list. The
+   * set is kept across node edits, so passes can ask after every rewrite.
+   */
+  isOutput(nodeId: string): boolean {
+    if (this.outputSetCache?.version !== this._version) {
+      this.outputSetCache = { version: this._version, outputs: new Set(this.outputs) };
+    }
+    return this.outputSetCache.outputs.has(nodeId);
+  }
+
+  /**
+   * Ids of the nodes with the given intent, so passes that rewrite one
+   * kind of node need not scan the whole graph. Built in one pass and kept
+   * current by the graph's own edits like getConsumers; the returned array
+   * is shared and read-only.
+   */
+  getNodesOfType(intentType: IntentType): readonly string[] {
+    if (this.typeIndexCache?.version !== this._version) {
+      const byType = new Map<IntentType, string[]>();
+      for (const node of this.nodes.values()) {
+        const list = byType.get(node.intentType);
+        if (list) list.push(node.id);
+        else byType.set(node.intentType, [node.id]);
+      }
+      this.typeIndexCache = { version: this._version, byType };
+    }
+    return this.typeIndexCache.byType.get(intentType) ?? [];
+  }
+
+  /**
+   * Structural fingerprint of the graph: node ids, intents, inputs, params,
+   * output types, memoization and outputs, in insertion order. Callbacks are identified by
+   * identity, so clones share a fingerprint while graphs built from
+   * look-alike lambdas do not. Cached until the graph version changes.
+   */
+  fingerprint(): string {
+    if (this.fingerprintCache?.version === this._version) {
+      return this.fingerprintCache.fingerprint;
+    }
+
+    // JSON.stringify drops undefined and writes Maps and Sets as {}, so tag
+    // them explicitly to keep graphs that differ only in such values apart
+    const replacer = (_key: string, value: unknown) => {
+      if (typeof value === 'function') return `fn#${callbackId(value)}`;
+      if (value === undefined) return 'undefined#';
+      if (value instanceof Map) return { $map: [...value] };
+      if (value instanceof Set) return { $set: [...value] };
+      return value;
+    };
+
+    const hash = createHash('sha1');
+    for (const node of this.nodes.values()) {
+      let params: string;
+      try {
+        params = JSON.stringify(node.params, replacer);
+      } catch {
+        // Unserializable params (cycles, bigints) never match another graph
+        params = `unique#${nextCallbackId++}`;
+      }
+      hash.update(
+        JSON.stringify([
+          node.id,
+          node.intentType,
+          node.inputs,
+          params,
+          node.outputType.toString(),
+          node.metadata.memoize === true,
+        ])
+      );
+      hash.update('\n');
+    }
+    hash.update(JSON.stringify(this.outputs));
+
+    const fingerprint = hash.digest('hex');
+    this.fingerprintCache = { version: this._version, fingerprint };
+    return fingerprint;
+  }
+
+  /**
+   * Visualize graph as ASCII.
+   *
+   * Ids are printed in full: builder ids are short, and their unique part
+   * is the counter at the end, which truncation would cut off.
    */
   visualize(): string {
     const lines: string[] = ['Intent Graph:'];
-    const order = this.getExecutionOrder();
 
-    for (const nodeId of order) {
-      const node = this.getNode(nodeId);
+    for (const nodeId of this.getExecutionOrder()) {
+      const node = this.nodes.get(nodeId);
       if (!node) continue;
 
-      const shortId = nodeId.slice(0, 12);
-      const inputs = node.inputs.map((id) => id.slice(0, 12)).join(', ');
-      const inputsStr = inputs ? ` <- [${inputs}]` : '';
-
-      lines.push(`  ${shortId}: ${node.intentType}${inputsStr}`);
+      lines.push(
+        node.inputs.length > 0
+          ? `  ${nodeId}: ${node.intentType} <- [${node.inputs.join(', ')}]`
+          : `  ${nodeId}: ${node.intentType}`
+      );
     }
 
-    lines.push(`Outputs: ${this.outputs.map((id) => id.slice(0, 12)).join(', ')}`);
+    lines.push(`Outputs: ${this.outputs.join(', ')}`);
 
     return lines.join('\n');
   }
@@ -362,17 +790,35 @@ export class Graph {
         inputs: [...node.inputs],
         params: { ...node.params },
         outputType: node.outputType,
-        metadata: { ...node.metadata },
+        metadata: Object.isFrozen(node.metadata) ? node.metadata : { ...node.metadata },
       };
       cloned.nodes.set(id, clonedNode);
     }
 
     // Clone outputs
     cloned.outputs = [...this.outputs];
+    cloned.nodeCounter = this.nodeCounter;
+    cloned.fusionEnabled = this.fusionEnabled;
 
     return cloned;
   }
 
+  /**
+   * Copy the graph while sharing its node objects.
+   *
+   * Much cheaper than clone() for large graphs, but the copy and the original
+   * see the same nodes: change a node in either graph by replacing it in
+   * `nodes`, never by editing it in place. GraphOptimizer follows this rule.
+   */
+  fork(): Graph {
+    const forked = new Graph();
+    forked.nodes = new Map(this.nodes);
+    forked.outputs = [...this.outputs];
+    forked.nodeCounter = this.nodeCounter;
+    forked.fusionEnabled = this.fusionEnabled;
+    return forked;
+  }
+
   /**
    * Apply graph optimizations.
    *
@@ -1,10 +1,117 @@
 // Graph Optimizer - Performs optimization passes on intent graphs
 
 import { Graph, IntentNode, IntentType } from './graph';
+import { getInlineSource } from '../dsl/compiler';
+
+// CSE signature prefix for constants whose values have an exact key
+const EXACT_CONSTANT = 'constant:';
+
+// Upper bound on rounds of the pass list while looking for a fixpoint
+const MAX_ROUNDS = 4;
+
+// CSE signatures by node. Passes swap in a new node object instead of editing
+// one in place, so an entry can never go stale, and re-runs (or forks sharing
+// nodes) skip re-sorting params and re-stringifying callbacks.
+const signatureCache = new WeakMap<IntentNode, string>();
+
+// Source text of callbacks. Large graphs tend to pass the same closure to
+// many nodes, and CSE would otherwise re-stringify it for each one.
+const functionSources = new WeakMap<Function, string>();
+
+// filter_before_map verdicts by transform, then predicate. The fixpoint
+// rounds and the worklist revisit the same pairs, and sampling calls user code.
+const independenceVerdicts = new WeakMap<Function, WeakMap<Function, boolean>>();
+
+function functionSource(fn: Function): string {
+  let source = functionSources.get(fn);
+  if (source === undefined) {
+    source = fn.toString();
+    functionSources.set(fn, source);
+  }
+  return source;
+}
+
+// Longest chain given a generated straight-line callback; longer ones loop
+const MAX_SPECIALIZED_CALLBACKS = 16;
+
+// Generated callback factories, by kind and chain length
+const callbackFactories = new Map<string, Function>();
+
+/**
+ * Build a callback over `fns` from a generated body, so each call is a
+ * fixed sequence of direct calls with no loop or array reads. The source
+ * only names the parameters p0..pN, and one factory serves every chain of
+ * the same kind and length.
+ */
+function specialize(kind: string, fns: Function[], body: (names: string[]) => string): any {
+  const key = `${kind}:${fns.length}`;
+  let factory = callbackFactories.get(key);
+  if (!factory) {
+    const names = fns.map((_, i) => `p${i}`);
+    // eslint-disable-next-line no-new-func
+    factory = new Function(...names, `return (x) => ${body(names)}`);
+    callbackFactories.set(key, factory);
+  }
+  return factory(...fns);
+}
+
+/**
+ * One predicate checking every predicate in turn
+ */
+function allOf(predicates: Function[]): (x: any) => boolean {
+  if (predicates.length > 0 && predicates.length <= MAX_SPECIALIZED_CALLBACKS) {
+    return specialize(
+      'allOf',
+      predicates,
+      (names) => `!!(${names.map((name) => `${name}(x)`).join(' && ')})`
+    );
+  }
+  return (x: any) => {
+    for (const predicate of predicates) {
+      if (!predicate(x)) return false;
+    }
+    return true;
+  };
+}
+
+/**
+ * One transform applying every transform in order
+ */
+function applyAll(transforms: Function[]): (x: any) => any {
+  if (transforms.length > 0 && transforms.length <= MAX_SPECIALIZED_CALLBACKS) {
+    return specialize('applyAll', transforms, (names) =>
+      names.reduce((arg, name) => `${name}(${arg})`, 'x')
+    );
+  }
+  return (x: any) => {
+    for (const transform of transforms) {
+      x = transform(x);
+    }
+    return x;
+  };
+}
+
+/**
+ * One pass's changes to the graph, as recorded for the optimization report
+ */
+export interface AppliedOptimization {
+  pass: string;
+  count: number;
+}
+
+// How each pass's changes read in the report
+const REPORT_LINES: Record<string, (count: number) => string> = {
+  dead_code_elimination: (count) => `removed ${count} nodes`,
+  common_subexpression_elimination: (count) => `deduplicated ${count} nodes`,
+  filter_fusion: (count) => `fused ${count} filter pairs`,
+  map_fusion: (count) => `fused ${count} map pairs`,
+  filter_before_map: (count) => `reordered ${count} operations`,
+  filter_map_fusion: (count) => `merged ${count} filter/map pairs`,
+};
 
 export class GraphOptimizer {
   private graph: Graph;
-  private optimizationsApplied: string[] = [];
+  private optimizationsApplied: AppliedOptimization[] = [];
 
   constructor(graph: Graph) {
     this.graph = graph;
@@ -19,125 +126,160 @@ export class GraphOptimizer {
    * - filter_fusion: Combine adjacent filters
    * - map_fusion: Combine adjacent maps
    * - filter_before_map: Reorder filter before map when beneficial
+   * - filter_map_fusion: Merge a map into the filter it reads
+   *
+   * Without an explicit list, DCE runs once, then CSE and the last four
+   * (applied together by a single worklist walk, see rewriteLocally) repeat.
+   *
+   * Each pass reports whether it changed the graph, and the list is run
+   * again while any did, up to MAX_ROUNDS times, since one pass can expose
+   * work for another (a reorder creating a map -> map pair, or CSE merging
+   * inputs so their consumers become duplicates).
+   *
+   * Every change bumps the graph version, so orders and indexes the graph
+   * caches stay valid from one pass to the next.
    */
   optimize(passes?: string[]): Graph {
-    const defaultPasses = [
-      'dead_code_elimination',
-      'common_subexpression_elimination',
-      'filter_fusion',
-      'map_fusion',
-      'filter_before_map',
-    ];
+    if (!passes) {
+      this.deadCodeElimination();
+      for (let round = 0; round < MAX_ROUNDS; round++) {
+        const deduplicated = this.commonSubexpressionElimination();
+        if (!this.rewriteLocally() && !deduplicated) break;
+      }
+      return this.graph;
+    }
 
-    const passesToRun = passes || defaultPasses;
-
-    for (const passName of passesToRun) {
-      switch (passName) {
-        case 'dead_code_elimination':
-          this.deadCodeElimination();
-          break;
-        case 'common_subexpression_elimination':
-          this.commonSubexpressionElimination();
-          break;
-        case 'filter_fusion':
-          this.filterFusion();
-          break;
-        case 'map_fusion':
-          this.mapFusion();
-          break;
-        case 'filter_before_map':
-          this.filterBeforeMap();
-          break;
-        default:
-          throw new Error(`Unknown optimization pass: ${passName}`);
+    for (let round = 0; round < MAX_ROUNDS; round++) {
+      let changed = false;
+      for (const passName of passes) {
+        if (this.runPass(passName)) changed = true;
       }
+      if (!changed) break;
     }
 
     return this.graph;
   }
 
   /**
-   * Remove nodes that don't contribute to outputs
+   * Run one named pass, returning whether it changed the graph
    */
-  private deadCodeElimination(): void {
-    const reachable = new Set<string>();
-
-    const markReachable = (nodeId: string) => {
-      if (reachable.has(nodeId)) return;
-      reachable.add(nodeId);
-
-      const node = this.graph.nodes.get(nodeId);
-      if (node) {
-        for (const inputId of node.inputs) {
-          markReachable(inputId);
-        }
-      }
-    };
-
-    // Start from outputs
-    for (const outputId of this.graph.outputs) {
-      markReachable(outputId);
+  private runPass(passName: string): boolean {
+    switch (passName) {
+      case 'dead_code_elimination':
+        return this.deadCodeElimination();
+      case 'common_subexpression_elimination':
+        return this.commonSubexpressionElimination();
+      case 'filter_fusion':
+        return this.filterFusion();
+      case 'map_fusion':
+        return this.mapFusion();
+      case 'filter_before_map':
+        return this.filterBeforeMap();
+      case 'filter_map_fusion':
+        return this.filterMapFusion();
+      default:
+        throw new Error(`Unknown optimization pass: ${passName}`);
     }
+  }
+
+  /**
+   * Remove nodes that don't contribute to outputs
+   */
+  private deadCodeElimination(): boolean {
+    // Every node in the execution order feeds an output, and the order only
+    // lists existing nodes, so equal sizes mean nothing is dead. That check
+    // costs nothing once the graph has cached the order.
+    if (this.graph.getExecutionOrder().length === this.graph.nodes.size) return false;
+    const reachable = this.graph.getReachable();
 
     // Remove unreachable nodes
-    const allNodes = new Set(this.graph.nodes.keys());
-    const deadNodes = new Set([...allNodes].filter((id) => !reachable.has(id)));
+    const deadNodes: string[] = [];
+    for (const nodeId of this.graph.nodes.keys()) {
+      if (!reachable.has(nodeId)) deadNodes.push(nodeId);
+    }
 
-    if (deadNodes.size > 0) {
-      for (const nodeId of deadNodes) {
-        this.graph.nodes.delete(nodeId);
-      }
-      this.optimizationsApplied.push(`dead_code_elimination: removed ${deadNodes.size} nodes`);
+    for (const nodeId of deadNodes) {
+      this.graph.removeNode(nodeId);
     }
+    this.optimizationsApplied.push({ pass: 'dead_code_elimination', count: deadNodes.length });
+    return true;
   }
 
   /**
    * Eliminate duplicate computations by reusing identical nodes
    */
-  private commonSubexpressionElimination(): void {
+  private commonSubexpressionElimination(): boolean {
     let changesMade = 0;
     const nodeToCanonical = new Map<string, string>();
 
     // Create a hashable signature for a node
-    const getNodeSignature = (node: IntentNode): string => {
-      const inputsTuple = JSON.stringify(node.inputs);
+    const computeNodeSignature = (node: IntentNode): string => {
+      // Plain constant values key exactly, so their groups need no checking
+      if (node.intentType === IntentType.CONSTANT) {
+        const valueKey = this.constantKey(node.params['value']);
+        if (valueKey !== undefined) return `${EXACT_CONSTANT}${valueKey}`;
+      }
 
-      // Sort params for consistent signature
-      const paramSig: Array<[string, any]> = [];
-      for (const key of Object.keys(node.params).sort()) {
-        const value = node.params[key];
-        if (typeof value === 'function') {
+      // Sort params for consistent signature (keys are unique, so comparing
+      // them alone orders the entries)
+      const paramSig = Object.entries(node.params)
+        .sort(([a], [b]) => (a < b ? -1 : 1))
+        .map(([key, value]): [string, unknown] =>
           // For functions, we use their string representation
           // This is conservative but safer than id comparison
-          paramSig.push([key, value.toString()]);
-        } else {
-          paramSig.push([key, value]);
-        }
-      }
+          [key, typeof value === 'function' ? functionSource(value) : value]
+        );
+
+      return JSON.stringify([node.intentType, node.inputs, paramSig]);
+    };
 
-      return JSON.stringify([node.intentType, inputsTuple, paramSig]);
+    const getNodeSignature = (node: IntentNode): string => {
+      let sig = signatureCache.get(node);
+      if (sig === undefined) {
+        sig = computeNodeSignature(node);
+        signatureCache.set(node, sig);
+      }
+      return sig;
     };
 
+    // Group by intent and inputs first: duplicates always share both, so a
+    // node alone in its group never needs its full signature (sorted params,
+    // callback sources) built at all
+    const candidates = new Map<string, IntentNode[]>();
+    for (const node of this.graph.nodes.values()) {
+      const key = `${node.intentType}\0${node.inputs.join('\0')}`;
+      const group = candidates.get(key);
+      if (group) group.push(node);
+      else candidates.set(key, [node]);
+    }
+
     // Build signature map
     const signatureToNodes = new Map<string, string[]>();
-    for (const [nodeId, node] of this.graph.nodes.entries()) {
-      const sig = getNodeSignature(node);
-      if (!signatureToNodes.has(sig)) {
-        signatureToNodes.set(sig, []);
+    for (const candidateGroup of candidates.values()) {
+      if (candidateGroup.length < 2) continue;
+      for (const node of candidateGroup) {
+        const sig = getNodeSignature(node);
+        const group = signatureToNodes.get(sig);
+        if (group) group.push(node.id);
+        else signatureToNodes.set(sig, [node.id]);
       }
-      signatureToNodes.get(sig)!.push(nodeId);
     }
 
     // For each group with identical signatures, keep one and redirect others
-    for (const [_sig, nodeIds] of signatureToNodes.entries()) {
+    for (const [sig, nodeIds] of signatureToNodes.entries()) {
       if (nodeIds.length > 1) {
         const canonicalId = nodeIds[0];
         if (!canonicalId) continue;
         const canonicalNode = this.graph.nodes.get(canonicalId)!;
 
-        // For constant nodes, we can safely deduplicate only if values are serializable
-        // (no functions, which can't be reliably compared)
-        if (canonicalNode.intentType === IntentType.CONSTANT) {
+        if (sig.startsWith(EXACT_CONSTANT)) {
+          for (const dupId of nodeIds.slice(1)) {
+            nodeToCanonical.set(dupId, canonicalId);
+            changesMade++;
+          }
+        } else if (canonicalNode.intentType === IntentType.CONSTANT) {
+          // Values without an exact key (dates, NaN, ...) are compared, and
+          // only if serializable (no functions, which can't be reliably compared)
           const canonicalValue = canonicalNode.params['value'];
           if (this.isSerializable(canonicalValue)) {
             for (const dupId of nodeIds.slice(1)) {
@@ -166,121 +308,213 @@ export class GraphOptimizer {
     }
 
     if (changesMade > 0) {
-      // Redirect all references from duplicate nodes to canonical nodes
-      for (const [_nodeId, node] of this.graph.nodes.entries()) {
-        node.inputs = node.inputs.map((inputId) => nodeToCanonical.get(inputId) || inputId);
+      // Redirect all references from duplicate nodes to canonical nodes. Only
+      // their consumers need visiting, so look those up in the graph's index
+      // (collected first, since each update edits the index)
+      const consumerIds = new Set<string>();
+      for (const dupId of nodeToCanonical.keys()) {
+        for (const consumerId of this.graph.getConsumers(dupId)) consumerIds.add(consumerId);
+      }
+      for (const nodeId of consumerIds) {
+        const node = this.graph.nodes.get(nodeId)!;
+        this.updateNode(nodeId, {
+          inputs: node.inputs.map((inputId) => nodeToCanonical.get(inputId) || inputId),
+        });
       }
 
-      // Update outputs
-      const newOutputs: string[] = [];
-      for (const outputId of this.graph.outputs) {
-        const canonical = nodeToCanonical.get(outputId) || outputId;
-        if (!newOutputs.includes(canonical)) {
-          newOutputs.push(canonical);
+      // Update outputs, only if one of them was a duplicate
+      if (this.graph.outputs.some((outputId) => nodeToCanonical.has(outputId))) {
+        const newOutputs = new Set<string>();
+        for (const outputId of this.graph.outputs) {
+          newOutputs.add(nodeToCanonical.get(outputId) || outputId);
         }
+        this.graph.setOutputs([...newOutputs]);
       }
-      this.graph.outputs = newOutputs;
 
-      this.optimizationsApplied.push(
-        `common_subexpression_elimination: deduplicated ${changesMade} nodes`
-      );
+      this.optimizationsApplied.push({
+        pass: 'common_subexpression_elimination',
+        count: changesMade,
+      });
 
-      // Run dead code elimination to remove unused duplicates
-      this.deadCodeElimination();
+      // Every use of a duplicate now reads its canonical node, so drop the
+      // duplicates (and inputs only they used) directly rather than walking
+      // the whole graph for dead nodes
+      for (const dupId of nodeToCanonical.keys()) this.removeIfUnused(dupId);
     }
+    return changesMade > 0;
   }
 
   /**
-   * Combine adjacent filter operations into a single filter
+   * Collapse each chain of adjacent filters into one filter that checks
+   * every predicate in a single flat loop
    */
-  private filterFusion(): void {
+  private filterFusion(): boolean {
+    // Chains are walked in the graph as it was before this pass, so a filter
+    // rewritten earlier in the loop is never folded in a second time
+    const original = this.snapshotNodesOfType(IntentType.FILTER);
     let changesMade = 0;
-    const fusedNodes = new Set<string>();
 
-    // Find filter -> filter chains
-    for (const [nodeId, node] of Array.from(this.graph.nodes.entries())) {
-      if (node.intentType !== IntentType.FILTER) continue;
-      if (fusedNodes.has(nodeId)) continue;
-      if (node.inputs.length === 0) continue;
+    for (const nodeId of this.fusionChainEnds(original)) {
+      const { source, chain } = this.walkFusionChain(original, nodeId);
+      if (chain.length === 1) continue;
+      const predicates = chain.flatMap((node) => this.components(node, 'predicate'));
+
+      this.updateNode(nodeId, {
+        inputs: [source],
+        // The components are kept so code generators can call each directly
+        params: { ...original.get(nodeId)!.params, predicate: allOf(predicates), predicates },
+      });
+      this.removeIfUnused(original.get(nodeId)!.inputs[0]!);
+      changesMade += chain.length - 1;
+    }
 
-      const inputId = node.inputs[0];
-      if (!inputId) continue;
+    if (changesMade > 0) {
+      this.optimizationsApplied.push({ pass: 'filter_fusion', count: changesMade });
+    }
+    return changesMade > 0;
+  }
 
-      const inputNode = this.graph.nodes.get(inputId);
-      if (!inputNode || inputNode.intentType !== IntentType.FILTER) continue;
-      if (fusedNodes.has(inputId)) continue;
+  /**
+   * The current nodes of one intent, by id
+   */
+  private snapshotNodesOfType(intentType: IntentType): Map<string, IntentNode> {
+    const snapshot = new Map<string, IntentNode>();
+    for (const nodeId of this.graph.getNodesOfType(intentType)) {
+      snapshot.set(nodeId, this.graph.nodes.get(nodeId)!);
+    }
+    return snapshot;
+  }
 
-      // Fuse the two filters
-      const pred1 = inputNode.params['predicate'] as Function;
-      const pred2 = node.params['predicate'] as Function;
+  /**
+   * Delete a node a fusion just bypassed if nothing uses it any more, then
+   * its inputs in turn, instead of sweeping the whole graph for dead nodes
+   */
+  private removeIfUnused(nodeId: string): void {
+    const pending = [nodeId];
+    while (pending.length > 0) {
+      const id = pending.pop()!;
+      const node = this.graph.nodes.get(id);
+      if (!node || this.countConsumers(id) > 0) continue;
+
+      this.graph.removeNode(id);
+      pending.push(...node.inputs);
+    }
+  }
 
-      // Create combined predicate
-      const combinedPred = (x: any) => pred1(x) && pred2(x);
+  /**
+   * Nodes of a snapshot (all of one intent) that read another node of the
+   * snapshot and end a chain: a node whose only use is the next node of the
+   * chain is folded into it rather than rewritten itself
+   */
+  private fusionChainEnds(original: Map<string, IntentNode>): string[] {
+    const inChain = (id: string | undefined) => id !== undefined && original.has(id);
 
-      // Update current node to use combined predicate and skip input_node
-      node.params['predicate'] = combinedPred;
-      node.inputs = [...inputNode.inputs];
+    const ends: string[] = [];
+    for (const [nodeId, node] of original) {
+      if (!inChain(node.inputs[0])) continue;
 
-      fusedNodes.add(inputId);
-      changesMade++;
+      const consumers = this.graph.getConsumers(nodeId);
+      const absorbed =
+        consumers.length === 1 && inChain(consumers[0]) && !this.graph.isOutput(nodeId);
+      if (!absorbed) ends.push(nodeId);
     }
+    return ends;
+  }
 
-    if (changesMade > 0) {
-      this.optimizationsApplied.push(`filter_fusion: fused ${changesMade} filter pairs`);
-      this.deadCodeElimination();
+  /**
+   * Walk up from `nodeId` through inputs in the snapshot, returning the
+   * chain's nodes from the source end down and the node feeding the chain.
+   * The walk stops at an input something else also reads: folding it in
+   * would make every reader recompute it instead of sharing its result.
+   */
+  private walkFusionChain(
+    original: Map<string, IntentNode>,
+    nodeId: string
+  ): { source: string; chain: IntentNode[] } {
+    const end = original.get(nodeId)!;
+    const chain = [end];
+    let source = end.inputs[0]!;
+    let input = original.get(source);
+    while (input && this.countConsumers(source) === 1) {
+      chain.push(input);
+      source = input.inputs[0]!;
+      input = original.get(source);
     }
+    return { source, chain: chain.reverse() };
   }
 
   /**
-   * Combine adjacent map operations into a single map
+   * Collapse each chain of adjacent maps into one map that applies every
+   * transform in a single flat loop
    */
-  private mapFusion(): void {
+  private mapFusion(): boolean {
+    // Walked in the pre-pass graph, as in filterFusion
+    const original = this.snapshotNodesOfType(IntentType.MAP);
     let changesMade = 0;
-    const fusedNodes = new Set<string>();
-
-    // Find map -> map chains
-    for (const [nodeId, node] of Array.from(this.graph.nodes.entries())) {
-      if (node.intentType !== IntentType.MAP) continue;
-      if (fusedNodes.has(nodeId)) continue;
-      if (node.inputs.length === 0) continue;
-
-      const inputId = node.inputs[0];
-      if (!inputId) continue;
 
-      const inputNode = this.graph.nodes.get(inputId);
-      if (!inputNode || inputNode.intentType !== IntentType.MAP) continue;
-      if (fusedNodes.has(inputId)) continue;
-
-      // Fuse the two maps
-      const transform1 = inputNode.params['transform'] as Function;
-      const transform2 = node.params['transform'] as Function;
+    for (const nodeId of this.fusionChainEnds(original)) {
+      const { source, chain } = this.walkFusionChain(original, nodeId);
+      if (chain.length === 1) continue;
+      const transforms = chain.flatMap((node) => this.components(node, 'transform'));
+
+      this.updateNode(nodeId, {
+        inputs: [source],
+        params: { ...original.get(nodeId)!.params, transform: applyAll(transforms), transforms },
+      });
+      this.removeIfUnused(original.get(nodeId)!.inputs[0]!);
+      changesMade += chain.length - 1;
+    }
 
-      // Create composed transformation: f(g(x))
-      const composedTransform = (x: any) => transform2(transform1(x));
+    if (changesMade > 0) {
+      this.optimizationsApplied.push({ pass: 'map_fusion', count: changesMade });
+    }
+    return changesMade > 0;
+  }
 
-      // Update current node to use composed transform and skip input_node
-      node.params['transform'] = composedTransform;
-      node.inputs = [...inputNode.inputs];
+  /**
+   * Merge each map that reads a filter nothing else uses into one FILTER_MAP
+   * node, so the filtered list is never materialized
+   */
+  private filterMapFusion(): boolean {
+    let changesMade = 0;
 
-      fusedNodes.add(inputId);
+    for (const mapId of this.graph.getNodesOfType(IntentType.MAP)) {
+      const mapNode = this.graph.nodes.get(mapId)!;
+      const filterId = mapNode.inputs[0];
+      if (!filterId || mapNode.inputs.length !== 1) continue;
+
+      const filterNode = this.graph.nodes.get(filterId);
+      if (!filterNode || filterNode.intentType !== IntentType.FILTER) continue;
+      if (this.countConsumers(filterId) !== 1) continue;
+
+      // Keeps the map's id, so its consumers and outputs need no rewiring.
+      // Fused component lists (predicates/transforms) carry over too.
+      this.updateNode(mapId, {
+        intentType: IntentType.FILTER_MAP,
+        inputs: [...filterNode.inputs],
+        params: { ...filterNode.params, ...mapNode.params },
+      });
+      this.graph.removeNode(filterId);
       changesMade++;
     }
 
     if (changesMade > 0) {
-      this.optimizationsApplied.push(`map_fusion: fused ${changesMade} map pairs`);
-      this.deadCodeElimination();
+      this.optimizationsApplied.push({ pass: 'filter_map_fusion', count: changesMade });
     }
+    return changesMade > 0;
   }
 
   /**
    * Reorder operations to push filters before maps when beneficial
    */
-  private filterBeforeMap(): void {
+  private filterBeforeMap(): boolean {
     let changesMade = 0;
 
     // Find map -> filter patterns
-    for (const [filterId, filterNode] of Array.from(this.graph.nodes.entries())) {
-      if (filterNode.intentType !== IntentType.FILTER) continue;
+    for (const filterId of this.graph.getNodesOfType(IntentType.FILTER)) {
+      // Earlier reorders may have replaced this node, so read the current one
+      const filterNode = this.graph.nodes.get(filterId);
+      if (!filterNode || filterNode.intentType !== IntentType.FILTER) continue;
       if (filterNode.inputs.length !== 1) continue;
 
       const mapId = filterNode.inputs[0];
@@ -299,38 +533,191 @@ export class GraphOptimizer {
 
       // Test if predicate is independent of transformation
       if (this.isPredicateIndependent(transform, predicate)) {
-        // Reorder: source -> filter(p) -> map(f)
+        this.moveFilterAboveMap(filterId, mapId, mapNode);
+        changesMade++;
+      }
+    }
 
-        // Update filter to take map's input
-        filterNode.inputs = [...mapNode.inputs];
+    if (changesMade > 0) {
+      this.optimizationsApplied.push({ pass: 'filter_before_map', count: changesMade });
+    }
+    return changesMade > 0;
+  }
 
-        // Update map to take filter's output
-        mapNode.inputs = [filterId];
+  /**
+   * Reorder source -> map(f) -> filter(p) into source -> filter(p) -> map(f).
+   * The map takes over the filter's consumers and output slot.
+   */
+  private moveFilterAboveMap(filterId: string, mapId: string, mapNode: IntentNode): void {
+    const filterConsumers = this.graph.getConsumers(filterId);
+
+    // Update filter to take map's input
+    this.updateNode(filterId, { inputs: [...mapNode.inputs] });
+
+    // Update map to take filter's output
+    this.updateNode(mapId, { inputs: [filterId] });
+
+    // Update any consumers of filter to consume map instead
+    for (const nId of filterConsumers) {
+      const n = this.graph.nodes.get(nId);
+      if (!n || nId === mapId) continue;
+      this.updateNode(nId, {
+        inputs: n.inputs.map((inp) => (inp === filterId ? mapId : inp)),
+      });
+    }
 
-        // Update any consumers of filter to consume map instead
-        for (const [nId, n] of this.graph.nodes.entries()) {
-          if (nId === mapId) continue;
-          n.inputs = n.inputs
-            .map((inp) => (inp === filterId ? mapId : inp))
-            .filter((x): x is string => x !== undefined);
-        }
+    // Update outputs
+    this.graph.setOutputs(this.graph.outputs.map((out) => (out === filterId ? mapId : out)));
+  }
 
-        // Update outputs
-        this.graph.outputs = this.graph.outputs
-          .map((out) => (out === filterId ? mapId : out))
-          .filter((x): x is string => x !== undefined);
+  /**
+   * Filter fusion, map fusion, filter-before-map and filter/map fusion in
+   * one worklist walk, for the default pipeline.
+   *
+   * Nodes are visited in execution order. A node reading an input nothing
+   * else uses gets the first rule that applies:
+   * - filter <- filter, map <- map: fused into one flat-loop node
+   * - map <- filter_map: the transform joins the FILTER_MAP
+   * - map <- filter: merged into a FILTER_MAP
+   * - filter <- map, predicate independent of the transform: reordered
+   * A rewritten node and its consumers are queued again, so only the
+   * neighbourhood of a change is revisited, and absorbed inputs are removed
+   * on the spot instead of by a DCE sweep after each pass.
+   */
+  private rewriteLocally(): boolean {
+    let filtersFused = 0;
+    let mapsFused = 0;
+    let filterMapsFused = 0;
+    let reordered = 0;
+
+    const queue = [...this.graph.getExecutionOrder()];
+    const queued = new Set(queue);
+    const enqueue = (nodeId: string) => {
+      if (!queued.has(nodeId)) {
+        queued.add(nodeId);
+        queue.push(nodeId);
+      }
+    };
 
-        changesMade++;
+    for (let head = 0; head < queue.length; head++) {
+      const nodeId = queue[head]!;
+      queued.delete(nodeId);
+
+      const node = this.graph.nodes.get(nodeId);
+      const inputId = node?.inputs[0];
+      if (!node || !inputId || node.inputs.length !== 1) continue;
+      const input = this.graph.nodes.get(inputId);
+      if (!input || this.countConsumers(inputId) !== 1) continue;
+
+      if (node.intentType === IntentType.FILTER && input.intentType === IntentType.FILTER) {
+        const predicates = [
+          ...this.components(input, 'predicate'),
+          ...this.components(node, 'predicate'),
+        ];
+        this.graph.removeNode(inputId);
+        this.updateNode(nodeId, {
+          inputs: [...input.inputs],
+          params: { ...node.params, predicate: allOf(predicates), predicates },
+        });
+        filtersFused++;
+      } else if (
+        node.intentType === IntentType.MAP &&
+        (input.intentType === IntentType.MAP || input.intentType === IntentType.FILTER_MAP)
+      ) {
+        const transforms = [
+          ...this.components(input, 'transform'),
+          ...this.components(node, 'transform'),
+        ];
+        this.graph.removeNode(inputId);
+        this.updateNode(nodeId, {
+          intentType: input.intentType,
+          inputs: [...input.inputs],
+          params: { ...input.params, ...node.params, transform: applyAll(transforms), transforms },
+        });
+        mapsFused++;
+      } else if (node.intentType === IntentType.MAP && input.intentType === IntentType.FILTER) {
+        this.graph.removeNode(inputId);
+        this.updateNode(nodeId, {
+          intentType: IntentType.FILTER_MAP,
+          inputs: [...input.inputs],
+          params: { ...input.params, ...node.params },
+        });
+        filterMapsFused++;
+      } else if (
+        node.intentType === IntentType.FILTER &&
+        input.intentType === IntentType.MAP &&
+        typeof input.params['transform'] === 'function' &&
+        typeof node.params['predicate'] === 'function' &&
+        this.isPredicateIndependent(
+          input.params['transform'] as Function,
+          node.params['predicate'] as Function
+        )
+      ) {
+        this.moveFilterAboveMap(nodeId, inputId, input);
+        // The map now reads the filter and took over its consumers
+        enqueue(inputId);
+        for (const consumerId of this.graph.getConsumers(inputId)) enqueue(consumerId);
+        reordered++;
+      } else {
+        continue;
       }
+
+      enqueue(nodeId);
+      for (const consumerId of this.graph.getConsumers(nodeId)) enqueue(consumerId);
     }
 
-    if (changesMade > 0) {
-      this.optimizationsApplied.push(`filter_before_map: reordered ${changesMade} operations`);
+    if (filtersFused > 0) {
+      this.optimizationsApplied.push({ pass: 'filter_fusion', count: filtersFused });
     }
+    if (mapsFused > 0) {
+      this.optimizationsApplied.push({ pass: 'map_fusion', count: mapsFused });
+    }
+    if (reordered > 0) {
+      this.optimizationsApplied.push({ pass: 'filter_before_map', count: reordered });
+    }
+    if (filterMapsFused > 0) {
+      this.optimizationsApplied.push({ pass: 'filter_map_fusion', count: filterMapsFused });
+    }
+    return filtersFused + mapsFused + reordered + filterMapsFused > 0;
+  }
+
+  /**
+   * A fused node's component callbacks (`predicates`/`transforms`), or its
+   * single predicate or transform
+   */
+  private components(node: IntentNode, key: 'predicate' | 'transform'): Function[] {
+    const list = node.params[`${key}s`];
+    return Array.isArray(list) ? list : [node.params[key] as Function];
+  }
+
+  /**
+   * Test if a predicate is independent of a transformation.
+   *
+   * Callbacks from the safe DSL compiler are decided from their source, with
+   * no calls: an identity transform changes nothing, and a predicate whose
+   * source is the same whatever its input is named never reads it. Other
+   * pairs are sampled once and the verdict is reused.
+   */
+  private isPredicateIndependent(transform: Function, predicate: Function): boolean {
+    if (getInlineSource(transform, 'x') === 'x') return true;
+    const source = getInlineSource(predicate, '_a');
+    if (source !== undefined && source === getInlineSource(predicate, '_b')) return true;
+
+    let verdicts = independenceVerdicts.get(transform);
+    if (!verdicts) {
+      verdicts = new WeakMap();
+      independenceVerdicts.set(transform, verdicts);
+    }
+    let verdict = verdicts.get(predicate);
+    if (verdict === undefined) {
+      verdict = this.sampleIndependence(transform, predicate);
+      verdicts.set(predicate, verdict);
+    }
+    return verdict;
   }
 
   /**
-   * Test if a predicate is independent of a transformation
+   * Test independence on sample data
    *
    * This method uses test cases to determine if a predicate can be safely
    * applied before or after a transformation. It checks if:
@@ -351,7 +738,7 @@ export class GraphOptimizer {
    * Users can bypass this check by manually reordering operations in their
    * graph construction if they know their predicate is independent.
    */
-  private isPredicateIndependent(transform: Function, predicate: Function): boolean {
+  private sampleIndependence(transform: Function, predicate: Function): boolean {
     const testCases = [
       [1, 2, 3, 4, 5, 10, 20, 30, -1, -5, 0],
       ['a', 'ab', 'abc', 'hello', 'world', 'test', 'x', ''],
@@ -388,21 +775,23 @@ export class GraphOptimizer {
     return true;
   }
 
+  /**
+   * Replace a node with an updated copy. Nodes may be shared with the graph
+   * this one was forked from, so passes never edit them in place. The graph
+   * bumps its version and patches its consumer index for the changed edges.
+   */
+  private updateNode(nodeId: string, changes: Partial<IntentNode>): void {
+    const node = this.graph.nodes.get(nodeId);
+    if (node) this.graph.replaceNode({ ...node, ...changes });
+  }
+
   /**
    * Count how many nodes use this node as input
    */
   private countConsumers(nodeId: string): number {
-    let count = 0;
-    for (const node of this.graph.nodes.values()) {
-      if (node.inputs.includes(nodeId)) {
-        count++;
-      }
-    }
+    const count = this.graph.getConsumers(nodeId).length;
     // Also count if it's an output
-    if (this.graph.outputs.includes(nodeId)) {
-      count++;
-    }
-    return count;
+    return this.graph.isOutput(nodeId) ? count + 1 : count;
   }
 
   /**
@@ -425,10 +814,56 @@ export class GraphOptimizer {
     return true;
   }
 
+  /**
+   * Exact key for a constant value: equal keys mean deepEqual values. Covers
+   * primitives and plain arrays and objects of them; anything else (functions,
+   * class instances, NaN) gets undefined and is compared the slow way.
+   */
+  private constantKey(value: unknown): string | undefined {
+    switch (typeof value) {
+      case 'string':
+        return JSON.stringify(value);
+      case 'number':
+        // NaN never equals itself; -0 and 0 are === and share a key
+        return Number.isNaN(value) ? undefined : `n${value}`;
+      case 'boolean':
+        return value ? 'true' : 'false';
+      case 'bigint':
+        return `i${value}`;
+      case 'undefined':
+        return 'undefined';
+      case 'object': {
+        if (value === null) return 'null';
+        if (Array.isArray(value)) {
+          const parts: string[] = [];
+          for (const item of value) {
+            const key = this.constantKey(item);
+            if (key === undefined) return undefined;
+            parts.push(key);
+          }
+          return `[${parts.join(',')}]`;
+        }
+        const proto = Object.getPrototypeOf(value);
+        if (proto !== Object.prototype && proto !== null) return undefined;
+        const parts: string[] = [];
+        for (const name of Object.keys(value).sort()) {
+          const key = this.constantKey((value as Record<string, unknown>)[name]);
+          if (key === undefined) return undefined;
+          parts.push(`${JSON.stringify(name)}:${key}`);
+        }
+        return `{${parts.join(',')}}`;
+      }
+      default:
+        return undefined;
+    }
+  }
+
   /**
    * Deep equality check
    */
   private deepEqual(a: any, b: any): boolean {
+    // Shared values (forked params, reused arrays) need no walk
+    if (a === b) return true;
     if (typeof a !== typeof b) return false;
 
     if (typeof a === 'object' && a !== null && b !== null) {
@@ -439,26 +874,28 @@ export class GraphOptimizer {
 
       if (Array.isArray(a) !== Array.isArray(b)) return false;
 
-      const keysA = Object.keys(a).sort();
-      const keysB = Object.keys(b).sort();
-      if (JSON.stringify(keysA) !== JSON.stringify(keysB)) return false;
-
-      return keysA.every((key) => this.deepEqual(a[key], b[key]));
+      const keysA = Object.keys(a);
+      if (keysA.length !== Object.keys(b).length) return false;
+      return keysA.every(
+        (key) => Object.prototype.hasOwnProperty.call(b, key) && this.deepEqual(a[key], b[key])
+      );
     }
 
-    return a === b;
+    return false;
   }
 
   /**
    * Check if two parameter dicts are identical
    */
   private paramsIdentical(params1: Record<string, any>, params2: Record<string, any>): boolean {
-    const keys1 = Object.keys(params1).sort();
-    const keys2 = Object.keys(params2).sort();
+    if (params1 === params2) return true;
 
-    if (JSON.stringify(keys1) !== JSON.stringify(keys2)) return false;
+    // Same key count and every key of one present in the other: same key sets
+    const keys1 = Object.keys(params1);
+    if (keys1.length !== Object.keys(params2).length) return false;
 
     for (const key of keys1) {
+      if (!Object.prototype.hasOwnProperty.call(params2, key)) return false;
       const val1 = params1[key];
       const val2 = params2[key];
 
@@ -467,7 +904,7 @@ export class GraphOptimizer {
         // Consider using canonical SafeTransform identifiers or structured hash of serialized safe AST.
         // For functions, compare both reference and string representation
         // This catches both identical references and separately-defined identical functions
-        if (val1 !== val2 && val1.toString() !== val2.toString()) return false;
+        if (val1 !== val2 && functionSource(val1) !== functionSource(val2)) return false;
       } else if (!this.deepEqual(val1, val2)) return false;
     }
 
@@ -482,8 +919,16 @@ export class GraphOptimizer {
       return 'No optimizations applied';
     }
 
-    return ['Optimization Report:', ...this.optimizationsApplied.map((opt) => `  - ${opt}`)].join(
-      '\n'
+    const lines = this.optimizationsApplied.map(
+      ({ pass, count }) => `  - ${pass}: ${REPORT_LINES[pass]!(count)}`
     );
+    return ['Optimization Report:', ...lines].join('\n');
+  }
+
+  /**
+   * The changes each pass made, in the order they were applied
+   */
+  getAppliedOptimizations(): readonly AppliedOptimization[] {
+    return this.optimizationsApplied;
   }
 }
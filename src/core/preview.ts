@@ -0,0 +1,65 @@
+// Bounded previews of values for human-readable reports
+
+/**
+ * JSON preview of a value, at most `maxLength` characters long.
+ *
+ * Produces the same text as JSON.stringify for values that fit. Longer
+ * values are cut to `maxLength - 3` characters plus '...', and serialization
+ * stops as soon as the budget is spent, so previewing a huge result costs
+ * about as much as previewing a small one. Cyclic values are cut off instead
+ * of throwing.
+ */
+export function previewJSON(value: unknown, maxLength = 100): string {
+  const parts: string[] = [];
+  let length = 0;
+
+  // Returns false once more than maxLength characters have been emitted
+  const emit = (text: string): boolean => {
+    parts.push(text);
+    length += text.length;
+    return length <= maxLength;
+  };
+
+  const isSkipped = (v: unknown) =>
+    v === undefined || typeof v === 'function' || typeof v === 'symbol';
+
+  const write = (input: unknown, inArray: boolean): boolean => {
+    let v = input;
+    if (v !== null && typeof v === 'object' && typeof (v as any).toJSON === 'function') {
+      v = (v as any).toJSON();
+    }
+
+    if (isSkipped(v)) return emit(inArray ? 'null' : String(v));
+    if (typeof v === 'string') {
+      // Escaping only grows a string, so a raw prefix of the budget suffices
+      return emit(JSON.stringify(v.length > maxLength ? v.slice(0, maxLength) : v));
+    }
+    if (typeof v === 'bigint') return emit(String(v));
+    if (v === null || typeof v !== 'object') return emit(JSON.stringify(v));
+
+    if (Array.isArray(v)) {
+      if (!emit('[')) return false;
+      for (let i = 0; i < v.length; i++) {
+        if (i > 0 && !emit(',')) return false;
+        if (!write(v[i], true)) return false;
+      }
+      return emit(']');
+    }
+
+    if (!emit('{')) return false;
+    let first = true;
+    for (const key of Object.keys(v)) {
+      const item = (v as Record<string, unknown>)[key];
+      if (isSkipped(item)) continue;
+      if (!first && !emit(',')) return false;
+      first = false;
+      if (!emit(`${JSON.stringify(key)}:`)) return false;
+      if (!write(item, false)) return false;
+    }
+    return emit('}');
+  };
+
+  write(value, false);
+  const text = parts.join('');
+  return text.length > maxLength ? text.substring(0, maxLength - 3) + '...' : text;
+}
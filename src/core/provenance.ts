@@ -14,16 +14,98 @@ export interface TransformationRecord {
   timestamp: number;
 }
 
+// Frames kept when capturing a creation stack: enough to get past the
+// framework's own frames to the user's call
+const CREATION_STACK_LIMIT = 16;
+
+// Stack lines from the framework's own files, and a `at fn (file:line:col)` frame
+const FRAMEWORK_FILE = /(?:graph|provenance|optimizer|kernel)\.ts/;
+const STACK_FRAME = /at (.+) \((.+):(\d+):\d+\)/;
+
+/**
+ * The first non-framework frame of a stack trace, skipping the Error line,
+ * trackNodeCreation and its caller
+ */
+function findSourceLocation(stack: string | undefined): SourceLocation | undefined {
+  if (!stack) return undefined;
+
+  const lines = stack.split('\n');
+  for (let i = 3; i < lines.length; i++) {
+    const line = lines[i];
+    // Skip framework files
+    if (!line || FRAMEWORK_FILE.test(line)) continue;
+
+    // Parse stack line
+    const match = STACK_FRAME.exec(line);
+    if (match && match[1] && match[2] && match[3]) {
+      return {
+        function: match[1],
+        file: match[2],
+        line: parseInt(match[3]),
+      };
+    }
+  }
+  return undefined;
+}
+
 export class Provenance {
   nodeId: string;
-  sourceLocation?: SourceLocation;
   createdBy?: 'user' | 'optimizer';
-  parentNodes: string[] = [];
-  transformations: TransformationRecord[] = [];
-  userMetadata: Record<string, any> = {};
-
-  constructor(nodeId: string) {
+  // The source location, or the creation stack it has yet to be parsed from.
+  // One field rather than two, since there is one of these per node.
+  private _source?: SourceLocation | Error;
+  // Most nodes are never derived, optimized or annotated, so these are only
+  // allocated when first accessed
+  private _parentNodes?: string[];
+  private _transformations?: TransformationRecord[];
+  private _userMetadata?: Record<string, any>;
+
+  constructor(nodeId: string, createdBy?: 'user' | 'optimizer') {
     this.nodeId = nodeId;
+    this.createdBy = createdBy;
+  }
+
+  get sourceLocation(): SourceLocation | undefined {
+    if (this._source instanceof Error) {
+      this._source = findSourceLocation(this._source.stack);
+    }
+    return this._source;
+  }
+
+  set sourceLocation(value: SourceLocation | undefined) {
+    this._source = value;
+  }
+
+  /**
+   * Record where the node was created. The stack is only formatted and
+   * parsed if sourceLocation is read, which most nodes never have.
+   */
+  deferSourceLocation(creationStack: Error): void {
+    this._source = creationStack;
+  }
+
+  get parentNodes(): string[] {
+    return (this._parentNodes ??= []);
+  }
+
+  set parentNodes(value: string[]) {
+    this._parentNodes = value;
+  }
+
+  get transformations(): TransformationRecord[] {
+    return (this._transformations ??= []);
+  }
+
+  set transformations(value: TransformationRecord[]) {
+    this._transformations = value;
+  }
+
+  get userMetadata(): Record<string, any> {
+    return (this._userMetadata ??= {});
+  }
+
+  set userMetadata(value: Record<string, any>) {
+    this._userMetadata = value;
   }
 
   /**
@@ -37,14 +119,22 @@ export class Provenance {
    * Get the sequence of transformations that created this node
    */
   getTransformationChain(): string[] {
-    return this.transformations.map((t) => `${t.transformation}: ${t.description}`);
+    if (!this._transformations) return [];
+    return this._transformations.map((t) => `${t.transformation}: ${t.description}`);
   }
 
   /**
    * Check if this node is a result of optimization
    */
   isOptimized(): boolean {
-    return this.transformations.length > 0;
+    return this._transformations !== undefined && this._transformations.length > 0;
+  }
+
+  /**
+   * Check if this node was derived from other nodes
+   */
+  hasParents(): boolean {
+    return this._parentNodes !== undefined && this._parentNodes.length > 0;
   }
 
   /**
@@ -65,44 +155,16 @@ export class ProvenanceTracker {
    * Track creation of a new node
    */
   trackNodeCreation(nodeId: string, captureStack = false): Provenance {
-    let sourceLocation: SourceLocation | undefined;
+    const provenance = new Provenance(nodeId, 'user');
 
     if (captureStack) {
-      // Capture call stack
-      const { stack } = new Error();
-      if (stack) {
-        const lines = stack.split('\n');
-        // Skip first 3 lines (Error, trackNodeCreation, caller)
-        for (let i = 3; i < lines.length; i++) {
-          const line = lines[i];
-          if (!line) continue;
-
-          // Skip framework files
-          if (
-            !line.includes('graph.ts') &&
-            !line.includes('provenance.ts') &&
-            !line.includes('optimizer.ts') &&
-            !line.includes('kernel.ts')
-          ) {
-            // Parse stack line
-            const match = line.match(/at (.+) \((.+):(\d+):\d+\)/);
-            if (match && match[1] && match[2] && match[3]) {
-              sourceLocation = {
-                function: match[1],
-                file: match[2],
-                line: parseInt(match[3]),
-              };
-              break;
-            }
-          }
-        }
-      }
+      // Capture a bounded call stack; V8 formats it only when .stack is read
+      const stackTraceLimit = Error.stackTraceLimit;
+      Error.stackTraceLimit = CREATION_STACK_LIMIT;
+      provenance.deferSourceLocation(new Error());
+      Error.stackTraceLimit = stackTraceLimit;
     }
 
-    const provenance = new Provenance(nodeId);
-    provenance.sourceLocation = sourceLocation;
-    provenance.createdBy = 'user';
-
     this.provenanceMap.set(nodeId, provenance);
     return provenance;
   }
@@ -117,8 +179,7 @@ export class ProvenanceTracker {
     description: string
   ): void {
     if (!this.provenanceMap.has(resultNodeId)) {
-      const provenance = new Provenance(resultNodeId);
-      provenance.createdBy = 'optimizer';
+      const provenance = new Provenance(resultNodeId, 'optimizer');
       this.provenanceMap.set(resultNodeId, provenance);
     }
 
@@ -154,23 +215,25 @@ export class ProvenanceTracker {
   traceBackToSource(nodeId: string): Provenance[] {
     const chain: Provenance[] = [];
     const visited = new Set<string>();
+    // Parents are pushed last-first so they are visited in order, as a
+    // depth-first walk would, without recursing on deep pipelines
+    const stack = [nodeId];
 
-    const trace = (nid: string) => {
-      if (visited.has(nid)) return;
+    while (stack.length > 0) {
+      const nid = stack.pop()!;
+      if (visited.has(nid)) continue;
       visited.add(nid);
 
-      const prov = this.getProvenance(nid);
-      if (prov) {
-        chain.push(prov);
+      const prov = this.provenanceMap.get(nid);
+      if (!prov) continue;
+      chain.push(prov);
 
-        // Recursively trace parent nodes
-        for (const parentId of prov.parentNodes) {
-          trace(parentId);
-        }
+      if (prov.hasParents()) {
+        const parents = prov.parentNodes;
+        for (let i = parents.length - 1; i >= 0; i--) stack.push(parents[i]!);
       }
-    };
+    }
 
-    trace(nodeId);
     return chain;
   }
 
@@ -216,7 +279,7 @@ export class ProvenanceTracker {
     }
 
     // Show parent nodes
-    if (prov.parentNodes.length > 0) {
+    if (prov.hasParents()) {
       lines.push('');
       lines.push('Derived from nodes:');
       for (const parentId of prov.parentNodes) {
@@ -250,11 +313,12 @@ export class ProvenanceTracker {
 
     for (const prov of this.provenanceMap.values()) {
       if (prov.createdBy === 'user') userCreated++;
-      if (prov.createdBy === 'optimizer') optimizerCreated++;
-      if (prov.isOptimized()) optimizedNodes++;
+      else if (prov.createdBy === 'optimizer') optimizerCreated++;
+      if (!prov.isOptimized()) continue;
+      optimizedNodes++;
 
-      for (const trans of prov.transformations) {
-        transformations[trans.transformation] = (transformations[trans.transformation] || 0) + 1;
+      for (const { transformation } of prov.transformations) {
+        transformations[transformation] = (transformations[transformation] ?? 0) + 1;
       }
     }
 
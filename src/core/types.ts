@@ -12,6 +12,13 @@ export interface IOCType {
    */
   matches(value: unknown): boolean;
 
+  /**
+   * Check whether every element of a list matches this type. ListType uses
+   * this, when a type provides it, to validate a list in one loop instead of
+   * one matches() call per element.
+   */
+  matchesEach?(values: ArrayLike<unknown>): boolean;
+
   /**
    * Convert to string representation
    */
@@ -31,6 +38,10 @@ export class AnyType implements IOCType {
     return true;
   }
 
+  matchesEach(_values: ArrayLike<unknown>): boolean {
+    return true;
+  }
+
   toString(): string {
     return 'Any';
   }
@@ -40,31 +51,106 @@ export class AnyType implements IOCType {
   }
 }
 
+/**
+ * Shared AnyType instance. AnyType carries no state, so one instance serves
+ * every node and list that has no more specific type.
+ */
+export const ANY_TYPE = new AnyType();
+
+/**
+ * Check whether a list is a typed array of integers (any width)
+ */
+function isIntegerArray(values: ArrayLike<unknown>): boolean {
+  return (
+    values instanceof Int32Array ||
+    values instanceof Uint8Array ||
+    values instanceof Int8Array ||
+    values instanceof Int16Array ||
+    values instanceof Uint16Array ||
+    values instanceof Uint32Array ||
+    values instanceof Uint8ClampedArray
+  );
+}
+
+/**
+ * Check whether a list is a typed array of numbers (BigInt arrays hold bigints)
+ */
+function isNumberArray(values: ArrayLike<unknown>): boolean {
+  return values instanceof Float64Array || values instanceof Float32Array || isIntegerArray(values);
+}
+
+/**
+ * Check the numbers of a typed array against optional bounds. Missing bounds
+ * become infinities, so the loop is two comparisons per element and nothing
+ * else; with no bounds at all it is skipped.
+ */
+function withinBounds(values: ArrayLike<number>, min?: number, max?: number): boolean {
+  if (min === undefined && max === undefined) return true;
+  const lo = min ?? -Infinity;
+  const hi = max ?? Infinity;
+  for (let i = 0; i < values.length; i++) {
+    const value = values[i]!;
+    if (value < lo || value > hi) return false;
+  }
+  return true;
+}
+
+/**
+ * Format optional bounds for a type's string form (`>=0, <=9`, with `name`
+ * before each operator), or undefined when there are none. Types are
+ * immutable, so each builds its string form once and keeps it in `label`.
+ */
+function formatBounds(min?: number, max?: number, name = ''): string | undefined {
+  if (min === undefined) return max === undefined ? undefined : `${name}<=${max}`;
+  return max === undefined ? `${name}>=${min}` : `${name}>=${min}, ${name}<=${max}`;
+}
+
 /**
  * Integer type with optional constraints
  */
 export class IntType implements IOCType {
+  // Bounds with missing ones as infinities, so checks need no undefined tests
+  // (integers are never NaN, so comparing against an infinity always passes)
+  private readonly lo: number;
+  private readonly hi: number;
+  private label?: string;
+
   constructor(
     public readonly minValue?: number,
     public readonly maxValue?: number,
     public readonly bits: 32 | 64 = 32
-  ) {}
+  ) {
+    this.lo = minValue ?? -Infinity;
+    this.hi = maxValue ?? Infinity;
+  }
 
   matches(value: unknown): boolean {
-    if (typeof value !== 'number') return false;
-    if (!Number.isInteger(value)) return false;
-    if (this.minValue !== undefined && value < this.minValue) return false;
-    if (this.maxValue !== undefined && value > this.maxValue) return false;
+    return (
+      typeof value === 'number' && Number.isInteger(value) && value >= this.lo && value <= this.hi
+    );
+  }
+
+  matchesEach(values: ArrayLike<unknown>): boolean {
+    // Integer typed arrays can only hold integers
+    if (isIntegerArray(values)) {
+      return withinBounds(values as ArrayLike<number>, this.minValue, this.maxValue);
+    }
+    const lo = this.lo;
+    const hi = this.hi;
+    for (let i = 0; i < values.length; i++) {
+      const value = values[i];
+      if (typeof value !== 'number' || !Number.isInteger(value) || value < lo || value > hi) {
+        return false;
+      }
+    }
     return true;
   }
 
   toString(): string {
-    const constraints: string[] = [];
-    if (this.minValue !== undefined) constraints.push(`>=${this.minValue}`);
-    if (this.maxValue !== undefined) constraints.push(`<=${this.maxValue}`);
-
+    if (this.label !== undefined) return this.label;
+    const bounds = formatBounds(this.minValue, this.maxValue);
     const base = `Int${this.bits}`;
-    return constraints.length > 0 ? `${base}[${constraints.join(', ')}]` : base;
+    return (this.label = bounds !== undefined ? `${base}[${bounds}]` : base);
   }
 
   toLLVMType(): string {
@@ -76,6 +162,8 @@ export class IntType implements IOCType {
  * Floating point type with optional constraints
  */
 export class FloatType implements IOCType {
+  private label?: string;
+
   constructor(
     public readonly minValue?: number,
     public readonly maxValue?: number,
@@ -89,13 +177,25 @@ export class FloatType implements IOCType {
     return true;
   }
 
-  toString(): string {
-    const constraints: string[] = [];
-    if (this.minValue !== undefined) constraints.push(`>=${this.minValue}`);
-    if (this.maxValue !== undefined) constraints.push(`<=${this.maxValue}`);
+  matchesEach(values: ArrayLike<unknown>): boolean {
+    const min = this.minValue;
+    const max = this.maxValue;
+    // Integer and float typed arrays can only hold numbers
+    if (isNumberArray(values)) return withinBounds(values as ArrayLike<number>, min, max);
+    for (let i = 0; i < values.length; i++) {
+      const value = values[i];
+      if (typeof value !== 'number') return false;
+      if (min !== undefined && value < min) return false;
+      if (max !== undefined && value > max) return false;
+    }
+    return true;
+  }
 
+  toString(): string {
+    if (this.label !== undefined) return this.label;
+    const bounds = formatBounds(this.minValue, this.maxValue);
     const base = this.precision === 'single' ? 'Float32' : 'Float64';
-    return constraints.length > 0 ? `${base}[${constraints.join(', ')}]` : base;
+    return (this.label = bounds !== undefined ? `${base}[${bounds}]` : base);
   }
 
   toLLVMType(): string {
@@ -111,6 +211,13 @@ export class BoolType implements IOCType {
     return typeof value === 'boolean';
   }
 
+  matchesEach(values: ArrayLike<unknown>): boolean {
+    for (let i = 0; i < values.length; i++) {
+      if (typeof values[i] !== 'boolean') return false;
+    }
+    return true;
+  }
+
   toString(): string {
     return 'Bool';
   }
@@ -120,30 +227,69 @@ export class BoolType implements IOCType {
   }
 }
 
+/**
+ * Numeric typed array (Int32Array, Float64Array, ...), excluding DataView
+ */
+export type NumericTypedArray = Exclude<ArrayBufferView, DataView>;
+
+/**
+ * Check whether a value is a plain array or a numeric typed array.
+ * Typed arrays are accepted wherever a list is expected so large numeric
+ * inputs can be passed as one contiguous buffer instead of boxed elements.
+ */
+export function isListLike(value: unknown): value is ArrayLike<unknown> {
+  return Array.isArray(value) || (ArrayBuffer.isView(value) && !(value instanceof DataView));
+}
+
+// Types inferType returns. Types are immutable and unconstrained inferred
+// types carry no per-value state, so every call can share one instance.
+const INT_TYPE = new IntType();
+const INT64_TYPE = new IntType(undefined, undefined, 64);
+const FLOAT_TYPE = new FloatType();
+const FLOAT32_TYPE = new FloatType(undefined, undefined, 'single');
+const BOOL_TYPE = new BoolType();
+
+/**
+ * Infer the element type of a numeric typed array from its constructor
+ */
+function inferTypedArrayElementType(value: NumericTypedArray): IOCType {
+  if (value instanceof Float32Array) return FLOAT32_TYPE;
+  if (value instanceof Float64Array) return FLOAT_TYPE;
+  if (value instanceof BigInt64Array || value instanceof BigUint64Array) return ANY_TYPE;
+  // Uint32 values do not fit in a signed 32-bit integer
+  return value instanceof Uint32Array ? INT64_TYPE : INT_TYPE;
+}
+
 /**
  * List type with optional element type and length constraints
  */
 export class ListType implements IOCType {
+  private label?: string;
+
   constructor(
-    public readonly elementType: IOCType = new AnyType(),
+    public readonly elementType: IOCType = ANY_TYPE,
     public readonly minLength?: number,
     public readonly maxLength?: number
   ) {}
 
   matches(value: unknown): boolean {
-    if (!Array.isArray(value)) return false;
-    if (this.minLength !== undefined && value.length < this.minLength) return false;
-    if (this.maxLength !== undefined && value.length > this.maxLength) return false;
-    return value.every((item) => this.elementType.matches(item));
+    if (!isListLike(value)) return false;
+    const length = value.length;
+    if (this.minLength !== undefined && length < this.minLength) return false;
+    if (this.maxLength !== undefined && length > this.maxLength) return false;
+    const elementType = this.elementType;
+    if (elementType.matchesEach) return elementType.matchesEach(value);
+    for (let i = 0; i < length; i++) {
+      if (!elementType.matches(value[i])) return false;
+    }
+    return true;
   }
 
   toString(): string {
-    const constraints: string[] = [];
-    if (this.minLength !== undefined) constraints.push(`len>=${this.minLength}`);
-    if (this.maxLength !== undefined) constraints.push(`len<=${this.maxLength}`);
-
+    if (this.label !== undefined) return this.label;
+    const bounds = formatBounds(this.minLength, this.maxLength, 'len');
     const base = `List[${this.elementType.toString()}]`;
-    return constraints.length > 0 ? `${base}(${constraints.join(', ')})` : base;
+    return (this.label = bounds !== undefined ? `${base}(${bounds})` : base);
   }
 
   toLLVMType(): string {
@@ -152,37 +298,53 @@ export class ListType implements IOCType {
   }
 }
 
+const inferredListTypes = new WeakMap<IOCType, ListType>();
+
 /**
- * Infer IOC type from a JavaScript value
+ * Shared list type for an inferred element type, so a list of ints is always
+ * the same ListType instance
+ */
+function listTypeOf(elementType: IOCType): ListType {
+  let listType = inferredListTypes.get(elementType);
+  if (!listType) {
+    listType = new ListType(elementType);
+    inferredListTypes.set(elementType, listType);
+  }
+  return listType;
+}
+
+/**
+ * Infer IOC type from a JavaScript value. Inferred types are shared: equal
+ * inferences return the same instance.
  */
 export function inferType(value: unknown): IOCType {
   if (typeof value === 'boolean') {
-    return new BoolType();
+    return BOOL_TYPE;
   }
   if (typeof value === 'number') {
-    return Number.isInteger(value) ? new IntType() : new FloatType();
+    return Number.isInteger(value) ? INT_TYPE : FLOAT_TYPE;
   }
   if (Array.isArray(value)) {
     if (value.length === 0) {
-      return new ListType(new AnyType());
+      return listTypeOf(ANY_TYPE);
     }
     // Infer element type from all elements to handle mixed types
     let elemType = inferType(value[0]);
     for (let i = 1; i < value.length; i++) {
       const currentType = inferType(value[i]);
+      // Inferred types are shared instances, so matching elements compare equal
+      // by identity; only nested lists of one class can still differ
+      if (currentType === elemType) continue;
       // If types differ, fall back to AnyType
       if (elemType.constructor !== currentType.constructor) {
-        elemType = new AnyType();
+        elemType = ANY_TYPE;
         break;
       }
-      // For numeric types, check if we need to upgrade Int to Float
-      if (elemType instanceof IntType && currentType instanceof FloatType) {
-        elemType = currentType;
-      } else if (elemType instanceof FloatType && currentType instanceof IntType) {
-        // Keep Float, no change needed
-      }
     }
-    return new ListType(elemType);
+    return listTypeOf(elemType);
+  }
+  if (isListLike(value)) {
+    return listTypeOf(inferTypedArrayElementType(value as NumericTypedArray));
   }
-  return new AnyType();
+  return ANY_TYPE;
 }
@@ -8,6 +8,7 @@
  */
 
 import { ComplexityClass } from '../dsl/safe-types.js';
+import { sanitizeIdentifier, escapeForComment, escapeForString } from '../dsl/security.js';
 
 /**
  * Budget configuration for runtime execution
@@ -272,9 +273,6 @@ export class BudgetEnforcer {
    * SECURITY: nodeId is sanitized to prevent code injection
    */
   static wrapCode(code: string, nodeId: string, budget: ExecutionBudget): string {
-    // Import sanitization functions
-    const { sanitizeIdentifier, escapeForComment, escapeForString } = require('../dsl/security.js');
-
     // Sanitize nodeId before using it in generated code
     const safeNodeId = sanitizeIdentifier(nodeId);
     const safeNodeIdComment = escapeForComment(nodeId);
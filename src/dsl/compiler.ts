@@ -372,6 +372,22 @@ export function compileReduction(reduction: ReductionOp, arrayVar: string = 'arr
   }
 }
 
+// Expression source of each compiled predicate and transform, by function
+const inlineSources = new WeakMap<Function, (inputVar: string) => string>();
+
+/**
+ * Get the expression a compiled predicate or transform evaluates, written
+ * over `inputVar`, so code generators can splice it into a loop instead of
+ * calling the function per element.
+ *
+ * @param fn - A function returned by compilePredicateFunction or compileTransformFunction
+ * @param inputVar - Name of the variable holding the element; it may be read more than once
+ * @returns The expression source, or `undefined` for functions this module didn't compile
+ */
+export function getInlineSource(fn: unknown, inputVar: string): string | undefined {
+  return typeof fn === 'function' ? inlineSources.get(fn)?.(inputVar) : undefined;
+}
+
 /**
  * Produces a predicate function that evaluates inputs against the given SafePredicate.
  *
@@ -381,7 +397,9 @@ export function compileReduction(reduction: ReductionOp, arrayVar: string = 'arr
 export function compilePredicateFunction(predicate: SafePredicate): (x: any) => boolean {
   const code = compilePredicate(predicate, 'x');
   // Use restricted context compilation for additional security
-  return compileInRestrictedContext(code, ['x']) as (x: any) => boolean;
+  const fn = compileInRestrictedContext(code, ['x']) as (x: any) => boolean;
+  inlineSources.set(fn, (inputVar) => compilePredicate(predicate, inputVar));
+  return fn;
 }
 
 /**
@@ -393,7 +411,9 @@ export function compilePredicateFunction(predicate: SafePredicate): (x: any) =>
 export function compileTransformFunction(transform: SafeTransform): (x: any) => any {
   const code = compileTransform(transform, 'x');
   // Use restricted context compilation for additional security
-  return compileInRestrictedContext(code, ['x']) as (x: any) => any;
+  const fn = compileInRestrictedContext(code, ['x']) as (x: any) => any;
+  inlineSources.set(fn, (inputVar) => compileTransform(transform, inputVar));
+  return fn;
 }
 
 /**
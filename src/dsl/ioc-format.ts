@@ -363,41 +363,39 @@ export function validateIOCProgram(program: IOCProgram): { valid: boolean; error
  */
 function detectCycle(program: IOCProgram): boolean {
   const visited = new Set<string>();
-  const recursionStack = new Set<string>();
+  // Nodes on the current DFS path; reaching one again is a back-edge
+  const onPath = new Set<string>();
 
   const nodeMap = new Map(program.nodes.map((n) => [n.id, n]));
 
-  /**
-   * Perform a depth-first search from a node to detect a back-edge that indicates a cycle.
-   *
-   * Marks traversal state in the module-scoped `visited` and `recursionStack` sets while exploring.
-   *
-   * @param nodeId - The identifier of the node to start DFS from
-   * @returns `true` if a cycle is reachable from `nodeId`, `false` otherwise
-   */
-  function dfs(nodeId: string): boolean {
-    visited.add(nodeId);
-    recursionStack.add(nodeId);
-
-    const node = nodeMap.get(nodeId);
-    if (!node) return false;
-
-    for (const inputId of node.inputs) {
-      if (!visited.has(inputId)) {
-        if (dfs(inputId)) return true;
-      } else if (recursionStack.has(inputId)) {
-        return true; // Cycle detected
+  // Depth-first search with an explicit stack of (node, next input index),
+  // so deep programs cannot overflow the call stack
+  const stack: Array<{ id: string; inputs: string[]; next: number }> = [];
+
+  for (const root of program.nodes) {
+    if (visited.has(root.id)) continue;
+    visited.add(root.id);
+    onPath.add(root.id);
+    stack.push({ id: root.id, inputs: root.inputs, next: 0 });
+
+    while (stack.length > 0) {
+      const frame = stack[stack.length - 1]!;
+      if (frame.next < frame.inputs.length) {
+        const inputId = frame.inputs[frame.next++]!;
+        if (!visited.has(inputId)) {
+          visited.add(inputId);
+          const input = nodeMap.get(inputId);
+          if (!input) continue;
+          onPath.add(inputId);
+          stack.push({ id: inputId, inputs: input.inputs, next: 0 });
+        } else if (onPath.has(inputId)) {
+          return true; // Cycle detected
+        }
+      } else {
+        stack.pop();
+        onPath.delete(frame.id);
       }
     }
-
-    recursionStack.delete(nodeId);
-    return false;
-  }
-
-  for (const node of program.nodes) {
-    if (!visited.has(node.id)) {
-      if (dfs(node.id)) return true;
-    }
   }
 
   return false;
@@ -413,29 +411,38 @@ export function getExecutionOrder(program: IOCProgram): string[] {
   const order: string[] = [];
   const nodeMap = new Map(program.nodes.map((n) => [n.id, n]));
 
+  // Post-order DFS with an explicit stack of (node, next input index). The
+  // order matches a recursive walk, but deep programs cannot overflow the
+  // call stack.
+  const stack: Array<{ id: string; inputs: string[]; next: number }> = [];
+
   /**
-   * Visit a node and its input dependencies recursively, appending node ids to `order` in topological execution order.
-   *
-   * Visits each dependency before the node and does nothing for unknown or already-visited nodes.
+   * Start visiting a node unless it is unknown or already visited.
    *
    * @param nodeId - The id of the node to visit within the current program graph
    */
-  function visit(nodeId: string) {
+  const enter = (nodeId: string) => {
     if (visited.has(nodeId)) return;
     visited.add(nodeId);
 
     const node = nodeMap.get(nodeId);
     if (!node) return;
-
-    for (const inputId of node.inputs) {
-      visit(inputId);
-    }
-
-    order.push(nodeId);
-  }
+    stack.push({ id: nodeId, inputs: node.inputs, next: 0 });
+  };
 
   for (const outputId of program.outputs) {
-    visit(outputId);
+    enter(outputId);
+
+    while (stack.length > 0) {
+      const frame = stack[stack.length - 1]!;
+      if (frame.next < frame.inputs.length) {
+        // Visit dependencies first
+        enter(frame.inputs[frame.next++]!);
+      } else {
+        stack.pop();
+        order.push(frame.id);
+      }
+    }
   }
 
   return order;
@@ -4,7 +4,6 @@
  * Bridges the parsed .ioc language to the IOCProgram internal representation.
  */
 
-import { randomUUID } from 'crypto';
 import type { IOCProgram, IOCNode, IOCNodeParams } from '../dsl/ioc-format';
 import { IOCIntentType, calculateNodeCapability } from '../dsl/ioc-format';
 import { ComplexityClass } from '../dsl/safe-types';
@@ -52,16 +51,19 @@ export class ASTToGraphConverter {
   private nodes: Map<string, IOCNode> = new Map();
   private outputs: Set<string> = new Set();
   private variables: Map<string, string>; // name -> nodeId
+  private nodeCounter = 0;
 
   constructor() {
     this.variables = new Map();
   }
 
   /**
-   * Generate unique node ID
+   * Generate unique node ID. A counter rather than a random draw: cheaper,
+   * and unique without relying on 8 hex digits of a UUID not colliding.
    */
   private generateId(prefix: string): string {
-    return `${prefix}_${randomUUID().slice(0, 8)}`;
+    this.nodeCounter++;
+    return `${prefix}_${this.nodeCounter.toString(16).padStart(8, '0')}`;
   }
 
   /**
@@ -77,6 +79,7 @@ export class ASTToGraphConverter {
     this.nodes = new Map();
     this.outputs = new Set();
     this.variables = new Map();
+    this.nodeCounter = 0;
 
     for (const statement of program.statements) {
       this.processStatement(statement);
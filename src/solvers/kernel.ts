@@ -1,20 +1,51 @@
 // Solver Kernel - translates intent graphs into executable code
 
 import { Graph, IntentNode, IntentType } from '../core/graph';
-import { Strategy, NaiveStrategy, OptimizedStrategy, ExecutionContext } from './strategies';
+import {
+  Strategy,
+  NaiveStrategy,
+  OptimizedStrategy,
+  VectorizedStrategy,
+  ExecutionContext,
+} from './strategies';
 import { PerformanceProfiler, getProfiler } from './profiler';
 
+/**
+ * Compiled factories keyed by their full source. Graphs that generate the
+ * same code (re-created kernels, cloned graphs) skip re-parsing it; the
+ * factory is re-invoked with each kernel's own callbacks.
+ */
+const factoryCache: Map<string, Function> = new Map();
+const FACTORY_CACHE_LIMIT = 256;
+
+/**
+ * Indent generated code by one level
+ */
+function indent(code: string): string {
+  return code
+    .split('\n')
+    .map((line) => `  ${line}`)
+    .join('\n');
+}
+
 export class SolverKernel {
   private graph: Graph;
   private strategies: Strategy[];
   private profiler: PerformanceProfiler;
   private strategyCache: Map<string, Strategy> = new Map();
   private sizeMetadata: Map<string, number> = new Map();
+  private compiledCache: Map<string, Function> = new Map();
+  private compiledVersion = -1;
   private generatedCode?: string;
+  private vectorized: VectorizedStrategy;
+  private naive: NaiveStrategy;
+  private fusedNodes: Set<string> = new Set();
 
   constructor(graph: Graph, profiler?: PerformanceProfiler) {
     this.graph = graph;
-    this.strategies = [new OptimizedStrategy(), new NaiveStrategy()];
+    this.vectorized = new VectorizedStrategy();
+    this.naive = new NaiveStrategy();
+    this.strategies = [new OptimizedStrategy(), this.naive, this.vectorized];
     this.profiler = profiler || getProfiler();
   }
 
@@ -23,6 +54,7 @@ export class SolverKernel {
    */
   setSizeHint(nodeId: string, size: number): void {
     this.sizeMetadata.set(nodeId, size);
+    this.compiledCache.clear();
   }
 
   /**
@@ -54,11 +86,14 @@ export class SolverKernel {
         return Math.floor(baseSize / 2); // Assume 50% selectivity
       case IntentType.MAP:
         return baseSize; // Maintains size
+      case IntentType.FILTER_MAP:
+        return Math.floor(baseSize / 2); // Filter selectivity, then one output each
       case IntentType.FLATTEN:
         return baseSize * 2; // Increases size
       case IntentType.DISTINCT:
         return Math.floor(baseSize / 2); // Assume 50% duplicates
       case IntentType.GROUP_BY:
+      case IntentType.AGGREGATE_BY:
         return Math.min(Math.floor(baseSize / 10), 100);
       case IntentType.REDUCE:
         return 1; // Single value
@@ -92,6 +127,15 @@ export class SolverKernel {
 
     // Check cache
     const cacheKey = `${node.id}:${bucketedSize}:${optimizeFor}`;
+
+    // In speed mode, nodes of a fusable chain run vectorized whatever their
+    // size. Other modes keep their own strategies: the differential tester
+    // checks the fused loops against those.
+    if (optimizeFor === 'speed' && this.fusedNodes.has(node.id)) {
+      this.strategyCache.set(cacheKey, this.vectorized);
+      return this.vectorized;
+    }
+
     if (this.strategyCache.has(cacheKey)) {
       return this.strategyCache.get(cacheKey)!;
     }
@@ -99,15 +143,22 @@ export class SolverKernel {
     let bestStrategy: Strategy;
 
     if (optimizeFor === 'speed') {
-      // Use profiler data to pick the best strategy
-      const strategyCosts = capableStrategies.map((strategy) => {
-        const strategyName = strategy.constructor.name;
-        const cost = this.profiler.getCostEstimate(intentType, strategyName, bucketedSize);
-        return { cost, strategy };
-      });
+      // Use profiler data to pick the best strategy, skipping strategies that
+      // rule themselves out at this size. Ties (e.g. no profile data yet) are
+      // broken by the strategy's own static estimate.
+      const strategyCosts = capableStrategies
+        .map((strategy) => {
+          const strategyName = strategy.constructor.name;
+          const cost = this.profiler.getCostEstimate(intentType, strategyName, bucketedSize);
+          const estimate = strategy.getCostEstimate(node, [size]);
+          return { cost, estimate, strategy };
+        })
+        .filter(({ estimate }) => Number.isFinite(estimate));
 
       bestStrategy = strategyCosts.reduce((best, current) =>
-        current.cost < best.cost ? current : best
+        current.cost < best.cost || (current.cost === best.cost && current.estimate < best.estimate)
+          ? current
+          : best
       ).strategy;
     } else if (optimizeFor === 'memory') {
       // Prefer naive (smaller code)
@@ -138,6 +189,34 @@ export class SolverKernel {
     // Get topological execution order
     const execOrder = this.graph.getExecutionOrder();
 
+    // Node results are function locals. Left undeclared they would become
+    // shared globals, and node ids repeat across graphs. Loop temporaries are
+    // declared by the strategies' own loops, so inputs may use those names.
+    if (execOrder.length > 0) {
+      codeLines.push(`let ${execOrder.join(', ')}`);
+      codeLines.push('');
+    }
+
+    // Consecutive vectorized nodes that feed only each other are collected
+    // into a chain and emitted as one loop
+    this.fusedNodes = this.fusableChains();
+    let chain: IntentNode[] = [];
+    const flushChain = () => {
+      if (chain.length === 1) {
+        const node = chain[0]!;
+        codeLines.push(`// ${node.intentType}: ${node.id}`);
+        const loop = this.vectorized.generateCode(node, context);
+        codeLines.push(this.guardIndexedLoop(chain, loop, context));
+        codeLines.push('');
+      } else if (chain.length > 1) {
+        codeLines.push(`// fused ${chain.map((n) => `${n.intentType}: ${n.id}`).join(' -> ')}`);
+        const loop = this.vectorized.generateFusedCode(chain, context);
+        codeLines.push(this.guardIndexedLoop(chain, loop, context));
+        codeLines.push('');
+      }
+      chain = [];
+    };
+
     // Generate code for each node
     for (const nodeId of execOrder) {
       const node = this.graph.nodes.get(nodeId);
@@ -146,14 +225,26 @@ export class SolverKernel {
       // Select strategy for this node
       const strategy = this.selectStrategy(node, optimizeFor);
 
+      if (strategy instanceof VectorizedStrategy && !node.metadata.memoize) {
+        const tail = chain[chain.length - 1];
+        if (!tail || !this.canFuse(tail, node)) flushChain();
+        chain.push(node);
+        continue;
+      }
+      flushChain();
+
       // Generate code using the strategy
-      const nodeCode = strategy.generateCode(node, context);
+      let nodeCode = strategy.generateCode(node, context);
+      if (node.metadata.memoize) {
+        nodeCode = this.generateMemoizedCode(node, nodeCode, context);
+      }
 
       // Add comment for debugging
-      codeLines.push(`// ${node.intentType}: ${node.id.substring(0, 8)}`);
+      codeLines.push(`// ${node.intentType}: ${node.id}`);
       codeLines.push(nodeCode);
       codeLines.push('');
     }
+    flushChain();
 
     // Return the output(s)
     if (this.graph.outputs.length > 0) {
@@ -169,19 +260,112 @@ export class SolverKernel {
     return { code, context };
   }
 
+  /**
+   * Wrap a node's code so it only reruns when one of its inputs differs
+   * (!==) from the previous call of the compiled function
+   */
+  private generateMemoizedCode(
+    node: IntentNode,
+    nodeCode: string,
+    context: ExecutionContext
+  ): string {
+    if (node.inputs.length === 0) return nodeCode;
+
+    const memoName = `memo_${node.id}`;
+    context.variables[memoName] = { inputs: undefined, output: undefined };
+    const unchanged = node.inputs.map((inputId, i) => `${memoName}.inputs[${i}] === ${inputId}`);
+
+    return `if (${memoName}.inputs !== undefined && ${unchanged.join(' && ')}) {
+  ${node.id} = ${memoName}.output
+} else {
+${indent(nodeCode)}
+  ${memoName}.inputs = [${node.inputs.join(', ')}]
+  ${memoName}.output = ${node.id}
+}`;
+  }
+
+  /**
+   * Run a vectorized chain's indexed loop only on arrays and typed arrays.
+   * Other iterables (Sets, generators) have no length to index by, so they
+   * take the naive per-node code, which iterates them with for...of.
+   */
+  private guardIndexedLoop(
+    chain: IntentNode[],
+    loopCode: string,
+    context: ExecutionContext
+  ): string {
+    const inputId = chain[0]!.inputs[0];
+    const fallback = chain.map((node) => this.naive.generateCode(node, context)).join('\n');
+
+    return `if (Array.isArray(${inputId}) || ArrayBuffer.isView(${inputId})) {
+${indent(loopCode)}
+} else {
+${indent(fallback)}
+}`;
+  }
+
+  /**
+   * Whether `node` can join a fused loop right after `tail`: it must read
+   * only `tail`, and `tail` must be a per-element step whose list nobody
+   * else needs.
+   */
+  private canFuse(tail: IntentNode, node: IntentNode): boolean {
+    return (
+      (tail.intentType === IntentType.FILTER ||
+        tail.intentType === IntentType.MAP ||
+        tail.intentType === IntentType.FILTER_MAP) &&
+      node.inputs.length === 1 &&
+      node.inputs[0] === tail.id &&
+      this.graph.getConsumers(tail.id).length === 1 &&
+      !this.graph.isOutput(tail.id)
+    );
+  }
+
+  /**
+   * Nodes of the chains of per-element steps (filters and maps, optionally
+   * ending in a reduce) that can run as one loop. Fused, a chain builds only
+   * its last list, or none when it ends in a reduce, which pays off at any
+   * input size and with any callbacks, so in speed mode selectStrategy
+   * vectorizes these nodes regardless.
+   */
+  private fusableChains(): Set<string> {
+    const members = new Set<string>();
+    for (const node of this.graph.nodes.values()) {
+      if (!this.vectorized.canHandle(node.intentType) || node.metadata.memoize) continue;
+      const tail = node.inputs.length === 1 ? this.graph.nodes.get(node.inputs[0]!) : undefined;
+      if (tail && !tail.metadata.memoize && this.canFuse(tail, node)) {
+        members.add(tail.id);
+        members.add(node.id);
+      }
+    }
+    return members;
+  }
+
   /**
    * Compile intent graph into executable function
    */
   compile(optimizeFor: 'speed' | 'memory' | 'balanced' = 'speed', saveProfile = false): Function {
+    // Reuse the compiled function while the graph is unchanged
+    if (this.compiledVersion !== this.graph.version) {
+      this.compiledCache.clear();
+      this.compiledVersion = this.graph.version;
+    }
+    const cached = this.compiledCache.get(optimizeFor);
+    if (cached) {
+      this.generatedCode = (cached as any)._ioc_code;
+      if (saveProfile) {
+        this.profiler.saveProfiles();
+      }
+      return cached;
+    }
+
     // Generate code
     const { code, context } = this.generateCode(optimizeFor);
 
-    // Collect input parameter names
-    const inputNodes = Array.from(this.graph.nodes.values()).filter(
-      (node) => node.intentType === IntentType.INPUT
-    );
-    const paramNames = inputNodes
-      .map((node) => node.params['name'] as string)
+    // Collect input parameter names, in the order the inputs were added
+    const paramNames = this.graph
+      .getNodesOfType(IntentType.INPUT)
+      .map((nodeId) => this.graph.nodes.get(nodeId)!.params['name'])
       .filter((name): name is string => typeof name === 'string');
 
     // Build function
@@ -204,27 +388,46 @@ export class SolverKernel {
     // 1. The code is generated entirely by our own code generation system, not from
     //    untrusted user input
     // 2. User-provided functions (predicates, transforms) are passed as closed-over
-    //    variables (execGlobals), not embedded as strings in the generated code
+    //    variables (execGlobals), not embedded as strings in the generated code.
+    //    Only callbacks built by the safe DSL compiler are spliced in as source,
+    //    and that source is generated from validated SafePredicate/SafeTransform
+    //    trees, never from user strings
     // 3. All string interpolation in code generation uses node IDs and variable names
-    //    that we control, never user strings
+    //    that we control, never user strings; user values (constants, initial values,
+    //    aggregateBy accumulator names) only appear as JSON literals
     // 4. The generated code is available for inspection via getGeneratedCode()
     //
     // Alternative approaches like vm.runInContext or worker threads would add
     // significant complexity and performance overhead for no security benefit in
     // this controlled code generation scenario.
+    //
+    // User callbacks are bound through a factory closure rather than
+    // Function.prototype.bind: they become captured constants of the returned
+    // function, which the JIT can inline at each call site, instead of leading
+    // arguments forwarded through a bound-function trampoline on every call.
     const execGlobals = { ...context.variables };
 
-    // eslint-disable-next-line no-new-func
-    const compiledFn = new Function(...Object.keys(execGlobals), ...paramNames, code).bind(
-      null,
-      ...Object.values(execGlobals)
-    );
+    const globalNames = Object.keys(execGlobals);
+    const factoryBody = `return function _ioc_compiled_fn(${paramNames.join(', ')}) {\n${code}\n}`;
+    const factoryKey = `${globalNames.join(',')}\n${factoryBody}`;
+    let factory = factoryCache.get(factoryKey);
+    if (!factory) {
+      // eslint-disable-next-line no-new-func
+      factory = new Function(...globalNames, factoryBody);
+      if (factoryCache.size >= FACTORY_CACHE_LIMIT) {
+        // Evict the oldest entry (Map preserves insertion order)
+        factoryCache.delete(factoryCache.keys().next().value!);
+      }
+      factoryCache.set(factoryKey, factory);
+    }
+    const compiledFn: Function = factory(...Object.values(execGlobals));
 
     // Attach metadata for debugging
     (compiledFn as any)._ioc_code = fullCode;
     (compiledFn as any)._ioc_graph = this.graph;
     (compiledFn as any)._ioc_optimize_for = optimizeFor;
     (compiledFn as any)._ioc_kernel = this;
+    this.compiledCache.set(optimizeFor, compiledFn);
 
     // Optionally save profiler data
     if (saveProfile) {
@@ -23,21 +23,52 @@ export class PerformanceProfiler {
    * Load existing profile data from disk
    */
   private loadProfiles(): void {
-    if (!fs.existsSync(this.profileFile)) {
-      return;
+    for (const record of this.readProfileFile(this.profileFile)) {
+      const key = this.makeKey(record.intentType, record.strategyName, record.inputSize);
+      this.profiles.set(key, record);
     }
+  }
 
-    try {
-      const data = fs.readFileSync(this.profileFile, 'utf-8');
-      const records: ProfileRecord[] = JSON.parse(data);
+  /**
+   * Read profile records from a file, returning none if it is missing or corrupted
+   */
+  private readProfileFile(path: string): ProfileRecord[] {
+    if (!fs.existsSync(path)) {
+      return [];
+    }
 
-      for (const record of records) {
-        const key = this.makeKey(record.intentType, record.strategyName, record.inputSize);
-        this.profiles.set(key, record);
-      }
+    try {
+      const data = fs.readFileSync(path, 'utf-8');
+      return JSON.parse(data) as ProfileRecord[];
     } catch (error) {
       // If file is corrupted, start fresh
       console.warn('Failed to load profiles:', error);
+      return [];
+    }
+  }
+
+  /**
+   * Merge profile files written by other processes into this profiler.
+   * Records for the same intent, strategy and size bucket are combined as a
+   * sample-weighted mean, so separately profiled runs can be aggregated once
+   * at the end instead of sharing one file.
+   */
+  mergeFromPaths(paths: string[]): void {
+    for (const path of paths) {
+      for (const record of this.readProfileFile(path)) {
+        const key = this.makeKey(record.intentType, record.strategyName, record.inputSize);
+        const existing = this.profiles.get(key);
+        if (existing) {
+          const samples = existing.sampleCount + record.sampleCount;
+          existing.executionTimeMs =
+            (existing.executionTimeMs * existing.sampleCount +
+              record.executionTimeMs * record.sampleCount) /
+            samples;
+          existing.sampleCount = samples;
+        } else {
+          this.profiles.set(key, { ...record });
+        }
+      }
     }
   }
 
@@ -1,6 +1,8 @@
 // Strategy implementations - different execution approaches for intents
 
-import { IntentNode, IntentType } from '../core/graph';
+import { Aggregation, IntentNode, IntentType, initialAccumulators } from '../core/graph';
+import { IntType, ListType } from '../core/types';
+import { getInlineSource } from '../dsl/compiler';
 
 export interface ExecutionContext {
   variables: Record<string, any>;
@@ -18,6 +20,53 @@ function getParam(node: IntentNode, key: string): any {
   return node.params[key];
 }
 
+/**
+ * Get the key function for keyed intents. Graph stores it as `keyFn`;
+ * older hand-built nodes use `key`.
+ */
+function getKeyParam(node: IntentNode): any {
+  return getParam(node, 'keyFn') ?? getParam(node, 'key');
+}
+
+/**
+ * Intents covered by the general-purpose (naive and optimized) strategies
+ */
+const GENERAL_INTENTS: ReadonlySet<IntentType> = new Set([
+  IntentType.FILTER,
+  IntentType.MAP,
+  IntentType.REDUCE,
+  IntentType.INPUT,
+  IntentType.OUTPUT,
+  IntentType.CONSTANT,
+  IntentType.SORT,
+  IntentType.GROUP_BY,
+  IntentType.AGGREGATE_BY,
+  IntentType.JOIN,
+  IntentType.FLATTEN,
+  IntentType.DISTINCT,
+  IntentType.ASSERT,
+  IntentType.FILTER_MAP,
+]);
+
+/**
+ * Intents the vectorized strategy generates indexed loops for
+ */
+const VECTORIZED_INTENTS: ReadonlySet<IntentType> = new Set([
+  IntentType.FILTER,
+  IntentType.MAP,
+  IntentType.REDUCE,
+  IntentType.FILTER_MAP,
+]);
+
+/**
+ * Callback params the vectorized loop applies to each element, by intent
+ */
+const ELEMENT_CALLBACKS: Partial<Record<IntentType, ReadonlyArray<'predicate' | 'transform'>>> = {
+  [IntentType.FILTER]: ['predicate'],
+  [IntentType.MAP]: ['transform'],
+  [IntentType.FILTER_MAP]: ['predicate', 'transform'],
+};
+
 /**
  * Common code generation helpers shared across strategies
  */
@@ -38,6 +87,52 @@ abstract class BaseStrategy {
     return `${node.id} = ${JSON.stringify(value)}`;
   }
 
+  /**
+   * Bind a reduce's initial value and return the expression that reads it.
+   * Bound rather than inlined as JSON, it keeps its exact value (-Infinity,
+   * NaN, Maps, ...); objects are cloned on each run, as a literal would be.
+   */
+  protected bindInitial(node: IntentNode, initial: unknown, context: ExecutionContext): string {
+    const initName = `init_${node.id}`;
+    if (typeof initial === 'object' && initial !== null) {
+      context.variables[initName] = () => structuredClone(initial);
+      return `${initName}()`;
+    }
+    context.variables[initName] = initial;
+    return initName;
+  }
+
+  /**
+   * Generate code for SORT intent. Supports a comparator (`compareFn`, as
+   * stored by Graph.sort) or a key function (`key`) with optional `reverse`.
+   */
+  protected generateSortCode(node: IntentNode, context: ExecutionContext): string {
+    const inputId = node.inputs[0];
+    const compareFn = getParam(node, 'compareFn');
+    const keyFunc = getParam(node, 'key');
+    const reverse = getParam(node, 'reverse') || false;
+
+    if (compareFn) {
+      const compareName = `compare_${node.id}`;
+      context.variables[compareName] = compareFn;
+      return reverse
+        ? `${node.id} = ${inputId}.slice().sort((a, b) => ${compareName}(b, a))`
+        : `${node.id} = ${inputId}.slice().sort(${compareName})`;
+    }
+
+    if (keyFunc) {
+      const keyName = `key_${node.id}`;
+      context.variables[keyName] = keyFunc;
+      return reverse
+        ? `${node.id} = ${inputId}.slice().sort((a, b) => ${keyName}(b) < ${keyName}(a) ? -1 : ${keyName}(b) > ${keyName}(a) ? 1 : 0)`
+        : `${node.id} = ${inputId}.slice().sort((a, b) => ${keyName}(a) < ${keyName}(b) ? -1 : ${keyName}(a) > ${keyName}(b) ? 1 : 0)`;
+    }
+
+    return reverse
+      ? `${node.id} = ${inputId}.slice().sort().reverse()`
+      : `${node.id} = ${inputId}.slice().sort()`;
+  }
+
   /**
    * Generate code for FLATTEN intent (naive - only supports depth=1)
    */
@@ -84,7 +179,24 @@ for (const _sublist of ${inputId}) {
   protected generateFlattenCodeOptimized(node: IntentNode): string {
     const inputId = node.inputs[0];
     const depth = getParam(node, 'depth') || 1;
-    return `${node.id} = ${inputId}.flat(${depth})`;
+
+    if (depth !== 1) {
+      return `${node.id} = ${inputId}.flat(${depth})`;
+    }
+
+    // Single-level flatten: indexed copy avoids the generic .flat() machinery
+    // and also splices typed-array sublists, which .flat() leaves nested
+    return `${node.id} = []
+for (let _i = 0, _n = ${inputId}.length; _i < _n; _i++) {
+  const _sub = ${inputId}[_i]
+  if (Array.isArray(_sub) || ArrayBuffer.isView(_sub)) {
+    for (let _j = 0, _m = _sub.length; _j < _m; _j++) {
+      ${node.id}.push(_sub[_j])
+    }
+  } else {
+    ${node.id}.push(_sub)
+  }
+}`;
   }
 
   /**
@@ -98,21 +210,21 @@ for (const _sublist of ${inputId}) {
       const keyName = `key_${node.id}`;
       context.variables[keyName] = keyFn;
       return `${node.id} = []
-const _seen = new Set()
+const _seen_${node.id} = new Set()
 for (const _item of ${inputId}) {
   const _key = ${keyName}(_item)
-  if (!_seen.has(_key)) {
-    _seen.add(_key)
+  if (!_seen_${node.id}.has(_key)) {
+    _seen_${node.id}.add(_key)
     ${node.id}.push(_item)
   }
 }`;
     }
 
     return `${node.id} = []
-const _seen = new Set()
+const _seen_${node.id} = new Set()
 for (const _item of ${inputId}) {
-  if (!_seen.has(_item)) {
-    _seen.add(_item)
+  if (!_seen_${node.id}.has(_item)) {
+    _seen_${node.id}.add(_item)
     ${node.id}.push(_item)
   }
 }`;
@@ -130,20 +242,117 @@ for (const _item of ${inputId}) {
       const keyName = `key_${node.id}`;
       context.variables[keyName] = keyFn;
       return `${node.id} = []
-const _seen = new Set()
+const _seen_${node.id} = new Set()
 for (const _item of ${inputId}) {
   const _key = ${keyName}(_item)
-  if (!_seen.has(_key)) {
-    _seen.add(_key)
+  if (!_seen_${node.id}.has(_key)) {
+    _seen_${node.id}.add(_key)
     ${node.id}.push(_item)
   }
 }`;
     }
 
+    if (node.outputType instanceof ListType && node.outputType.elementType instanceof IntType) {
+      return this.generateDistinctCodeDenseInt(node);
+    }
+
     // Simple case: no keyFn, just deduplicate primitives
     return `${node.id} = [...new Set(${inputId})]`;
   }
 
+  /**
+   * Generate code for DISTINCT over integer lists. When the values span a
+   * range smaller than 4x the input length, a byte mask replaces the hash set;
+   * otherwise (or on non-integer data) it falls back to Set. First-occurrence
+   * order is preserved either way.
+   */
+  protected generateDistinctCodeDenseInt(node: IntentNode): string {
+    const inputId = node.inputs[0];
+    return `${node.id} = []
+{
+  const _in = ${inputId}
+  const _n = _in.length
+  let _min = Infinity
+  let _max = -Infinity
+  let _dense = _n > 0
+  for (let _i = 0; _i < _n; _i++) {
+    const _v = _in[_i]
+    if (!Number.isInteger(_v)) {
+      _dense = false
+      break
+    }
+    if (_v < _min) _min = _v
+    if (_v > _max) _max = _v
+  }
+  if (_dense && _max - _min < 4 * _n) {
+    const _mask = new Uint8Array(_max - _min + 1)
+    for (let _i = 0; _i < _n; _i++) {
+      const _k = _in[_i] - _min
+      if (_mask[_k] === 0) {
+        _mask[_k] = 1
+        ${node.id}.push(_in[_i])
+      }
+    }
+  } else {
+    ${node.id} = [...new Set(_in)]
+  }
+}`;
+  }
+
+  /**
+   * Generate code for FILTER_MAP intent: one pass that maps the elements
+   * passing the predicate
+   */
+  protected generateFilterMapCode(node: IntentNode, context: ExecutionContext): string {
+    const inputId = node.inputs[0];
+    const predName = `pred_${node.id}`;
+    const transformName = `transform_${node.id}`;
+    context.variables[predName] = getParam(node, 'predicate');
+    context.variables[transformName] = getParam(node, 'transform');
+
+    return `${node.id} = []
+for (const _item of ${inputId}) {
+  if (${predName}(_item)) {
+    ${node.id}.push(${transformName}(_item))
+  }
+}`;
+  }
+
+  /**
+   * Generate code for AGGREGATE_BY intent: one pass that folds each item into
+   * its group's accumulators, without building per-group lists. Groups live
+   * in a Map, so keys never touch Object.prototype.
+   */
+  protected generateAggregateCode(node: IntentNode, context: ExecutionContext): string {
+    const inputId = node.inputs[0];
+    const keyName = `key_${node.id}`;
+    const initName = `init_${node.id}`;
+    context.variables[keyName] = getKeyParam(node);
+    const aggregations: Record<string, Aggregation> = getParam(node, 'aggregations') ?? {};
+    // Initial values are bound, not inlined, so they keep their exact values
+    // (-Infinity, NaN, Sets, ...) and each group gets its own copy
+    context.variables[initName] = () => initialAccumulators(aggregations);
+
+    // Accumulator names are user strings, so they only appear as JSON literals
+    const steps = Object.entries(aggregations).map(([name, { operation }], i) => {
+      const opName = `agg_${node.id}_${i}`;
+      context.variables[opName] = operation;
+      const field = JSON.stringify(name);
+      return `  _acc[${field}] = ${opName}(_acc[${field}], _item)`;
+    });
+
+    return `${node.id} = new Map()
+for (const _item of ${inputId}) {
+  const _key = ${keyName}(_item)
+  let _acc = ${node.id}.get(_key)
+  if (_acc === undefined) {
+    _acc = ${initName}()
+    ${node.id}.set(_key, _acc)
+  }
+${steps.join('\n')}
+}`;
+  }
+
   /**
    * Generate code for ASSERT intent
    */
@@ -182,45 +391,30 @@ export class NaiveStrategy extends Strategy {
    * Simple loops - readable but not optimized
    */
   canHandle(intentType: IntentType): boolean {
-    return [
-      IntentType.FILTER,
-      IntentType.MAP,
-      IntentType.REDUCE,
-      IntentType.INPUT,
-      IntentType.OUTPUT,
-      IntentType.CONSTANT,
-      IntentType.SORT,
-      IntentType.GROUP_BY,
-      IntentType.JOIN,
-      IntentType.FLATTEN,
-      IntentType.DISTINCT,
-      IntentType.ASSERT,
-    ].includes(intentType);
+    return GENERAL_INTENTS.has(intentType);
   }
 
   generateCode(node: IntentNode, context: ExecutionContext): string {
     switch (node.intentType) {
-      case IntentType.INPUT: {
-        const name = getParam(node, 'name');
-        return `${node.id} = ${name}`;
-      }
+      case IntentType.INPUT:
+        return this.generateInputCode(node);
 
-      case IntentType.CONSTANT: {
-        const value = getParam(node, 'value');
-        return `${node.id} = ${JSON.stringify(value)}`;
-      }
+      case IntentType.CONSTANT:
+        return this.generateConstantCode(node);
 
       case IntentType.FILTER: {
         const inputId = node.inputs[0];
         const predName = `pred_${node.id}`;
         context.variables[predName] = getParam(node, 'predicate');
 
+        // Filtering converts no values, so typed arrays keep their type
         return `${node.id} = []
-for (_item of ${inputId}) {
+for (const _item of ${inputId}) {
   if (${predName}(_item)) {
     ${node.id}.push(_item)
   }
-}`;
+}
+if (ArrayBuffer.isView(${inputId})) ${node.id} = new ${inputId}.constructor(${node.id})`;
       }
 
       case IntentType.MAP: {
@@ -229,11 +423,14 @@ for (_item of ${inputId}) {
         context.variables[transformName] = getParam(node, 'transform');
 
         return `${node.id} = []
-for (_item of ${inputId}) {
+for (const _item of ${inputId}) {
   ${node.id}.push(${transformName}(_item))
 }`;
       }
 
+      case IntentType.FILTER_MAP:
+        return this.generateFilterMapCode(node, context);
+
       case IntentType.REDUCE: {
         const inputId = node.inputs[0];
         const opName = `op_${node.id}`;
@@ -241,44 +438,30 @@ for (_item of ${inputId}) {
         const initial = getParam(node, 'initial');
 
         if (initial !== undefined) {
-          return `${node.id} = ${JSON.stringify(initial)}
-for (_item of ${inputId}) {
+          return `${node.id} = ${this.bindInitial(node, initial, context)}
+for (const _item of ${inputId}) {
   ${node.id} = ${opName}(${node.id}, _item)
 }`;
         } else {
-          return `_items = ${inputId}[Symbol.iterator]()
-${node.id} = _items.next().value
-for (_item of _items) {
+          const itemsName = `_items_${node.id}`;
+          return `const ${itemsName} = ${inputId}[Symbol.iterator]()
+${node.id} = ${itemsName}.next().value
+for (const _item of ${itemsName}) {
   ${node.id} = ${opName}(${node.id}, _item)
 }`;
         }
       }
 
-      case IntentType.SORT: {
-        const inputId = node.inputs[0];
-        const keyFunc = getParam(node, 'key');
-        const reverse = getParam(node, 'reverse') || false;
-
-        if (keyFunc) {
-          const keyName = `key_${node.id}`;
-          context.variables[keyName] = keyFunc;
-          return reverse
-            ? `${node.id} = [...${inputId}].sort((a, b) => ${keyName}(b) < ${keyName}(a) ? -1 : ${keyName}(b) > ${keyName}(a) ? 1 : 0)`
-            : `${node.id} = [...${inputId}].sort((a, b) => ${keyName}(a) < ${keyName}(b) ? -1 : ${keyName}(a) > ${keyName}(b) ? 1 : 0)`;
-        } else {
-          return reverse
-            ? `${node.id} = [...${inputId}].sort().reverse()`
-            : `${node.id} = [...${inputId}].sort()`;
-        }
-      }
+      case IntentType.SORT:
+        return this.generateSortCode(node, context);
 
       case IntentType.GROUP_BY: {
         const inputId = node.inputs[0];
         const keyName = `key_${node.id}`;
-        context.variables[keyName] = getParam(node, 'key');
+        context.variables[keyName] = getKeyParam(node);
 
         return `${node.id} = {}
-for (_item of ${inputId}) {
+for (const _item of ${inputId}) {
   const _key = ${keyName}(_item)
   if (!${node.id}[_key]) {
     ${node.id}[_key] = []
@@ -287,6 +470,9 @@ for (_item of ${inputId}) {
 }`;
       }
 
+      case IntentType.AGGREGATE_BY:
+        return this.generateAggregateCode(node, context);
+
       case IntentType.JOIN: {
         const [leftId, rightId] = node.inputs;
         const leftKeyName = `leftKey_${node.id}`;
@@ -295,8 +481,8 @@ for (_item of ${inputId}) {
         context.variables[rightKeyName] = getParam(node, 'rightKey');
 
         return `${node.id} = []
-for (_left of ${leftId}) {
-  for (_right of ${rightId}) {
+for (const _left of ${leftId}) {
+  for (const _right of ${rightId}) {
     if (${leftKeyName}(_left) === ${rightKeyName}(_right)) {
       ${node.id}.push([_left, _right])
     }
@@ -324,7 +510,11 @@ for (_left of ${leftId}) {
     const baseCost = inputSizes[0] || 1.0;
 
     // Filter and map scale linearly
-    if ([IntentType.FILTER, IntentType.MAP].includes(node.intentType)) {
+    if (
+      node.intentType === IntentType.FILTER ||
+      node.intentType === IntentType.MAP ||
+      node.intentType === IntentType.FILTER_MAP
+    ) {
       return baseCost * 1.0;
     }
 
@@ -342,20 +532,7 @@ export class OptimizedStrategy extends Strategy {
    * Uses built-ins and functional methods for better performance
    */
   canHandle(intentType: IntentType): boolean {
-    return [
-      IntentType.FILTER,
-      IntentType.MAP,
-      IntentType.REDUCE,
-      IntentType.INPUT,
-      IntentType.OUTPUT,
-      IntentType.CONSTANT,
-      IntentType.SORT,
-      IntentType.GROUP_BY,
-      IntentType.JOIN,
-      IntentType.FLATTEN,
-      IntentType.DISTINCT,
-      IntentType.ASSERT,
-    ].includes(intentType);
+    return GENERAL_INTENTS.has(intentType);
   }
 
   generateCode(node: IntentNode, context: ExecutionContext): string {
@@ -379,9 +556,16 @@ export class OptimizedStrategy extends Strategy {
         const transformName = `transform_${node.id}`;
         context.variables[transformName] = getParam(node, 'transform');
 
-        return `${node.id} = ${inputId}.map(${transformName})`;
+        // Typed arrays map into a plain array, as the loop strategies do;
+        // TypedArray.prototype.map would coerce results to the input's type
+        return `${node.id} = ArrayBuffer.isView(${inputId})
+  ? Array.prototype.map.call(${inputId}, ${transformName})
+  : ${inputId}.map(${transformName})`;
       }
 
+      case IntentType.FILTER_MAP:
+        return this.generateFilterMapCode(node, context);
+
       case IntentType.REDUCE: {
         const inputId = node.inputs[0];
         const opName = `op_${node.id}`;
@@ -389,44 +573,38 @@ export class OptimizedStrategy extends Strategy {
         const initial = getParam(node, 'initial');
 
         if (initial !== undefined) {
-          return `${node.id} = ${inputId}.reduce(${opName}, ${JSON.stringify(initial)})`;
+          const init = this.bindInitial(node, initial, context);
+          return `${node.id} = ${inputId}.reduce(${opName}, ${init})`;
         } else {
           return `${node.id} = ${inputId}.reduce(${opName})`;
         }
       }
 
-      case IntentType.SORT: {
-        const inputId = node.inputs[0];
-        const keyFunc = getParam(node, 'key');
-        const reverse = getParam(node, 'reverse') || false;
-
-        if (keyFunc) {
-          const keyName = `key_${node.id}`;
-          context.variables[keyName] = keyFunc;
-          return reverse
-            ? `${node.id} = [...${inputId}].sort((a, b) => ${keyName}(b) < ${keyName}(a) ? -1 : ${keyName}(b) > ${keyName}(a) ? 1 : 0)`
-            : `${node.id} = [...${inputId}].sort((a, b) => ${keyName}(a) < ${keyName}(b) ? -1 : ${keyName}(a) > ${keyName}(b) ? 1 : 0)`;
-        } else {
-          return reverse
-            ? `${node.id} = [...${inputId}].sort().reverse()`
-            : `${node.id} = [...${inputId}].sort()`;
-        }
-      }
+      case IntentType.SORT:
+        return this.generateSortCode(node, context);
 
       case IntentType.GROUP_BY: {
         const inputId = node.inputs[0];
         const keyName = `key_${node.id}`;
-        context.variables[keyName] = getParam(node, 'key');
+        context.variables[keyName] = getKeyParam(node);
 
-        // Use reduce for a more functional approach
-        return `${node.id} = ${inputId}.reduce((acc, _item) => {
+        // Single indexed pass: one key call and one bucket lookup per item
+        return `${node.id} = {}
+for (let _i = 0, _n = ${inputId}.length; _i < _n; _i++) {
+  const _item = ${inputId}[_i]
   const _key = ${keyName}(_item)
-  if (!acc[_key]) acc[_key] = []
-  acc[_key].push(_item)
-  return acc
-}, {})`;
+  const _bucket = ${node.id}[_key]
+  if (_bucket === undefined) {
+    ${node.id}[_key] = [_item]
+  } else {
+    _bucket.push(_item)
+  }
+}`;
       }
 
+      case IntentType.AGGREGATE_BY:
+        return this.generateAggregateCode(node, context);
+
       case IntentType.JOIN: {
         const [leftId, rightId] = node.inputs;
         const leftKeyName = `leftKey_${node.id}`;
@@ -457,7 +635,11 @@ export class OptimizedStrategy extends Strategy {
     const baseCost = inputSizes[0] || 1.0;
 
     // Native methods are typically faster
-    if ([IntentType.FILTER, IntentType.MAP].includes(node.intentType)) {
+    if (
+      node.intentType === IntentType.FILTER ||
+      node.intentType === IntentType.MAP ||
+      node.intentType === IntentType.FILTER_MAP
+    ) {
       return baseCost * 0.5;
     }
 
@@ -472,18 +654,224 @@ export class OptimizedStrategy extends Strategy {
 
 export class VectorizedStrategy extends Strategy {
   /**
-   * Future: SIMD/WebAssembly for numerical operations
+   * Indexed loops over array-likes for the per-element intents.
+   *
+   * Avoids the iterator protocol and the generic callback dispatch of the
+   * built-in array methods, and pre-sizes map outputs. Works on plain arrays
+   * and typed arrays alike, so numeric inputs stay in their packed form.
+   */
+  canHandle(intentType: IntentType): boolean {
+    return VECTORIZED_INTENTS.has(intentType);
+  }
+
+  generateCode(node: IntentNode, context: ExecutionContext): string {
+    const inputId = node.inputs[0];
+
+    switch (node.intentType) {
+      case IntentType.FILTER: {
+        const test = this.bindComponents(node, 'predicate', context).join(' && ');
+
+        // Typed arrays are filtered through a byte mask into an exactly sized
+        // array of the same type, as TypedArray.prototype.filter does, so
+        // numeric data stays packed instead of being pushed into a plain array
+        return `if (ArrayBuffer.isView(${inputId})) {
+  const _mask = new Uint8Array(${inputId}.length)
+  let _count = 0
+  for (let _i = 0, _n = ${inputId}.length; _i < _n; _i++) {
+    const _v = ${inputId}[_i]
+    if (${test}) {
+      _mask[_i] = 1
+      _count++
+    }
+  }
+  ${node.id} = new ${inputId}.constructor(_count)
+  for (let _i = 0, _j = 0; _j < _count; _i++) {
+    if (_mask[_i] === 1) ${node.id}[_j++] = ${inputId}[_i]
+  }
+} else {
+  ${node.id} = []
+  for (let _i = 0, _n = ${inputId}.length; _i < _n; _i++) {
+    const _v = ${inputId}[_i]
+    if (${test}) ${node.id}.push(_v)
+  }
+}`;
+      }
+
+      case IntentType.MAP: {
+        const steps = this.bindComponents(node, 'transform', context).map(
+          (value) => `  _v = ${value}\n`
+        );
+
+        return `${node.id} = new Array(${inputId}.length)
+for (let _i = 0, _n = ${inputId}.length; _i < _n; _i++) {
+  let _v = ${inputId}[_i]
+${steps.join('')}  ${node.id}[_i] = _v
+}`;
+      }
+
+      case IntentType.FILTER_MAP:
+        // A one-node chain: the fused loop already filters, then maps
+        return this.generateFusedCode([node], context);
+
+      case IntentType.REDUCE: {
+        const opName = `op_${node.id}`;
+        context.variables[opName] = getParam(node, 'operation');
+        const initial = getParam(node, 'initial');
+
+        const [init, start] =
+          initial !== undefined
+            ? [this.bindInitial(node, initial, context), 0]
+            : [`${inputId}[0]`, 1];
+        return `${node.id} = ${init}
+for (let _i = ${start}, _n = ${inputId}.length; _i < _n; _i++) {
+  ${node.id} = ${opName}(${node.id}, ${inputId}[_i])
+}`;
+      }
+
+      default:
+        throw new Error(`Vectorized strategy doesn't support ${node.intentType}`);
+    }
+  }
+
+  /**
+   * A single loop for a chain of per-element nodes, each consuming the one
+   * before it. Filters skip the element, maps replace it, and the last node
+   * collects the element (filter, map) or folds it (reduce), so none of the
+   * intermediate lists is materialized.
    */
-  canHandle(_intentType: IntentType): boolean {
-    return false; // Placeholder for future implementation
+  generateFusedCode(chain: IntentNode[], context: ExecutionContext): string {
+    const first = chain[0]!;
+    const last = chain[chain.length - 1]!;
+    const inputId = first.inputs[0];
+    const steps: string[] = [];
+    let init = '';
+
+    for (const node of chain) {
+      switch (node.intentType) {
+        case IntentType.FILTER: {
+          for (const test of this.bindComponents(node, 'predicate', context)) {
+            steps.push(`if (!${test}) continue`);
+          }
+          break;
+        }
+
+        case IntentType.MAP: {
+          for (const value of this.bindComponents(node, 'transform', context)) {
+            steps.push(`_v = ${value}`);
+          }
+          break;
+        }
+
+        case IntentType.FILTER_MAP: {
+          for (const test of this.bindComponents(node, 'predicate', context)) {
+            steps.push(`if (!${test}) continue`);
+          }
+          for (const value of this.bindComponents(node, 'transform', context)) {
+            steps.push(`_v = ${value}`);
+          }
+          break;
+        }
+
+        case IntentType.REDUCE: {
+          if (node !== last) throw new Error('Reduce can only end a fused chain');
+          const opName = `op_${node.id}`;
+          context.variables[opName] = getParam(node, 'operation');
+          const initial = getParam(node, 'initial');
+          if (initial !== undefined) {
+            init = `${node.id} = ${this.bindInitial(node, initial, context)}`;
+            steps.push(`${node.id} = ${opName}(${node.id}, _v)`);
+          } else {
+            // The first element to get through seeds the accumulator
+            const firstName = `_first_${node.id}`;
+            init = `${node.id} = undefined\nlet ${firstName} = true`;
+            steps.push(
+              `if (${firstName}) { ${node.id} = _v; ${firstName} = false } else ${node.id} = ${opName}(${node.id}, _v)`
+            );
+          }
+          break;
+        }
+
+        default:
+          throw new Error(`Vectorized strategy doesn't support ${node.intentType}`);
+      }
+    }
+
+    // Like the per-node strategies, a chain of plain filters gives back the
+    // input's typed-array type and anything that maps gives a plain array
+    let finish = '';
+    if (last.intentType !== IntentType.REDUCE) {
+      // Without filters the output has one element per input, so pre-size it
+      if (chain.every((node) => node.intentType === IntentType.MAP)) {
+        init = `${last.id} = new Array(${inputId}.length)`;
+        steps.push(`${last.id}[_i] = _v`);
+      } else {
+        init = `${last.id} = []`;
+        steps.push(`${last.id}.push(_v)`);
+      }
+      if (chain.every((node) => node.intentType === IntentType.FILTER)) {
+        const typed = `new ${inputId}.constructor(${last.id})`;
+        finish = `\nif (ArrayBuffer.isView(${inputId})) ${last.id} = ${typed}`;
+      }
+    }
+
+    return `${init}
+for (let _i = 0, _n = ${inputId}.length; _i < _n; _i++) {
+  let _v = ${inputId}[_i]
+${steps.map((step) => `  ${step}`).join('\n')}
+}${finish}`;
   }
 
-  generateCode(_node: IntentNode, _context: ExecutionContext): string {
-    throw new Error('Vectorized strategy not yet implemented');
+  /**
+   * Bind a filter's predicate or a map's transform and return, in order, the
+   * expressions applying it to the loop's current element `_v`. A node fused
+   * by the optimizer also lists its original callbacks (`predicates`/
+   * `transforms`); those are bound one by one so each gets its own call site
+   * in the loop, which the JIT can inline, instead of going through the
+   * generic composed closure. Callbacks built by the safe DSL compiler are
+   * spliced in as source, so no call is made per element at all.
+   */
+  private bindComponents(
+    node: IntentNode,
+    key: 'predicate' | 'transform',
+    context: ExecutionContext
+  ): string[] {
+    const prefix = key === 'predicate' ? 'pred' : 'transform';
+    const components = getParam(node, `${key}s`);
+    const bind = (fn: unknown, name: string): string => {
+      const source = getInlineSource(fn, '_v');
+      if (source !== undefined) return `(${source})`;
+      context.variables[name] = fn;
+      return `${name}(_v)`;
+    };
+
+    if (!Array.isArray(components)) {
+      return [bind(getParam(node, key), `${prefix}_${node.id}`)];
+    }
+    return components.map((fn, i) => bind(fn, `${prefix}_${node.id}_${i}`));
   }
 
-  getCostEstimate(_node: IntentNode, inputSizes: number[]): number {
+  getCostEstimate(node: IntentNode, inputSizes: number[]): number {
+    // With every callback spliced in as source the loop makes no calls at
+    // all, which pays off at any size
+    if (this.inlinesAllCallbacks(node)) return 0.1;
+
     const firstSize = inputSizes[0];
     return inputSizes.length > 0 && firstSize !== undefined && firstSize > 1000 ? 0.1 : Infinity;
   }
+
+  /**
+   * Whether every predicate and transform of a filter, map or FILTER_MAP
+   * node was built by the safe DSL compiler, so bindComponents inlines them
+   */
+  private inlinesAllCallbacks(node: IntentNode): boolean {
+    const keys = ELEMENT_CALLBACKS[node.intentType];
+    return (
+      keys !== undefined &&
+      keys.every((key) => {
+        const components = getParam(node, `${key}s`);
+        const fns: unknown[] = Array.isArray(components) ? components : [getParam(node, key)];
+        return fns.every((fn) => getInlineSource(fn, '_v') !== undefined);
+      })
+    );
+  }
 }
@@ -0,0 +1,78 @@
+/**
+ * Tests for the persistent compile cache
+ */
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { CompileCache } from '../backends/compile-cache';
+
+describe('CompileCache', () => {
+  let dir: string;
+
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'ioc-cache-test-'));
+  });
+
+  afterEach(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  it('should round-trip artifacts across instances', () => {
+    const key = CompileCache.key('wasm', '(module)');
+    new CompileCache(dir).set(key, new Uint8Array([0, 97, 115, 109]));
+
+    expect(Array.from(new CompileCache(dir).get(key)!)).toEqual([0, 97, 115, 109]);
+  });
+
+  it('should miss for unknown keys and missing directories', () => {
+    expect(new CompileCache(dir).get(CompileCache.key('wasm', 'other'))).toBeUndefined();
+    expect(new CompileCache(path.join(dir, 'absent')).get('abc')).toBeUndefined();
+  });
+
+  it('should key on every part', () => {
+    expect(CompileCache.key('llvm', 'O0', 'ir')).toBe(CompileCache.key('llvm', 'O0', 'ir'));
+    expect(CompileCache.key('llvm', 'O0', 'ir')).not.toBe(CompileCache.key('llvm', 'O2', 'ir'));
+    expect(CompileCache.key('ab', 'c')).not.toBe(CompileCache.key('a', 'bc'));
+  });
+
+  it('should evict least recently used entries over the size limit', () => {
+    const cache = new CompileCache(dir, 8);
+    cache.set('old', new Uint8Array(4));
+    const past = new Date(Date.now() - 60_000);
+    fs.utimesSync(path.join(dir, 'old.bin'), past, past);
+
+    cache.set('new', new Uint8Array(6));
+
+    expect(cache.get('old')).toBeUndefined();
+    expect(cache.get('new')?.length).toBe(6);
+  });
+
+  it('should evict in least-recently-used order, counting reads as uses', () => {
+    const cache = new CompileCache(dir, 12);
+    for (const key of ['a', 'b', 'c']) cache.set(key, new Uint8Array(4));
+    const age = (key: string, ms: number) => {
+      const time = new Date(Date.now() - ms);
+      fs.utimesSync(path.join(dir, `${key}.bin`), time, time);
+    };
+    age('a', 90_000);
+    age('b', 60_000);
+    age('c', 30_000);
+    cache.get('a');
+
+    cache.set('d', new Uint8Array(4));
+
+    expect(fs.existsSync(path.join(dir, 'b.bin'))).toBe(false);
+    expect(['a', 'c', 'd'].every((key) => fs.existsSync(path.join(dir, `${key}.bin`)))).toBe(true);
+  });
+
+  it('should not count an overwritten entry twice', () => {
+    const cache = new CompileCache(dir, 8);
+    cache.set('a', new Uint8Array(4));
+    cache.set('b', new Uint8Array(4));
+    cache.set('b', new Uint8Array(4));
+
+    expect(cache.get('a')?.length).toBe(4);
+    expect(cache.get('b')?.length).toBe(4);
+  });
+});
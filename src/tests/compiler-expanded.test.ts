@@ -9,6 +9,7 @@ import {
   compilePredicateFunction,
   compileTransformFunction,
   compileReductionFunction,
+  getInlineSource,
 } from '../dsl/compiler';
 import { Predicate, Transform, Reduce } from '../dsl/safe-types';
 import type { SafePredicate, SafeTransform, ReductionOp } from '../dsl/safe-types';
@@ -321,6 +322,18 @@ describe('Compiler - Expanded Tests', () => {
     });
   });
 
+  describe('getInlineSource', () => {
+    it('should return the expression over the given variable', () => {
+      expect(getInlineSource(compilePredicateFunction(Predicate.gt(5)), '_v')).toBe('_v > 5');
+      expect(getInlineSource(compileTransformFunction(Transform.add(1)), 'y')).toBe('(y + 1)');
+    });
+
+    it('should return undefined for other functions', () => {
+      expect(getInlineSource((x: number) => x > 5, '_v')).toBeUndefined();
+      expect(getInlineSource(undefined, '_v')).toBeUndefined();
+    });
+  });
+
   describe('compileReductionFunction', () => {
     it('should compile and execute sum', () => {
       const fn = compileReductionFunction(Reduce.sum());
@@ -2,6 +2,7 @@ import { describe, it, expect, vi } from 'vitest';
 import { Graph, IntentType } from '../core/graph';
 import { IOCDebugger, DebugMode } from '../core/debugger';
 import { ProvenanceTracker } from '../core/provenance';
+import { SolverKernel } from '../solvers/kernel';
 
 describe('DebugMode', () => {
   it('should log messages when verbose is enabled', () => {
@@ -108,6 +109,10 @@ describe('DebugMode', () => {
 
     const error = debug.validateOutput(node, [1, 2, NaN, 4]);
     expect(error).toContain('returned NaN at index 2');
+    expect(debug.validateOutput(node, new Float64Array([0, NaN]))).toContain(
+      'returned NaN at index 1'
+    );
+    expect(debug.validateOutput(node, ['a', undefined, 3])).toBeNull();
   });
 
   it('should return null when validation passes', () => {
@@ -166,6 +171,8 @@ describe('DebugMode', () => {
     const summary = debug.getTraceSummary();
     expect(summary).toContain('Total operations: 2');
     expect(summary).toContain('Errors: 1');
+    expect(summary).toContain('Total time: 4.00ms');
+    expect(summary).toContain('2. [ERROR] test-nod... (map) - 2.50ms');
     expect(summary).toContain('test error');
   });
 
@@ -327,6 +334,46 @@ describe('IOCDebugger', () => {
     expect(traces.length).toBeGreaterThan(0);
   });
 
+  it('should trace aggregateBy with a fresh accumulator per group', () => {
+    const graph = new Graph();
+    const input = graph.input('data');
+    const aggregated = graph.aggregateBy(input, (x: any) => x % 2, {
+      seen: { operation: (acc: any, x: any) => [...acc, x], initial: [] },
+    });
+    graph.output(aggregated);
+
+    const traces = new IOCDebugger(graph).trace({ data: [1, 2, 3] }, true);
+    const output = traces.find((t) => t.nodeId === aggregated)?.output;
+
+    expect(output).toEqual(
+      new Map([
+        [1, { seen: [1, 3] }],
+        [0, { seen: [2] }],
+      ])
+    );
+  });
+
+  it('should aggregate exactly as the compiled kernel does', () => {
+    const graph = new Graph();
+    const input = graph.input('data');
+    const aggregated = graph.aggregateBy(input, (x: any) => x.key, {
+      min: { operation: (m: number, x: any) => Math.min(m, x.value), initial: Infinity },
+      values: { operation: (acc: any, x: any) => ({ ...acc, [x.value]: true }), initial: {} },
+    });
+    graph.output(aggregated);
+    const data = [
+      { key: 'constructor', value: 3 },
+      { key: '__proto__', value: 1 },
+      { key: 'constructor', value: 2 },
+    ];
+
+    const traces = new IOCDebugger(graph).trace({ data }, true);
+    const traced = traces.find((t) => t.nodeId === aggregated)?.output;
+
+    expect(traced).toEqual(new SolverKernel(graph).compile('speed')(data));
+    expect(traced.get('constructor').min).toBe(2);
+  });
+
   it('should handle trace errors gracefully', () => {
     const graph = new Graph();
     const input = graph.input('data');
@@ -367,6 +414,24 @@ describe('IOCDebugger', () => {
     expect(result).toBeDefined();
   });
 
+  it('should bisect using a single trace of the graph', () => {
+    const graph = new Graph();
+    const input = graph.input('data');
+    const doubled = graph.map(input, (x: any) => x * 2);
+    const filtered = graph.filter(doubled, () => {
+      throw new Error('boom');
+    });
+    graph.output(graph.map(filtered, (x: any) => x + 1));
+
+    const dbg = new IOCDebugger(graph);
+    const traceSpy = vi.spyOn(dbg, 'trace');
+    const result = dbg.findBug({ data: [1, 2, 3] }, [3, 5, 7]);
+
+    expect(traceSpy.mock.calls.length).toBe(1);
+    expect(result?.buggyNodeId).toBe(filtered);
+    expect(result?.error?.message).toBe('boom');
+  });
+
   it('should handle empty execution order', () => {
     const graph = new Graph();
     const dbg = new IOCDebugger(graph);
@@ -420,6 +485,26 @@ describe('IOCDebugger', () => {
     expect(nodeExecution).toHaveProperty('executionCount');
   });
 
+  it('should track mean and standard deviation of node execution time', () => {
+    const graph = new Graph();
+    const dbg = new IOCDebugger(graph);
+    const record = (executionTime: number) =>
+      (dbg as any).updateNodeExecutions([
+        { nodeId: 'n', intentType: IntentType.MAP, inputs: [], output: null, executionTime },
+      ]);
+
+    record(2);
+    expect((dbg.getNodeExecutions('n') as any).timeStdDev).toBe(0);
+    record(4);
+    record(6);
+
+    const execution = dbg.getNodeExecutions('n') as any;
+    expect(execution.executionCount).toBe(3);
+    expect(execution.totalTime).toBe(12);
+    expect(execution.averageTime).toBeCloseTo(4);
+    expect(execution.timeStdDev).toBeCloseTo(2);
+  });
+
   it('should get all node executions', () => {
     const graph = new Graph();
     const input = graph.input('data');
@@ -471,6 +556,22 @@ describe('IOCDebugger', () => {
     expect(formatted).toContain('Optimized Execution:');
   });
 
+  it('should not clone the graph when comparing without optimization passes', () => {
+    const graph = new Graph();
+    const input = graph.input('data');
+    graph.output(graph.map(input, (x: any) => x + 1));
+
+    const dbg = new IOCDebugger(graph);
+    const cloneSpy = vi.spyOn(graph, 'clone');
+
+    const comparison = dbg.compareOptimizations({ data: [1, 2] }, []);
+
+    expect(cloneSpy).not.toHaveBeenCalled();
+    expect(comparison.original.result).toEqual([2, 3]);
+    expect(comparison.comparison.resultsMatch).toBe(true);
+    cloneSpy.mockRestore();
+  });
+
   it('should warn about deprecated compare method', () => {
     const graph = new Graph();
     const dbg = new IOCDebugger(graph);
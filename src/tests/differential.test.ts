@@ -1,6 +1,7 @@
-import { describe, it, expect } from 'vitest';
+import { describe, it, expect, vi } from 'vitest';
 import { Graph } from '../core/graph';
 import { DifferentialTester, createTestSuite } from '../core/differential';
+import { SolverKernel } from '../solvers/kernel';
 
 describe('DifferentialTester', () => {
   it('should create tester with graph', () => {
@@ -43,7 +44,7 @@ describe('DifferentialTester', () => {
     expect(() => tester.testAllStrategies({ data: [] }, ['optimized'])).toThrow();
   });
 
-  it.skip('should test with optimizations', () => {
+  it('should test with optimizations', () => {
     const graph = new Graph();
     const input = graph.input('data');
     const filtered = graph.filter(input, (x: any) => x > 0);
@@ -56,7 +57,7 @@ describe('DifferentialTester', () => {
     expect(result.baselineName).toBe('unoptimized');
   });
 
-  it.skip('should test with specific optimization passes', () => {
+  it('should test with specific optimization passes', () => {
     const graph = new Graph();
     const input = graph.input('data');
     const filter1 = graph.filter(input, (x: any) => x > 0);
@@ -69,7 +70,7 @@ describe('DifferentialTester', () => {
     expect(result.executions.length).toBe(2);
   });
 
-  it.skip('should test with specific optimization passes', () => {
+  it('should test with specific optimization passes', () => {
     const graph = new Graph();
     const input = graph.input('data');
     const filter1 = graph.filter(input, (x: any) => x > 0);
@@ -82,6 +83,130 @@ describe('DifferentialTester', () => {
     expect(result.executions.length).toBe(2);
   });
 
+  it('should execute each strategy and compare real results', () => {
+    const graph = new Graph();
+    const input = graph.input('data');
+    const evens = graph.filter(input, (x: any) => x % 2 === 0);
+    graph.output(graph.map(evens, (x: any) => x * 10));
+
+    const tester = new DifferentialTester(graph);
+    const result = tester.testAllStrategies({ data: [1, 2, 3, 4] });
+
+    expect(result.executions.map((e) => e.result)).toEqual([
+      [20, 40],
+      [20, 40],
+    ]);
+    expect(result.allMatch).toBe(true);
+  });
+
+  it('should record an error for unknown strategies', () => {
+    const graph = new Graph();
+    graph.output(graph.input('data'));
+
+    const tester = new DifferentialTester(graph);
+    const result = tester.testAllStrategies({ data: [1] }, ['naive', 'bogus']);
+
+    expect(result.executions[1]?.error?.message).toContain('Unknown strategy');
+    expect(result.allMatch).toBe(false);
+  });
+
+  it('should stop after the first mismatch with failFast', () => {
+    const graph = new Graph();
+    graph.output(graph.input('data'));
+
+    const tester = new DifferentialTester(graph, { failFast: true });
+    const result = tester.testAllStrategies({ data: [1] }, ['bogus', 'naive', 'optimized']);
+
+    expect(result.executions.map((e) => e.strategyName)).toEqual(['bogus']);
+    expect(result.mismatches).toEqual([['naive', 'bogus']]);
+    expect(result.allMatch).toBe(false);
+  });
+
+  it('should compile the graph once across repeated runs', () => {
+    const graph = new Graph();
+    const input = graph.input('data');
+    graph.output(graph.map(input, (x: any) => x + 1));
+
+    const tester = new DifferentialTester(graph);
+    const generateSpy = vi.spyOn(SolverKernel.prototype as any, 'generateCode');
+    try {
+      tester.testAllStrategies({ data: [1] }, ['naive']);
+      tester.testAllStrategies({ data: [2] }, ['naive']);
+      expect(generateSpy.mock.calls.length).toBe(1);
+    } finally {
+      generateSpy.mockRestore();
+    }
+  });
+
+  it('should compile every strategy with one kernel', () => {
+    const graph = new Graph();
+    const input = graph.input('data');
+    graph.output(graph.map(input, (x: any) => x + 1));
+
+    const tester = new DifferentialTester(graph);
+    const generateSpy = vi.spyOn(SolverKernel.prototype as any, 'generateCode');
+    try {
+      tester.testAllStrategies({ data: [1] }, ['naive', 'optimized', 'vectorized']);
+      expect(generateSpy.mock.calls.length).toBe(3);
+      expect(new Set(generateSpy.mock.contexts).size).toBe(1);
+    } finally {
+      generateSpy.mockRestore();
+    }
+  });
+
+  it('should share inputs across executions without mutating them', () => {
+    const graph = new Graph();
+    const input = graph.input('data');
+    graph.output(graph.sort(input, (a: any, b: any) => a - b));
+
+    const data = { data: [3, 1, 2] };
+    const result = new DifferentialTester(graph).testAllStrategies(data);
+
+    expect(result.executions.map((e) => e.result)).toEqual([
+      [1, 2, 3],
+      [1, 2, 3],
+    ]);
+    expect(data.data).toEqual([3, 1, 2]);
+  });
+
+  it('should run warmup and repeated timings', () => {
+    const graph = new Graph();
+    const input = graph.input('data');
+    let calls = 0;
+    graph.output(
+      graph.map(input, (x: any) => {
+        calls++;
+        return x;
+      })
+    );
+
+    const tester = new DifferentialTester(graph);
+    const result = tester.testAllStrategies({ data: [1] }, ['naive'], { repeats: 5, warmup: 2 });
+    const execution = result.executions[0]!;
+
+    expect(calls).toBe(7);
+    expect(execution.metadata['repeats']).toBe(5);
+    expect(execution.metadata['minTime']).toBeLessThanOrEqual(execution.executionTime);
+  });
+
+  it('should compare results structurally', () => {
+    const tester = new DifferentialTester(new Graph()) as any;
+
+    expect(tester.resultsEqual({ a: 1, b: [2, 3] }, { b: [2, 3], a: 1 })).toBe(true);
+    expect(tester.resultsEqual([1, 2], [1, 2, 3])).toBe(false);
+    expect(tester.resultsEqual(new Map([['k', [1]]]), new Map([['k', [2]]]))).toBe(false);
+    expect(tester.resultsEqual(new Float64Array([NaN]), new Float64Array([NaN]))).toBe(true);
+    expect(tester.resultsEqual([1], new Int32Array([1]))).toBe(false);
+    expect(tester.resultsEqual(0.1 + 0.2, 0.3)).toBe(false);
+  });
+
+  it('should honour numeric tolerances', () => {
+    const tester = new DifferentialTester(new Graph(), { rtol: 1e-9 }) as any;
+
+    expect(tester.resultsEqual([0.1 + 0.2], [0.3])).toBe(true);
+    expect(tester.resultsEqual([0.31], [0.3])).toBe(false);
+  });
+
   it('should format test report', () => {
     const graph = new Graph();
     const input = graph.input('data');
@@ -139,7 +264,45 @@ describe('DifferentialTester', () => {
 });
 
 describe('createTestSuite', () => {
-  it.skip('should run multiple test cases', () => {
+  it('should optimize and compile once for the whole suite', () => {
+    const graph = new Graph();
+    const input = graph.input('data');
+    const filter1 = graph.filter(input, (x: any) => x > 0);
+    graph.output(graph.filter(filter1, (x: any) => x < 100));
+
+    const generateSpy = vi.spyOn(SolverKernel.prototype as any, 'generateCode');
+    try {
+      const results = createTestSuite(
+        graph,
+        [{ data: [1, -2] }, { data: [200, 3] }, { data: [] }],
+        ['filter_fusion']
+      );
+      expect(results.map((r) => r.executions[1]?.nodeCount)).toEqual([2, 2, 2]);
+      expect(results.map((r) => r.executions[1]?.result)).toEqual([[1], [3], []]);
+      // One compile for the original graph, one for its optimized form
+      expect(generateSpy.mock.calls.length).toBe(2);
+    } finally {
+      generateSpy.mockRestore();
+    }
+  });
+
+  it('should reuse compiled code for clones of the same graph', () => {
+    const graph = new Graph();
+    const input = graph.input('data');
+    graph.output(graph.map(input, (x: any) => x + 1));
+
+    const generateSpy = vi.spyOn(SolverKernel.prototype as any, 'generateCode');
+    try {
+      // Nothing to optimize: the optimized clone has the original's fingerprint
+      const results = createTestSuite(graph, [{ data: [1] }, { data: [2, 3] }, { data: [] }]);
+      expect(results.map((r) => r.executions[1]?.result)).toEqual([[2], [3, 4], []]);
+      expect(generateSpy.mock.calls.length).toBe(1);
+    } finally {
+      generateSpy.mockRestore();
+    }
+  });
+
+  it('should run multiple test cases', () => {
     const graph = new Graph();
     const input = graph.input('data');
     graph.output(input);
@@ -151,7 +314,7 @@ describe('createTestSuite', () => {
     expect(results.length).toBe(2);
   });
 
-  it.skip('should handle empty test suite', () => {
+  it('should handle empty test suite', () => {
     const graph = new Graph();
     const input = graph.input('data');
     graph.output(input);
@@ -161,7 +324,7 @@ describe('createTestSuite', () => {
     expect(results.length).toBe(0);
   });
 
-  it.skip('should handle single test case', () => {
+  it('should handle single test case', () => {
     const graph = new Graph();
     const input = graph.input('data');
     graph.output(input);
@@ -158,6 +158,20 @@ describe('Graph', () => {
 
       expect(() => graph.groupBy('invalid', keyFn)).toThrow();
     });
+
+    it('should create aggregateBy nodes', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const keyFn = (x: any) => x.category;
+      const aggregations = { count: { operation: (n: number) => n + 1, initial: 0 } };
+      const aggregateId = graph.aggregateBy(input, keyFn, aggregations);
+
+      const aggregateNode = graph.getNode(aggregateId);
+      expect(aggregateNode?.intentType).toBe(IntentType.AGGREGATE_BY);
+      expect(aggregateNode?.inputs).toEqual([input]);
+      expect(aggregateNode?.params).toEqual({ keyFn, aggregations });
+      expect(() => graph.aggregateBy('invalid', keyFn, aggregations)).toThrow();
+    });
   });
 
   describe('Join operations', () => {
@@ -286,6 +300,23 @@ describe('Graph', () => {
       expect(outputs).toContain(input1);
       expect(outputs).toContain(input2);
     });
+
+    it('should track output membership across edits', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const mapped = graph.map(input, (x: any) => x + 1);
+      graph.output(mapped);
+
+      expect(graph.isOutput(mapped)).toBe(true);
+      expect(graph.isOutput(input)).toBe(false);
+
+      graph.filter(mapped, (x: any) => x > 0);
+      expect(graph.isOutput(mapped)).toBe(true);
+
+      graph.setOutputs([input]);
+      expect(graph.isOutput(mapped)).toBe(false);
+      expect(graph.isOutput(input)).toBe(true);
+    });
   });
 
   describe('Execution order', () => {
@@ -323,6 +354,43 @@ describe('Graph', () => {
       const order = graph.getExecutionOrder();
       expect(order).toEqual([]);
     });
+
+    it('should order join inputs left to right', () => {
+      const graph = new Graph();
+      const left = graph.input('left');
+      const right = graph.input('right');
+      const rightMapped = graph.map(right, (x: any) => x);
+      const joined = graph.join(left, rightMapped, (x: any) => x, (x: any) => x);
+      graph.output(joined);
+
+      expect(graph.getExecutionOrder()).toEqual([left, right, rightMapped, joined]);
+    });
+
+    it('should cache the order until the graph changes', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      graph.output(input);
+
+      const first = graph.getExecutionOrder();
+      expect(graph.getExecutionOrder()).toBe(first);
+
+      const mapped = graph.map(input, (x: any) => x);
+      graph.output(mapped);
+      expect(graph.getExecutionOrder()).toEqual([input, mapped]);
+    });
+
+    it('should handle very long chains without recursion', () => {
+      const graph = new Graph();
+      let current = graph.input('data');
+      for (let i = 0; i < 20000; i++) {
+        current = graph.map(current, (x: any) => x);
+      }
+      graph.output(current);
+
+      const order = graph.getExecutionOrder();
+      expect(order.length).toBe(20001);
+      expect(order[order.length - 1]).toBe(current);
+    });
   });
 
   describe('Graph visualization', () => {
@@ -338,6 +406,229 @@ describe('Graph', () => {
       expect(viz).toContain('filter');
       expect(viz).toContain('Outputs:');
     });
+
+    it('should tell nodes with the same prefix apart', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const first = graph.filter(input, (x: any) => x > 0);
+      const second = graph.filter(first, (x: any) => x < 9);
+      graph.output(second);
+
+      const viz = graph.visualize();
+      expect(viz).toContain(`  ${second}: filter <- [${first}]`);
+      expect(viz).toContain(`Outputs: ${second}`);
+    });
+  });
+
+  describe('Graph version', () => {
+    it('should bump version on structural changes', () => {
+      const graph = new Graph();
+      const v0 = graph.version;
+      const input = graph.input('data');
+      expect(graph.version).toBeGreaterThan(v0);
+
+      const v1 = graph.version;
+      graph.output(input);
+      expect(graph.version).toBeGreaterThan(v1);
+
+      const v2 = graph.version;
+      graph.output(input);
+      expect(graph.version).toBe(v2);
+    });
+  });
+
+  describe('Node ids', () => {
+    it('should use a per-graph counter', () => {
+      const graph = new Graph();
+      expect(graph.input('data')).toBe('input_00000001');
+      expect(graph.map('input_00000001', (x: any) => x)).toBe('map_00000002');
+    });
+
+    it('should not reuse ids in clones', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const clone = graph.clone();
+
+      clone.map(input, (x: any) => x);
+      expect(clone.getAllNodes().map((n) => n.id)).toEqual([input, 'map_00000002']);
+    });
+  });
+
+  describe('Reachable nodes', () => {
+    it('should contain exactly the nodes feeding an output', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const used = graph.map(input, (x: any) => x + 1);
+      const unused = graph.filter(input, (x: any) => x > 0);
+      graph.output(used);
+
+      const reachable = graph.getReachable();
+      expect([...reachable]).toEqual([input, used]);
+      expect(reachable.has(unused)).toBe(false);
+      expect(graph.getReachable()).toBe(reachable);
+
+      graph.output(unused);
+      expect(graph.getReachable().has(unused)).toBe(true);
+    });
+
+    it('should keep the cached order when unreachable nodes are removed', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const used = graph.map(input, (x: any) => x + 1);
+      const unused = graph.filter(input, (x: any) => x > 0);
+      graph.output(used);
+
+      const order = graph.getExecutionOrder();
+      graph.getReachable();
+      graph.removeNode(unused);
+      expect(graph.getExecutionOrder()).toBe(order);
+
+      graph.removeNode(used);
+      expect(graph.getExecutionOrder()).not.toBe(order);
+    });
+  });
+
+  describe('Node consumers', () => {
+    it('should list each consuming node once', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const a = graph.filter(input, (x: any) => x > 0);
+      const b = graph.map(input, (x: any) => x * 2);
+      const joined = graph.join(a, a, (x: any) => x, (x: any) => x);
+
+      expect(graph.getConsumers(input)).toEqual([a, b]);
+      expect(graph.getConsumers(a)).toEqual([joined]);
+      expect(graph.getConsumers(joined)).toEqual([]);
+    });
+
+    it('should reflect nodes added after the first lookup', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      expect(graph.getConsumers(input)).toEqual([]);
+
+      const mapped = graph.map(input, (x: any) => x);
+      expect(graph.getConsumers(input)).toEqual([mapped]);
+    });
+
+    it('should stay current through replaced and removed nodes', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const other = graph.input('other');
+      const mapped = graph.map(input, (x: any) => x);
+      const filtered = graph.filter(mapped, (x: any) => x > 0);
+      expect(graph.getConsumers(input)).toEqual([mapped]);
+
+      graph.replaceNode({ ...graph.getNode(mapped)!, inputs: [other] });
+      graph.removeNode(filtered);
+
+      expect(graph.getConsumers(input)).toEqual([]);
+      expect(graph.getConsumers(other)).toEqual([mapped]);
+      expect(graph.getConsumers(mapped)).toEqual([]);
+    });
+  });
+
+  describe('Nodes by intent', () => {
+    it('should index nodes by intent through edits', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const f1 = graph.filter(input, (x: any) => x > 0);
+      expect(graph.getNodesOfType(IntentType.FILTER)).toEqual([f1]);
+
+      const f2 = graph.filter(f1, (x: any) => x < 9);
+      const mapped = graph.map(f2, (x: any) => x);
+      graph.removeNode(f1);
+
+      expect(graph.getNodesOfType(IntentType.FILTER)).toEqual([f2]);
+      expect(graph.getNodesOfType(IntentType.MAP)).toEqual([mapped]);
+      expect(graph.getNodesOfType(IntentType.SORT)).toEqual([]);
+    });
+  });
+
+  describe('Construction-time fusion', () => {
+    it('should be off by default', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const first = graph.map(input, (x: any) => x + 1);
+      const second = graph.map(first, (x: any) => x * 2);
+
+      expect(graph.nodes.size).toBe(3);
+      expect(graph.getNode(second)!.inputs).toEqual([first]);
+    });
+
+    it('should fuse map chains and filter chains', () => {
+      const graph = new Graph();
+      graph.fusionEnabled = true;
+      const input = graph.input('data');
+      const first = graph.map(input, (x: any) => x + 1);
+      const mapped = graph.map(first, (x: any) => x * 2);
+      const kept = graph.filter(mapped, (x: any) => x > 4);
+      const filtered = graph.filter(kept, (x: any) => x < 10);
+
+      expect(graph.getNode(first)).toBeUndefined();
+      expect(graph.getNode(kept)).toBeUndefined();
+      expect(graph.getNode(mapped)!.inputs).toEqual([input]);
+      expect(graph.getNode(filtered)!.inputs).toEqual([mapped]);
+      expect(graph.getConsumers(input)).toEqual([mapped]);
+
+      const transform = graph.getNode(mapped)!.params['transform'] as (x: unknown) => unknown;
+      const predicate = graph.getNode(filtered)!.params['predicate'] as (x: unknown) => boolean;
+      expect(transform(3)).toBe(8);
+      expect([4, 6, 8, 10].filter(predicate)).toEqual([6, 8]);
+    });
+
+    it('should not fuse a node that is already consumed or an output', () => {
+      const graph = new Graph();
+      graph.fusionEnabled = true;
+      const input = graph.input('data');
+      const shared = graph.map(input, (x: any) => x + 1);
+      graph.reduce(shared, (a: any, b: any) => a + b, 0);
+      const next = graph.map(shared, (x: any) => x * 2);
+      const result = graph.map(graph.output(next), (x: any) => x - 1);
+
+      expect(graph.getNode(next)!.inputs).toEqual([shared]);
+      expect(graph.getNode(result)!.inputs).toEqual([next]);
+    });
+  });
+
+  describe('Graph fingerprint', () => {
+    it('should match for clones and differ for different callbacks', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      graph.output(graph.map(input, (x: any) => x * 2));
+
+      expect(graph.clone().fingerprint()).toBe(graph.fingerprint());
+
+      const other = graph.clone();
+      const mapNode = other.getAllNodes().find((n) => n.intentType === IntentType.MAP)!;
+      mapNode.params['transform'] = (x: any) => x * 2;
+      other.touch();
+      expect(other.fingerprint()).not.toBe(graph.fingerprint());
+    });
+
+    it('should change when the graph changes', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      graph.output(input);
+      const before = graph.fingerprint();
+
+      graph.output(graph.distinct(input));
+      expect(graph.fingerprint()).not.toBe(before);
+    });
+
+    it('should tell apart Map, Set and undefined params', () => {
+      const fingerprintOf = (value: unknown) => {
+        const graph = new Graph();
+        graph.output(graph.constant(value));
+        return graph.fingerprint();
+      };
+
+      expect(fingerprintOf(new Map([['a', 1]]))).not.toBe(fingerprintOf(new Map([['a', 2]])));
+      expect(fingerprintOf(new Map())).not.toBe(fingerprintOf({}));
+      expect(fingerprintOf(new Set([1]))).not.toBe(fingerprintOf(new Set([2])));
+      expect(fingerprintOf(new Set([1]))).toBe(fingerprintOf(new Set([1])));
+      expect(fingerprintOf([undefined])).not.toBe(fingerprintOf([null]));
+      expect(fingerprintOf(undefined)).not.toBe(fingerprintOf(null));
+    });
   });
 
   describe('Graph cloning', () => {
@@ -374,6 +665,39 @@ describe('Graph', () => {
       // Cloned should not be affected
       expect(clonedNode.inputs.length).not.toBe(originalNode.inputs.length);
     });
+
+    it('should fork without copying nodes', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const mapped = graph.map(input, (x: any) => x * 2);
+      graph.output(mapped);
+
+      const forked = graph.fork();
+      expect(forked.getNode(mapped)).toBe(graph.getNode(mapped));
+      expect(forked.outputs).toEqual(graph.outputs);
+      expect(forked.fingerprint()).toBe(graph.fingerprint());
+
+      // New nodes keep unique ids and stay in the fork
+      const extra = forked.map(mapped, (x: any) => x);
+      expect(graph.getNode(extra)).toBeUndefined();
+      expect(graph.nodes.size).toBe(2);
+    });
+
+    it('should share builder metadata and copy custom metadata', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const a = graph.map(input, (x: any) => x + 1);
+      const b = graph.map(a, (x: any) => x * 2);
+      graph.getNode(input)!.metadata = { source: 'csv' };
+
+      expect(graph.getNode(a)!.metadata).toBe(graph.getNode(b)!.metadata);
+      expect(Object.isFrozen(graph.getNode(a)!.metadata)).toBe(true);
+
+      const cloned = graph.clone();
+      expect(cloned.getNode(a)!.metadata).toBe(graph.getNode(a)!.metadata);
+      expect(cloned.getNode(input)!.metadata).toEqual({ source: 'csv' });
+      expect(cloned.getNode(input)!.metadata).not.toBe(graph.getNode(input)!.metadata);
+    });
   });
 
   describe('Graph optimization', () => {
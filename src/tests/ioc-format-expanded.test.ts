@@ -144,6 +144,30 @@ describe('IOC Format - Expanded Tests', () => {
       const program = createLargeProgram(10);
       expect(() => validateIOCProgram(program)).not.toThrow();
     });
+
+    it('should validate very deep programs', () => {
+      const result = validateIOCProgram(createLargeProgram(20000));
+      expect(result.errors).toEqual([]);
+    });
+
+    it('should detect cycles', () => {
+      const program = createLargeProgram(4);
+      program.nodes[1]!.inputs = ['node3'];
+
+      expect(validateIOCProgram(program).errors).toContain(
+        'Program contains a cycle - must be a DAG'
+      );
+    });
+
+    it('should not report a cycle for a shared missing input', () => {
+      const program = createLargeProgram(3);
+      program.nodes[1]!.inputs = ['missing'];
+      program.nodes[2]!.inputs = ['missing'];
+
+      expect(validateIOCProgram(program).errors).not.toContain(
+        'Program contains a cycle - must be a DAG'
+      );
+    });
   });
 
   describe('getExecutionOrder', () => {
@@ -172,6 +196,14 @@ describe('IOC Format - Expanded Tests', () => {
       expect(order.length).toBe(20);
     });
 
+    it('should order very deep programs without recursion', () => {
+      const order = getExecutionOrder(createLargeProgram(20000));
+
+      expect(order.length).toBe(20000);
+      expect(order[0]).toBe('node0');
+      expect(order[19999]).toBe('node19999');
+    });
+
     it('should handle program with multiple branches', () => {
       const program: IOCProgram = {
         version: '1.0.0',
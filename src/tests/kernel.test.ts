@@ -1,6 +1,10 @@
 import { describe, it, expect } from 'vitest';
 import { Graph } from '../core/graph';
+import { GraphOptimizer } from '../core/optimizer';
 import { SolverKernel } from '../solvers/kernel';
+import { compilePredicateFunction, compileTransformFunction } from '../dsl/compiler';
+import { Predicate, Transform } from '../dsl/safe-types';
+import { IntType, ListType } from '../core/types';
 
 describe('SolverKernel', () => {
   describe('Basic compilation', () => {
@@ -72,6 +76,98 @@ describe('SolverKernel', () => {
       expect(result).toBe(10);
     });
 
+    it('should compile groupBy operation', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const grouped = graph.groupBy(input, (x: any) => x.category);
+      graph.output(grouped);
+
+      for (const mode of ['balanced', 'memory'] as const) {
+        const compiled = new SolverKernel(graph).compile(mode);
+        const result = compiled([
+          { id: 1, category: 'a' },
+          { id: 2, category: 'b' },
+          { id: 3, category: 'a' },
+        ]);
+        expect(result).toEqual({
+          a: [
+            { id: 1, category: 'a' },
+            { id: 3, category: 'a' },
+          ],
+          b: [{ id: 2, category: 'b' }],
+        });
+      }
+    });
+
+    it('should compile aggregateBy as one pass of per-group accumulators', () => {
+      const graph = new Graph();
+      const input = graph.input('sales');
+      const totals = graph.aggregateBy(input, (s: any) => s.customer, {
+        total: { operation: (sum: number, s: any) => sum + s.price, initial: 0 },
+        count: { operation: (n: number) => n + 1, initial: 0 },
+        'odd "name"': { operation: (ids: number[], s: any) => [...ids, s.id], initial: [] },
+      });
+      graph.output(totals);
+
+      for (const mode of ['speed', 'balanced', 'memory'] as const) {
+        const compiled = new SolverKernel(graph).compile(mode);
+        const result = compiled([
+          { id: 1, customer: 'a', price: 10 },
+          { id: 2, customer: 'b', price: 5 },
+          { id: 3, customer: 'a', price: 2.5 },
+        ]);
+        expect(result).toEqual(
+          new Map([
+            ['a', { total: 12.5, count: 2, 'odd "name"': [1, 3] }],
+            ['b', { total: 5, count: 1, 'odd "name"': [2] }],
+          ])
+        );
+      }
+    });
+
+    it('should keep aggregateBy initial values exact and per group', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const stats = graph.aggregateBy(input, (x: any) => x.key, {
+        max: { operation: (m: number, x: any) => Math.max(m, x.value), initial: -Infinity },
+        seen: { operation: (s: Set<number>, x: any) => s.add(x.value), initial: new Set() },
+        nan: { operation: (n: number) => n, initial: NaN },
+      });
+      graph.output(stats);
+
+      const compiled = new SolverKernel(graph).compile('speed');
+      const result = compiled([
+        { key: 'a', value: -5 },
+        { key: 'a', value: -3 },
+        { key: 'b', value: -7 },
+      ]);
+
+      expect(result.get('a').max).toBe(-3);
+      expect(result.get('b').max).toBe(-7);
+      expect([...result.get('a').seen]).toEqual([-5, -3]);
+      expect([...result.get('b').seen]).toEqual([-7]);
+      expect(result.get('a').nan).toBeNaN();
+    });
+
+    it('should store aggregateBy groups and accumulators without prototypes', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const counts = graph.aggregateBy(input, (x: any) => x, {
+        count: { operation: (n: number) => n + 1, initial: 0 },
+        ['__proto__']: { operation: (n: number) => n + 1, initial: 0 },
+      });
+      graph.output(counts);
+
+      const compiled = new SolverKernel(graph).compile('speed');
+      const result = compiled(['__proto__', 'constructor', 'toString', '__proto__']);
+
+      expect(result.get('__proto__').count).toBe(2);
+      expect(result.get('constructor').count).toBe(1);
+      expect(result.get('toString').count).toBe(1);
+      expect(Object.keys(result.get('toString'))).toEqual(['count', '__proto__']);
+      expect(({} as any).count).toBeUndefined();
+    });
+
     it('should compile pipeline with multiple operations', () => {
       const graph = new Graph();
       const input = graph.input('data');
@@ -151,6 +247,287 @@ describe('SolverKernel', () => {
       const compiled = kernel.compile('speed');
       expect(compiled([1, 2, 3])).toEqual([1, 2, 3]);
     });
+
+    it('should pick vectorized loops for large inputs in speed mode', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const mapped = graph.map(input, (x: any) => x * 2);
+      const reduced = graph.reduce(mapped, (a: any, b: any) => a + b);
+      graph.output(reduced);
+
+      const kernel = new SolverKernel(graph);
+      kernel.setSizeHint(mapped, 10000);
+      kernel.setSizeHint(reduced, 10000);
+
+      const compiled = kernel.compile('speed');
+      expect(kernel.getStrategyReport()).toContain('VectorizedStrategy');
+      expect(compiled(new Int32Array([1, 2, 3]))).toBe(12);
+    });
+
+    it('should keep typed arrays typed through a vectorized filter', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const filtered = graph.filter(input, (x: any) => x % 2 === 0);
+      graph.output(filtered);
+
+      const kernel = new SolverKernel(graph);
+      kernel.setSizeHint(filtered, 10000);
+
+      const compiled = kernel.compile('speed');
+      const result = compiled(new Float64Array([1, 2, 3, 4.5, 6]));
+      expect(result).toBeInstanceOf(Float64Array);
+      expect(Array.from(result)).toEqual([2, 6]);
+      expect(compiled([1, 2, 4])).toEqual([2, 4]);
+    });
+
+    it('should give the same typed-array results in every mode', () => {
+      const graphs: Array<(graph: Graph, input: string) => string[]> = [
+        (graph, input) => [graph.filter(input, (x: any) => x > 1)],
+        (graph, input) => [graph.map(input, (x: any) => x * 0.5)],
+        (graph, input) => {
+          const big = graph.filter(input, (x: any) => x > 1);
+          return [big, graph.filter(big, (x: any) => x < 3)];
+        },
+        (graph, input) => {
+          const half = graph.map(input, (x: any) => x * 0.5);
+          return [half, graph.filter(half, (x: any) => x > 0.5)];
+        },
+      ];
+
+      for (const build of graphs) {
+        const graph = new Graph();
+        const nodes = build(graph, graph.input('data'));
+        graph.output(nodes[nodes.length - 1]!);
+        const kernel = new SolverKernel(graph);
+        for (const id of nodes) kernel.setSizeHint(id, 10000);
+
+        const data = new Int32Array([1, 2, 3]);
+        const [speed, memory, balanced] = (['speed', 'memory', 'balanced'] as const).map((mode) =>
+          kernel.compile(mode)(data)
+        );
+        expect(memory).toEqual(speed);
+        expect(balanced).toEqual(speed);
+        expect(Object.getPrototypeOf(memory)).toBe(Object.getPrototypeOf(speed));
+        expect(Object.getPrototypeOf(balanced)).toBe(Object.getPrototypeOf(speed));
+      }
+
+      const graph = new Graph();
+      graph.output(graph.map(graph.input('data'), (x: any) => x * 0.5));
+      expect(new SolverKernel(graph).compile('balanced')(new Int32Array([1, 2, 3]))).toEqual([
+        0.5, 1, 1.5,
+      ]);
+    });
+
+    it('should fuse chains of vectorized nodes into one loop', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const filtered = graph.filter(input, (x: any) => x % 2 === 1);
+      const mapped = graph.map(filtered, (x: any) => x * 10);
+      const reduced = graph.reduce(mapped, (a: any, b: any) => a + b);
+      graph.output(reduced);
+
+      const kernel = new SolverKernel(graph);
+      for (const id of [filtered, mapped, reduced]) kernel.setSizeHint(id, 10000);
+
+      const compiled = kernel.compile('speed');
+      const code = kernel.getGeneratedCode();
+      expect(code).toContain('// fused filter');
+      expect(code.match(/for \(let _i/g)?.length).toBe(1);
+      expect(compiled([1, 2, 3, 4, 5])).toBe(90);
+      expect(compiled(new Int32Array([2, 3]))).toBe(30);
+      expect(compiled([2, 4])).toBeUndefined();
+    });
+
+    it('should fold a filter/map chain into a reduce at any size', () => {
+      const graph = new Graph();
+      const input = graph.input('orders');
+      const large = graph.filter(input, (x: any) => x > 50);
+      const discounted = graph.map(large, (x: any) => x * 0.5);
+      const total = graph.reduce(discounted, (a: any, b: any) => a + b, 0);
+      graph.output(total);
+
+      const kernel = new SolverKernel(graph);
+      const compiled = kernel.compile('speed');
+
+      expect(kernel.getGeneratedCode().match(/for \(let _i/g)?.length).toBe(1);
+      expect(kernel.getGeneratedCode()).not.toContain('.filter(');
+      expect(compiled([10, 60, 100])).toBe(80);
+    });
+
+    it('should leave reduce chains to per-node strategies outside speed mode', () => {
+      const graph = new Graph();
+      const input = graph.input('orders');
+      const large = graph.filter(input, (x: any) => x > 50);
+      const total = graph.reduce(large, (a: any, b: any) => a + b, 0);
+      graph.output(total);
+
+      const kernel = new SolverKernel(graph);
+      const compiled = kernel.compile('balanced');
+
+      expect(kernel.getGeneratedCode()).toContain(`${input}.filter(`);
+      expect(kernel.getGeneratedCode()).toContain(`${large}.reduce(`);
+      expect(compiled([10, 60, 100])).toBe(160);
+    });
+
+    it('should fuse a filter/map chain at any size', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const doubled = graph.map(input, (x: any) => x * 2);
+      const large = graph.filter(doubled, (x: any) => x > 4);
+      graph.output(large);
+
+      const kernel = new SolverKernel(graph);
+      const compiled = kernel.compile('speed');
+
+      expect(kernel.getGeneratedCode()).toContain('// fused map');
+      expect(kernel.getGeneratedCode().match(/for \(let _i/g)?.length).toBe(1);
+      expect(compiled([1, 2, 3, 4])).toEqual([6, 8]);
+    });
+
+    it('should keep naive loops for a filter/map chain in memory mode', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const doubled = graph.map(input, (x: any) => x * 2);
+      const large = graph.filter(doubled, (x: any) => x > 4);
+      graph.output(large);
+
+      const kernel = new SolverKernel(graph);
+      const compiled = kernel.compile('memory');
+
+      const report = kernel.getStrategyReport();
+      expect(report).toContain('NaiveStrategy');
+      expect(report).not.toContain('VectorizedStrategy');
+      expect(kernel.getGeneratedCode()).not.toContain('// fused');
+      expect(compiled([1, 2, 3, 4])).toEqual([6, 8]);
+    });
+
+    it('should not fold a chain whose lists are used elsewhere', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const mapped = graph.map(input, (x: any) => x + 1);
+      graph.output(mapped);
+      graph.output(graph.reduce(mapped, (a: any, b: any) => a + b, 0));
+
+      const kernel = new SolverKernel(graph);
+      const compiled = kernel.compile('speed');
+
+      expect(kernel.getGeneratedCode()).toContain('.map(');
+      expect(compiled([1, 2])).toEqual([[2, 3], 5]);
+    });
+
+    it('should unroll callbacks fused by the optimizer', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const positive = graph.filter(input, (x: any) => x > 0);
+      const odd = graph.filter(positive, (x: any) => x % 2 === 1);
+      graph.output(odd);
+      new GraphOptimizer(graph).optimize(['filter_fusion']);
+
+      const kernel = new SolverKernel(graph);
+      kernel.setSizeHint(odd, 10000);
+
+      const compiled = kernel.compile('speed');
+      expect(kernel.getGeneratedCode()).toContain(`pred_${odd}_0(_v) && pred_${odd}_1(_v)`);
+      expect(compiled([-3, 1, 2, 5])).toEqual([1, 5]);
+    });
+
+    it('should keep exact reduce initial values in every mode', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const max = graph.reduce(input, (a: any, b: any) => Math.max(a, b), -Infinity);
+      const positive = graph.filter(input, (x: any) => x > 0);
+      const fusedMax = graph.reduce(positive, (a: any, b: any) => Math.max(a, b), -Infinity);
+      const seen = graph.reduce(input, (a: any, b: any) => a.add(b), new Set());
+      for (const id of [max, fusedMax, seen]) graph.output(id);
+
+      const kernel = new SolverKernel(graph);
+      for (const id of [max, seen]) kernel.setSizeHint(id, 10000);
+      const speed = kernel.compile('speed');
+      expect(kernel.getGeneratedCode()).toContain('// fused filter');
+      expect(kernel.getStrategyReport()).toContain('VectorizedStrategy');
+
+      for (const compiled of [speed, kernel.compile('memory'), kernel.compile('balanced')]) {
+        expect(compiled([])).toEqual([-Infinity, -Infinity, new Set()]);
+        expect(compiled([-1, 2])).toEqual([2, 2, new Set([-1, 2])]);
+        expect(compiled([3])[2]).toEqual(new Set([3]));
+      }
+    });
+
+    it('should run fused chains over iterables that are not arrays', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const doubled = graph.map(input, (x: any) => x * 2);
+      const large = graph.filter(doubled, (x: any) => x > 4);
+      const total = graph.reduce(
+        graph.map(input, (x: any) => x + 1),
+        (a: any, b: any) => a + b,
+        0
+      );
+      graph.output(large);
+      graph.output(total);
+
+      const compiled = new SolverKernel(graph).compile('speed');
+      expect(compiled(new Set([1, 2, 3, 4]))).toEqual([[6, 8], 14]);
+      expect(compiled([1, 2, 3, 4])).toEqual([[6, 8], 14]);
+      expect(() => compiled(42)).toThrow();
+    });
+
+    it('should inline compiled DSL callbacks in fused loops', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const large = graph.filter(input, compilePredicateFunction(Predicate.gt(5)));
+      const doubled = graph.map(large, compileTransformFunction(Transform.multiply(2)));
+      graph.output(doubled);
+      new GraphOptimizer(graph).optimize(['filter_map_fusion']);
+
+      const kernel = new SolverKernel(graph);
+      kernel.setSizeHint(doubled, 10000);
+
+      const compiled = kernel.compile('speed');
+      const code = kernel.getGeneratedCode();
+      expect(code).toContain('if (!(_v > 5)) continue');
+      expect(code).not.toMatch(/pred_\w+\(_v\)/);
+      expect(compiled([3, 6, 10])).toEqual([12, 20]);
+    });
+
+    it('should pick the vectorized loop for small inputs when callbacks inline', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const large = graph.filter(input, compilePredicateFunction(Predicate.gt(5)));
+      const halved = graph.map(input, (x: any) => x / 2);
+      graph.output(large);
+      graph.output(halved);
+
+      const kernel = new SolverKernel(graph);
+      kernel.setSizeHint(large, 10);
+      kernel.setSizeHint(halved, 10);
+
+      const compiled = kernel.compile('speed');
+      const code = kernel.getGeneratedCode();
+      expect(code).toContain('if ((_v > 5))');
+      expect(code).toContain(`: ${input}.map(transform_${halved})`);
+      expect(compiled([3, 6, 10])).toEqual([[6, 10], [1.5, 3, 5]]);
+    });
+
+    it('should not fuse through a node with another consumer', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const mapped = graph.map(input, (x: any) => x + 1);
+      const filtered = graph.filter(mapped, (x: any) => x > 2);
+      graph.output(filtered);
+      graph.output(mapped);
+
+      const kernel = new SolverKernel(graph);
+      kernel.setSizeHint(mapped, 10000);
+      kernel.setSizeHint(filtered, 10000);
+
+      const compiled = kernel.compile('speed');
+      expect(kernel.getGeneratedCode()).not.toContain('fused');
+      expect(compiled([1, 2, 3])).toEqual([
+        [3, 4],
+        [2, 3, 4],
+      ]);
+    });
   });
 
   describe('Generated code', () => {
@@ -230,6 +607,17 @@ describe('SolverKernel', () => {
       expect(result).toEqual([1, 1, 3, 4, 5]);
     });
 
+    it('should compile sort with a comparator', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      graph.output(graph.sort(input, (a: any, b: any) => a - b));
+
+      for (const mode of ['balanced', 'memory'] as const) {
+        const compiled = new SolverKernel(graph).compile(mode);
+        expect(compiled([10, 9, 100, 1])).toEqual([1, 9, 10, 100]);
+      }
+    });
+
     it('should compile distinct operation', () => {
       const graph = new Graph();
       const input = graph.input('data');
@@ -243,6 +631,30 @@ describe('SolverKernel', () => {
       expect(result).toEqual([1, 2, 3]);
     });
 
+    it('should dedupe integer lists in first-occurrence order', () => {
+      const graph = new Graph();
+      const input = graph.input('data', new ListType(new IntType()));
+      graph.output(graph.distinct(input));
+
+      const kernel = new SolverKernel(graph);
+      const compiled = kernel.compile();
+      expect(kernel.getGeneratedCode()).toContain('_mask');
+      expect(compiled([5, 3, 5, -1, 3, 0])).toEqual([5, 3, -1, 0]);
+      // Sparse range and non-integer data fall back to Set
+      expect(compiled([1, 1000000, 1])).toEqual([1, 1000000]);
+      expect(compiled([1.5, 1.5, 2])).toEqual([1.5, 2]);
+    });
+
+    it('should compile two distinct nodes in one graph', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const first = graph.distinct(input, (x: any) => x % 3);
+      graph.output(graph.distinct(first, (x: any) => x % 2));
+
+      const compiled = new SolverKernel(graph).compile('memory');
+      expect(compiled([1, 2, 3, 4])).toEqual([1, 2]);
+    });
+
     it('should compile flatten operation', () => {
       const graph = new Graph();
       const input = graph.input('data');
@@ -255,6 +667,15 @@ describe('SolverKernel', () => {
       const result = compiled([[1, 2], [3, 4], [5]]);
       expect(result).toEqual([1, 2, 3, 4, 5]);
     });
+
+    it('should flatten typed-array sublists and keep scalar items', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      graph.output(graph.flatten(input));
+
+      const compiled = new SolverKernel(graph).compile();
+      expect(compiled([new Int32Array([1, 2]), [3], 4])).toEqual([1, 2, 3, 4]);
+    });
   });
 
   describe('Multiple inputs', () => {
@@ -291,6 +712,125 @@ describe('SolverKernel', () => {
     });
   });
 
+  describe('Generated code scope', () => {
+    it('should keep node results local when compiled graphs nest', () => {
+      const inner = new Graph();
+      inner.output(inner.map(inner.input('data'), (x: any) => x * 100));
+      const innerFn = new SolverKernel(inner).compile('memory');
+
+      const outer = new Graph();
+      const outerInput = outer.input('data');
+      outer.output(outer.map(outerInput, (x: any) => innerFn([x])[0] + 1));
+      const outerFn = new SolverKernel(outer).compile('memory');
+
+      // Both graphs use the ids input_00000001 and map_00000002
+      expect(outerFn([1, 2])).toEqual([101, 201]);
+      expect((globalThis as any).map_00000002).toBeUndefined();
+    });
+
+    it('should accept inputs named like loop temporaries', () => {
+      const graph = new Graph();
+      const item = graph.input('_item');
+      const items = graph.input('_items');
+      const joined = graph.join(
+        graph.input('_left'),
+        graph.input('_right'),
+        (x: any) => x,
+        (x: any) => x
+      );
+      const total = graph.reduce(items, (a: any, b: any) => a + b);
+      graph.output(graph.filter(item, (x: any) => x > 1));
+      graph.output(total);
+      graph.output(joined);
+
+      for (const mode of ['speed', 'memory', 'balanced'] as const) {
+        const compiled = new SolverKernel(graph).compile(mode);
+        expect(compiled([1, 2, 3], [4, 5], [1, 2], [2])).toEqual([[2, 3], 9, [[2, 2]]]);
+      }
+    });
+  });
+
+  describe('Compile cache', () => {
+    it('should bind each kernel to its own callbacks when code is shared', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      graph.output(graph.map(input, (x: any) => x + 1));
+      const clone = graph.clone();
+      const cloneMap = clone.getAllNodes().find((n) => n.intentType === 'map')!;
+      cloneMap.params['transform'] = (x: any) => x * 10;
+
+      const original = new SolverKernel(graph).compile('balanced');
+      const cloned = new SolverKernel(clone).compile('balanced');
+
+      expect(original).not.toBe(cloned);
+      expect(original([1, 2])).toEqual([2, 3]);
+      expect(cloned([1, 2])).toEqual([10, 20]);
+    });
+
+    it('should reuse compiled function while graph is unchanged', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      graph.output(input);
+
+      const kernel = new SolverKernel(graph);
+      const first = kernel.compile('speed');
+
+      expect(kernel.compile('speed')).toBe(first);
+      expect(kernel.compile('memory')).not.toBe(first);
+    });
+
+    it('should recompile after the graph changes', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      graph.output(input);
+
+      const kernel = new SolverKernel(graph);
+      const first = kernel.compile();
+
+      const mapped = graph.map(input, (x: any) => x + 1);
+      graph.output(mapped);
+
+      const second = kernel.compile();
+      expect(second).not.toBe(first);
+      expect(second([1])).toEqual([[1], [2]]);
+    });
+  });
+
+  describe('Memoized nodes', () => {
+    it('should reuse the output while inputs are unchanged', () => {
+      let comparisons = 0;
+      const graph = new Graph();
+      const input = graph.input('data');
+      const sorted = graph.sort(input, (a: any, b: any) => {
+        comparisons++;
+        return a - b;
+      });
+      graph.output(graph.map(graph.memoize(sorted), (x: any) => x * 2));
+
+      const compiled = new SolverKernel(graph).compile('balanced');
+      const data = [3, 1, 2];
+      expect(compiled(data)).toEqual([2, 4, 6]);
+      const afterFirst = comparisons;
+
+      expect(compiled(data)).toEqual([2, 4, 6]);
+      expect(comparisons).toBe(afterFirst);
+
+      expect(compiled([5, 4])).toEqual([8, 10]);
+      expect(comparisons).toBeGreaterThan(afterFirst);
+    });
+
+    it('should change the graph fingerprint', () => {
+      const graph = new Graph();
+      const sorted = graph.sort(graph.input('data'));
+      graph.output(sorted);
+      const before = graph.fingerprint();
+
+      graph.memoize(sorted);
+      expect(graph.fingerprint()).not.toBe(before);
+      expect(graph.getNode(sorted)!.metadata.memoize).toBe(true);
+    });
+  });
+
   describe('Metadata', () => {
     it('should attach metadata to compiled function', () => {
       const graph = new Graph();
@@ -303,5 +843,18 @@ describe('SolverKernel', () => {
       expect(compiled._ioc_graph).toBe(graph);
       expect(compiled._ioc_optimize_for).toBeDefined();
     });
+
+    it('should expose only input parameters on the compiled function', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const filtered = graph.filter(input, (x: any) => x > 0);
+      graph.output(filtered);
+
+      const kernel = new SolverKernel(graph);
+      const compiled = kernel.compile();
+
+      expect(compiled.length).toBe(1);
+      expect(compiled([-1, 1])).toEqual([1]);
+    });
   });
 });
@@ -1,6 +1,9 @@
 import { describe, it, expect } from 'vitest';
-import { Graph } from '../core/graph';
+import { Graph, IntentType } from '../core/graph';
 import { GraphOptimizer } from '../core/optimizer';
+import { SolverKernel } from '../solvers/kernel';
+import { compilePredicateFunction } from '../dsl/compiler';
+import { Predicate } from '../dsl/safe-types';
 
 describe('GraphOptimizer', () => {
   describe('Dead code elimination', () => {
@@ -66,6 +69,78 @@ describe('GraphOptimizer', () => {
 
       expect(graph.nodes.size).toBe(initialCount);
     });
+
+    it('should group constants by exact value', () => {
+      const graph = new Graph();
+      const ids = [
+        graph.constant({ b: [1, 'x'], a: null }),
+        graph.constant({ a: null, b: [1, 'x'] }),
+        graph.constant({ a: null, b: ['1', 'x'] }),
+        graph.constant(-0),
+        graph.constant(0),
+        graph.constant(NaN),
+        graph.constant(NaN),
+      ];
+      for (const id of ids) graph.output(id);
+
+      new GraphOptimizer(graph).optimize(['common_subexpression_elimination']);
+
+      expect(graph.outputs).toEqual([ids[0], ids[2], ids[3], ids[5], ids[6]]);
+    });
+
+    it('should not build signatures for nodes with no possible duplicate', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      let stringified = 0;
+      const double = (x: any) => x * 2;
+      double.toString = () => {
+        stringified++;
+        return '(x) => x * 2';
+      };
+      graph.output(graph.map(input, double));
+      graph.output(graph.filter(input, (x: any) => x > 0));
+
+      new GraphOptimizer(graph).optimize(['common_subexpression_elimination']);
+
+      expect(stringified).toBe(0);
+      expect(graph.nodes.size).toBe(3);
+    });
+
+    it('should re-key nodes whose inputs were redirected in an earlier round', () => {
+      const graph = new Graph();
+      const double = (x: any) => x * 2;
+      const first = graph.map(graph.constant([1, 2]), double);
+      const second = graph.map(graph.constant([1, 2]), double);
+      graph.output(first);
+      graph.output(second);
+
+      // The maps only become duplicates once their constants are merged
+      const optimizer = new GraphOptimizer(graph);
+      optimizer.optimize(['common_subexpression_elimination']);
+
+      expect(graph.outputs).toEqual([first]);
+      expect(graph.nodes.size).toBe(2);
+    });
+
+    it('should drop merged duplicates without a dead code sweep', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const unused = graph.map(input, (x: any) => x + 1);
+      const kept = graph.filter(input, (x: any) => x > 0);
+      const duplicate = graph.filter(input, (x: any) => x > 0);
+      graph.output(kept);
+      graph.output(duplicate);
+
+      const optimizer = new GraphOptimizer(graph);
+      optimizer.optimize(['common_subexpression_elimination']);
+
+      expect(graph.nodes.has(duplicate)).toBe(false);
+      // Nodes that were already dead are left to dead_code_elimination
+      expect(graph.nodes.has(unused)).toBe(true);
+      expect(optimizer.getAppliedOptimizations()).toEqual([
+        { pass: 'common_subexpression_elimination', count: 1 },
+      ]);
+    });
   });
 
   describe('Filter fusion', () => {
@@ -83,6 +158,112 @@ describe('GraphOptimizer', () => {
 
       expect(graph.nodes.size).toBeLessThan(initialCount);
     });
+
+    it('should collapse a whole chain into one flat filter', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const f1 = graph.filter(input, (x: any) => x > 0);
+      const f2 = graph.filter(f1, (x: any) => x < 100);
+      const f3 = graph.filter(f2, (x: any) => x % 2 === 0);
+      graph.output(f3);
+
+      new GraphOptimizer(graph).optimize(['filter_fusion']);
+
+      expect(graph.nodes.size).toBe(2);
+      const fused = graph.getNode(f3)!;
+      expect(fused.inputs).toEqual([input]);
+      const predicate = fused.params['predicate'] as (x: any) => boolean;
+      expect([-2, 3, 4, 100, 98].filter(predicate)).toEqual([4, 98]);
+      expect(predicate.toString()).toContain('!!(p0(x) && p1(x) && p2(x))');
+      expect(predicate(-2)).toBe(false);
+    });
+
+    it('should collapse a long chain in one sweep', () => {
+      const graph = new Graph();
+      let node = graph.input('data');
+      for (let i = 0; i < 50; i++) {
+        node = graph.filter(node, (x: any) => x !== i);
+      }
+      graph.output(node);
+
+      const optimizer = new GraphOptimizer(graph);
+      optimizer.optimize(['filter_fusion']);
+
+      expect(graph.nodes.size).toBe(2);
+      expect(optimizer.getAppliedOptimizations()).toEqual([{ pass: 'filter_fusion', count: 49 }]);
+      const predicate = graph.getNode(node)!.params['predicate'] as (x: any) => boolean;
+      expect([3, 49, 50, 51].filter(predicate)).toEqual([50, 51]);
+    });
+
+    it('should remove only the filters it absorbed', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const f1 = graph.filter(input, (x: any) => x > 0);
+      const f2 = graph.filter(f1, (x: any) => x < 100);
+      const unused = graph.map(input, (x: any) => x);
+      graph.output(f2);
+
+      new GraphOptimizer(graph).optimize(['filter_fusion']);
+
+      expect(graph.getNode(f1)).toBeUndefined();
+      expect(graph.getNode(unused)).toBeDefined();
+    });
+
+    it('should stop a chain at a filter that has other consumers', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const f1 = graph.filter(input, (x: any) => x > 0);
+      const f2 = graph.filter(f1, (x: any) => x < 100);
+      const f3 = graph.filter(f2, (x: any) => x % 2 === 0);
+      graph.output(f3);
+      graph.output(f2);
+
+      new GraphOptimizer(graph).optimize(['filter_fusion']);
+
+      expect(graph.getNode(f1)).toBeUndefined();
+      expect(graph.getNode(f2)!.inputs).toEqual([input]);
+      // f3 reads the shared result instead of re-running f1 and f2
+      expect(graph.getNode(f3)!.inputs).toEqual([f2]);
+      expect(graph.getNode(f3)!.params['predicates']).toBeUndefined();
+    });
+
+    it('should not fold a filter read by two filters into either', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const shared = graph.filter(input, (x: any) => x > 0);
+      const even = graph.filter(shared, (x: any) => x % 2 === 0);
+      const odd = graph.filter(shared, (x: any) => x % 2 === 1);
+      graph.output(even);
+      graph.output(odd);
+
+      new GraphOptimizer(graph).optimize(['filter_fusion']);
+
+      expect(graph.getNode(even)!.inputs).toEqual([shared]);
+      expect(graph.getNode(odd)!.inputs).toEqual([shared]);
+      expect(graph.nodes.size).toBe(4);
+    });
+
+    it('should leave both sides of a diamond reading the shared filter', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const positive = graph.filter(input, (x: any) => x.id > 0);
+      const even = graph.filter(positive, (x: any) => x.id % 2 === 0);
+      const joined = graph.join(
+        positive,
+        even,
+        (x: any) => x.id,
+        (x: any) => x.id
+      );
+      graph.output(joined);
+      const data = [-2, 1, 2, 4].map((id) => ({ id }));
+      const expected = new SolverKernel(graph).compile('balanced')(data);
+
+      new GraphOptimizer(graph).optimize(['filter_fusion', 'filter_map_fusion']);
+
+      expect(graph.getNode(even)!.inputs).toEqual([positive]);
+      expect(graph.getNode(joined)!.inputs).toEqual([positive, even]);
+      expect(new SolverKernel(graph).compile('balanced')(data)).toEqual(expected);
+    });
   });
 
   describe('Map fusion', () => {
@@ -100,6 +281,57 @@ describe('GraphOptimizer', () => {
 
       expect(graph.nodes.size).toBeLessThan(initialCount);
     });
+
+    it('should apply a whole chain in order as one map', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const m1 = graph.map(input, (x: any) => x * 2);
+      const m2 = graph.map(m1, (x: any) => x + 1);
+      const m3 = graph.map(m2, (x: any) => `#${x}`);
+      graph.output(m3);
+
+      new GraphOptimizer(graph).optimize(['map_fusion']);
+
+      expect(graph.nodes.size).toBe(2);
+      const fused = graph.getNode(m3)!;
+      expect(fused.inputs).toEqual([input]);
+      const transform = fused.params['transform'] as (x: any) => any;
+      expect([1, 5].map(transform)).toEqual(['#3', '#11']);
+      expect(transform.toString()).toContain('p2(p1(p0(x)))');
+    });
+  });
+
+  describe('Filter/map fusion', () => {
+    it('should merge a map reading a single-use filter', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const filtered = graph.filter(input, (x: any) => x > 1);
+      const mapped = graph.map(filtered, (x: any) => x * 10);
+      graph.output(mapped);
+
+      new GraphOptimizer(graph).optimize(['filter_map_fusion']);
+
+      expect(graph.getNode(filtered)).toBeUndefined();
+      const fused = graph.getNode(mapped)!;
+      expect(fused.intentType).toBe(IntentType.FILTER_MAP);
+      expect(fused.inputs).toEqual([input]);
+      for (const mode of ['speed', 'memory', 'balanced'] as const) {
+        expect(new SolverKernel(graph).compile(mode)([1, 2, 3])).toEqual([20, 30]);
+      }
+    });
+
+    it('should leave a filter with other consumers alone', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const filtered = graph.filter(input, (x: any) => x > 1);
+      const mapped = graph.map(filtered, (x: any) => x * 10);
+      graph.output(mapped);
+      graph.output(filtered);
+
+      new GraphOptimizer(graph).optimize(['filter_map_fusion']);
+
+      expect(graph.getNode(mapped)!.intentType).toBe(IntentType.MAP);
+    });
   });
 
   describe('Filter before map', () => {
@@ -118,6 +350,23 @@ describe('GraphOptimizer', () => {
       expect(graph.nodes.size).toBeGreaterThan(0);
     });
 
+    it('should reorder past a predicate that ignores its input without sampling', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      let calls = 0;
+      const mapped = graph.map(input, (x: any) => {
+        calls++;
+        return x * 2;
+      });
+      const filtered = graph.filter(mapped, compilePredicateFunction(Predicate.always(true)));
+      graph.output(filtered);
+
+      new GraphOptimizer(graph).optimize(['filter_before_map']);
+
+      expect(graph.getNode(filtered)!.inputs).toEqual([input]);
+      expect(calls).toBe(0);
+    });
+
     it('should not reorder when map has multiple consumers', () => {
       const graph = new Graph();
       const input = graph.input('data');
@@ -135,6 +384,44 @@ describe('GraphOptimizer', () => {
       // Should not change since map has multiple consumers
       expect(graph.nodes.size).toBe(initialCount);
     });
+
+    it('should rewire consumers of the filter to the moved map', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const mapped = graph.map(input, (x: any) => x);
+      const filtered = graph.filter(mapped, (x: any) => x > 10);
+      const reduced = graph.reduce(filtered, (a: any, b: any) => a + b, 0);
+      graph.output(reduced);
+
+      new GraphOptimizer(graph).optimize(['filter_before_map']);
+
+      expect(graph.getNode(filtered)!.inputs).toEqual([input]);
+      expect(graph.getNode(mapped)!.inputs).toEqual([filtered]);
+      expect(graph.getNode(reduced)!.inputs).toEqual([mapped]);
+      expect(graph.getConsumers(mapped)).toEqual([reduced]);
+    });
+  });
+
+  describe('Forked graphs', () => {
+    it('should leave the original graph untouched', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const first = graph.filter(input, (x: any) => x > 0);
+      const second = graph.filter(first, (x: any) => x < 10);
+      graph.output(second);
+      const before = graph.fingerprint();
+      const predicate = graph.getNode(second)!.params['predicate'];
+
+      const forked = graph.fork();
+      new GraphOptimizer(forked).optimize();
+
+      expect(forked.nodes.size).toBe(2);
+      expect(forked.getNode(second)!.inputs).toEqual([input]);
+      expect(graph.nodes.size).toBe(3);
+      expect(graph.getNode(second)!.inputs).toEqual([first]);
+      expect(graph.getNode(second)!.params['predicate']).toBe(predicate);
+      expect(graph.fingerprint()).toBe(before);
+    });
   });
 
   describe('Multiple optimization passes', () => {
@@ -153,6 +440,41 @@ describe('GraphOptimizer', () => {
       expect(graph.nodes.size).toBeGreaterThan(0);
     });
 
+    it('should rewrite a mixed chain to one node in a single walk', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const doubled = graph.map(input, (x: any) => x * 2);
+      const positive = graph.filter(doubled, (x: any) => x > 0);
+      const labelled = graph.map(positive, (x: any) => `#${x}`);
+      graph.output(labelled);
+
+      const optimizer = new GraphOptimizer(graph);
+      optimizer.optimize();
+
+      expect(graph.nodes.size).toBe(2);
+      const fused = graph.getNode(labelled)!;
+      expect(fused.intentType).toBe(IntentType.FILTER_MAP);
+      expect(fused.inputs).toEqual([input]);
+      expect(new SolverKernel(graph).compile('balanced')([-1, 2, 0, 6])).toEqual(['#4', '#12']);
+      expect(optimizer.getOptimizationReport()).toContain('filter_before_map');
+    });
+
+    it('should rerun an explicit pass list while passes expose new work', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const doubled = graph.map(input, (x: any) => x * 2);
+      const positive = graph.filter(doubled, (x: any) => x > 0);
+      const labelled = graph.map(positive, (x: any) => `#${x}`);
+      graph.output(labelled);
+
+      // The reorder only creates the map -> map pair after map_fusion ran
+      new GraphOptimizer(graph).optimize(['map_fusion', 'filter_before_map']);
+
+      expect(graph.nodes.size).toBe(3);
+      expect(graph.getNode(labelled)!.inputs).toEqual([positive]);
+      expect(new SolverKernel(graph).compile('balanced')([-1, 2, 0, 6])).toEqual(['#4', '#12']);
+    });
+
     it('should throw error for unknown pass', () => {
       const graph = new Graph();
       const input = graph.input('data');
@@ -179,6 +501,23 @@ describe('GraphOptimizer', () => {
       expect(report).toContain('filter_fusion');
     });
 
+    it('should expose per-pass counts alongside the formatted report', () => {
+      const graph = new Graph();
+      const input = graph.input('data');
+      const f1 = graph.filter(input, (x: any) => x > 0);
+      const f2 = graph.filter(f1, (x: any) => x < 100);
+      const f3 = graph.filter(f2, (x: any) => x % 2 === 0);
+      graph.output(f3);
+
+      const optimizer = new GraphOptimizer(graph);
+      optimizer.optimize(['filter_fusion']);
+
+      expect(optimizer.getAppliedOptimizations()).toEqual([{ pass: 'filter_fusion', count: 2 }]);
+      expect(optimizer.getOptimizationReport()).toBe(
+        'Optimization Report:\n  - filter_fusion: fused 2 filter pairs'
+      );
+    });
+
     it('should report no optimizations when none applied', () => {
       const graph = new Graph();
       const input = graph.input('data');
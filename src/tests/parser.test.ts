@@ -83,6 +83,22 @@ output doubled
     expect(result).toEqual([2, 4, 6, 8, 10]);
   });
 
+  it('should assign sequential node ids per conversion', () => {
+    const source = `
+input numbers: number[]
+doubled = map numbers with x * 2
+output doubled
+    `.trim();
+    const ast = new Parser(new Lexer(source).tokenize()).parse();
+
+    const converter = new ASTToGraphConverter();
+    const first = converter.convert(ast).nodes.map((node) => node.id);
+    const second = converter.convert(ast).nodes.map((node) => node.id);
+
+    expect(first).toEqual(['input_00000001', 'map_00000002']);
+    expect(second).toEqual(first);
+  });
+
   it('should handle full pipeline with filter, map, reduce', async () => {
     const source = `
 input numbers: number[]
@@ -0,0 +1,35 @@
+import { describe, it, expect } from 'vitest';
+import { previewJSON } from '../core/preview';
+
+describe('previewJSON', () => {
+  it('should match JSON.stringify for values that fit', () => {
+    const values = [
+      [1, 'two', null, undefined, () => 0],
+      { a: 1, b: undefined, c: { d: [true, NaN] } },
+      new Date(0),
+      'quote " and \n newline',
+    ];
+    for (const value of values) {
+      expect(previewJSON(value, 1000)).toBe(JSON.stringify(value));
+    }
+  });
+
+  it('should describe top-level undefined', () => {
+    expect(previewJSON(undefined)).toBe('undefined');
+  });
+
+  it('should truncate long values with an ellipsis', () => {
+    const big = Array.from({ length: 100000 }, (_, i) => i);
+    const preview = previewJSON(big, 20);
+
+    expect(preview).toBe(JSON.stringify(big).substring(0, 17) + '...');
+    expect(previewJSON('x'.repeat(1000), 10)).toBe('"xxxxxx...');
+  });
+
+  it('should cut off cyclic values instead of throwing', () => {
+    const cyclic: any = { name: 'loop' };
+    cyclic.self = cyclic;
+
+    expect(previewJSON(cyclic, 50).endsWith('...')).toBe(true);
+  });
+});
@@ -98,6 +98,26 @@ describe('PerformanceProfiler', () => {
     expect(profiler).toBeDefined();
   });
 
+  it('should merge profiles from other files', () => {
+    const otherFile = '.test_profile_other.json';
+    const other = new PerformanceProfiler(otherFile);
+    other.recordExecution('filter', 'NaiveStrategy', 100, 30);
+    other.recordExecution('map', 'NaiveStrategy', 100, 5);
+    other.saveProfiles();
+
+    try {
+      const profiler = new PerformanceProfiler(testProfileFile);
+      profiler.recordExecution('filter', 'NaiveStrategy', 100, 10);
+      profiler.mergeFromPaths([otherFile, '.missing_profile.json']);
+
+      expect(profiler.getCostEstimate('filter', 'NaiveStrategy', 100)).toBeCloseTo(20);
+      expect(profiler.getCostEstimate('map', 'NaiveStrategy', 100)).toBeCloseTo(5);
+      expect(profiler.getReport()).toContain('samples=2');
+    } finally {
+      fs.unlinkSync(otherFile);
+    }
+  });
+
   describe('Default cost estimates', () => {
     it('should have cost estimates for common operations', () => {
       const profiler = new PerformanceProfiler(testProfileFile);
@@ -8,6 +8,20 @@ describe('Provenance', () => {
     expect(prov.transformations).toEqual([]);
   });
 
+  it('should keep lists and user metadata written through accessors', () => {
+    const prov = new Provenance('test-node');
+    expect(prov.hasParents()).toBe(false);
+    expect(prov.isOptimized()).toBe(false);
+    expect(prov.getTransformationChain()).toEqual([]);
+
+    prov.parentNodes.push('parent');
+    prov.userMetadata['owner'] = 'etl';
+
+    expect(prov.hasParents()).toBe(true);
+    expect(prov.parentNodes).toEqual(['parent']);
+    expect(prov.userMetadata).toEqual({ owner: 'etl' });
+  });
+
   it('should add transformations', () => {
     const prov = new Provenance('test-node');
     prov.addTransformation({
@@ -85,6 +99,23 @@ describe('ProvenanceTracker', () => {
     // Source location may or may not be captured depending on stack structure
   });
 
+  it('should resolve a captured stack to the first non-framework frame when read', () => {
+    const tracker = new ProvenanceTracker();
+    // trackNodeCreation's direct caller is skipped, as a graph builder would be
+    function addNode() {
+      return tracker.trackNodeCreation('test-node', true);
+    }
+    function buildPipeline() {
+      return addNode();
+    }
+
+    const prov = buildPipeline();
+
+    expect(prov.sourceLocation?.function).toContain('buildPipeline');
+    expect(prov.sourceLocation?.file).toContain('provenance.test.ts');
+    expect(prov.getOriginalSource()).toContain('buildPipeline');
+  });
+
   it('should track optimization transformations', () => {
     const tracker = new ProvenanceTracker();
 
@@ -137,6 +168,31 @@ describe('ProvenanceTracker', () => {
     expect(chain.length).toBeGreaterThan(0);
   });
 
+  it('should trace depth-first through parents in order', () => {
+    const tracker = new ProvenanceTracker();
+    tracker.trackNodeCreation('d');
+    tracker.trackOptimization('b', 'map', ['d'], 'Mapped');
+    tracker.trackOptimization('c', 'filter', ['d'], 'Filtered');
+    tracker.trackOptimization('a', 'join', ['b', 'c'], 'Joined');
+
+    expect(tracker.traceBackToSource('a').map((prov) => prov.nodeId)).toEqual([
+      'a',
+      'b',
+      'd',
+      'c',
+    ]);
+  });
+
+  it('should trace deep chains without exhausting the stack', () => {
+    const tracker = new ProvenanceTracker();
+    tracker.trackNodeCreation('n0');
+    for (let i = 1; i <= 50_000; i++) {
+      tracker.trackOptimization(`n${i}`, 'map', [`n${i - 1}`], 'Mapped');
+    }
+
+    expect(tracker.traceBackToSource('n50000').length).toBe(50_001);
+  });
+
   it('should handle cycles in provenance chain', () => {
     const tracker = new ProvenanceTracker();
 
@@ -1,6 +1,8 @@
 import { describe, it, expect } from 'vitest';
 import { NaiveStrategy, OptimizedStrategy, VectorizedStrategy } from '../solvers/strategies';
 import { IntentType } from '../core/graph';
+import { compilePredicateFunction } from '../dsl/compiler';
+import { Predicate } from '../dsl/safe-types';
 
 describe('NaiveStrategy', () => {
   const strategy = new NaiveStrategy();
@@ -114,10 +116,11 @@ describe('NaiveStrategy', () => {
         metadata: {},
       };
 
-      const context = { variables: {}, nodeResults: {} };
+      const context = { variables: {} as Record<string, any>, nodeResults: {} };
       const code = strategy.generateCode(node, context);
       expect(code).toContain('for');
-      expect(code).toContain('0');
+      expect(code).toContain('test = init_test');
+      expect(context.variables['init_test']).toBe(0);
     });
 
     it('should generate code for reduce without initial value', () => {
@@ -369,6 +372,21 @@ describe('OptimizedStrategy', () => {
       expect(code).toContain('.flat(');
     });
 
+    it('should generate an indexed loop for single-level flatten', () => {
+      const node = {
+        id: 'test',
+        intentType: IntentType.FLATTEN,
+        inputs: ['input1'],
+        params: { depth: 1 },
+        outputType: {} as any,
+        metadata: {},
+      };
+
+      const code = strategy.generateCode(node, { variables: {}, nodeResults: {} });
+      expect(code).not.toContain('.flat(');
+      expect(code).toContain('_sub.length');
+    });
+
     it('should generate optimized code for distinct', () => {
       const node = {
         id: 'test',
@@ -423,15 +441,82 @@ describe('OptimizedStrategy', () => {
 describe('VectorizedStrategy', () => {
   const strategy = new VectorizedStrategy();
 
-  it('should not handle any intents yet', () => {
-    expect(strategy.canHandle(IntentType.FILTER)).toBe(false);
-    expect(strategy.canHandle(IntentType.MAP)).toBe(false);
+  it('should handle per-element intents only', () => {
+    expect(strategy.canHandle(IntentType.FILTER)).toBe(true);
+    expect(strategy.canHandle(IntentType.MAP)).toBe(true);
+    expect(strategy.canHandle(IntentType.REDUCE)).toBe(true);
+    expect(strategy.canHandle(IntentType.SORT)).toBe(false);
   });
 
-  it('should throw error on generate code', () => {
+  it('should generate indexed loop for filter', () => {
     const node = {
       id: 'test',
       intentType: IntentType.FILTER,
+      inputs: ['input1'],
+      params: { predicate: (x: any) => x > 0 },
+      outputType: {} as any,
+      metadata: {},
+    };
+
+    const context = { variables: {}, nodeResults: {} };
+    const code = strategy.generateCode(node, context);
+    expect(code).toContain('_i < _n');
+    expect(context.variables).toHaveProperty('pred_test');
+  });
+
+  it('should generate pre-sized output for map', () => {
+    const node = {
+      id: 'test',
+      intentType: IntentType.MAP,
+      inputs: ['input1'],
+      params: { transform: (x: any) => x * 2 },
+      outputType: {} as any,
+      metadata: {},
+    };
+
+    const code = strategy.generateCode(node, { variables: {}, nodeResults: {} });
+    expect(code).toContain('new Array(input1.length)');
+  });
+
+  it('should call fused components directly', () => {
+    const double = (x: any) => x * 2;
+    const inc = (x: any) => x + 1;
+    const node = {
+      id: 'test',
+      intentType: IntentType.MAP,
+      inputs: ['input1'],
+      params: { transform: (x: any) => inc(double(x)), transforms: [double, inc] },
+      outputType: {} as any,
+      metadata: {},
+    };
+
+    const context = { variables: {} as Record<string, any>, nodeResults: {} };
+    const code = strategy.generateCode(node, context);
+    expect(code).toContain('_v = transform_test_0(_v)\n  _v = transform_test_1(_v)');
+    expect(context.variables['transform_test_0']).toBe(double);
+    expect(context.variables).not.toHaveProperty('transform_test');
+  });
+
+  it('should splice compiled DSL predicates into the loop', () => {
+    const node = {
+      id: 'test',
+      intentType: IntentType.FILTER,
+      inputs: ['input1'],
+      params: { predicate: compilePredicateFunction(Predicate.gt(5)) },
+      outputType: {} as any,
+      metadata: {},
+    };
+
+    const context = { variables: {} as Record<string, any>, nodeResults: {} };
+    const code = strategy.generateCode(node, context);
+    expect(code).toContain('if ((_v > 5))');
+    expect(context.variables).toEqual({});
+  });
+
+  it('should throw error on unsupported intent', () => {
+    const node = {
+      id: 'test',
+      intentType: IntentType.SORT,
       inputs: [],
       params: {},
       outputType: {} as any,
@@ -706,6 +791,7 @@ describe('OptimizedStrategy - Additional Coverage', () => {
 
     const context = { variables: {}, nodeResults: {} };
     const code = strategy.generateCode(node, context);
-    expect(code).toContain('.reduce(');
+    expect(code).toContain('_bucket');
+    expect(code).not.toContain('.reduce(');
   });
 });
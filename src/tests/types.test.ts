@@ -3,7 +3,15 @@
  */
 
 import { describe, it, expect } from 'vitest';
-import { IntType, FloatType, BoolType, ListType, AnyType, inferType } from '../core/types.js';
+import {
+  IntType,
+  FloatType,
+  BoolType,
+  ListType,
+  AnyType,
+  ANY_TYPE,
+  inferType,
+} from '../core/types.js';
 
 describe('IntType', () => {
   it('should match integers', () => {
@@ -27,6 +35,14 @@ describe('IntType', () => {
     expect(intType.matches(101)).toBe(false);
   });
 
+  it('should leave a missing bound open', () => {
+    expect(new IntType(0).matches(Number.MAX_SAFE_INTEGER)).toBe(true);
+    expect(new IntType(undefined, 0).matches(Number.MIN_SAFE_INTEGER)).toBe(true);
+    expect(new IntType(undefined, 0).matches(1)).toBe(false);
+    expect(new IntType().matches(NaN)).toBe(false);
+    expect(new IntType().matches(Infinity)).toBe(false);
+  });
+
   it('should generate correct LLVM type', () => {
     const int32 = new IntType();
     expect(int32.toLLVMType()).toBe('i32');
@@ -99,6 +115,67 @@ describe('ListType', () => {
     expect(listType.matches([1, 2, 3, 4, 5])).toBe(true);
     expect(listType.matches([1, 2, 3, 4, 5, 6])).toBe(false);
   });
+
+  it('should match typed arrays', () => {
+    const intListType = new ListType(new IntType(), 1, 3);
+    expect(intListType.matches(new Int32Array([1, 2, 3]))).toBe(true);
+    expect(intListType.matches(new Int32Array(4))).toBe(false);
+    expect(new ListType(new IntType()).matches(new Float64Array([1.5]))).toBe(false);
+    expect(new ListType().matches(new DataView(new ArrayBuffer(4)))).toBe(false);
+  });
+
+  it('should check elements against bounds in a batch', () => {
+    const bounded = new ListType(new IntType(0, 10));
+    expect(bounded.matches([0, 5, 10])).toBe(true);
+    expect(bounded.matches([0, 11])).toBe(false);
+    expect(bounded.matches(new Int32Array([-1]))).toBe(false);
+    expect(new ListType(new FloatType(0)).matches(new Float64Array([0.5, -0.5]))).toBe(false);
+    expect(new ListType(new FloatType()).matches(new BigInt64Array(1))).toBe(false);
+    expect(new ListType(new BoolType()).matches([true, 1])).toBe(false);
+  });
+
+  it('should bound-check numeric typed arrays', () => {
+    const values = Int32Array.from({ length: 1000 }, (_, i) => i);
+    expect(new ListType(new IntType(0, 999)).matches(values)).toBe(true);
+    expect(new ListType(new IntType(undefined, 998)).matches(values)).toBe(false);
+    expect(new ListType(new FloatType(-1, 1)).matches(new Float32Array([-1, 0.5, 1]))).toBe(true);
+    expect(new ListType(new FloatType(-1, 1)).matches(new Float32Array([1.5]))).toBe(false);
+  });
+
+  it('should fall back to per-element matches for types without a batch check', () => {
+    const even = {
+      matches: (value: unknown) => typeof value === 'number' && value % 2 === 0,
+      toString: () => 'Even',
+      toLLVMType: () => 'i32',
+    };
+    expect(new ListType(even).matches([2, 4])).toBe(true);
+    expect(new ListType(even).matches([2, 3])).toBe(false);
+  });
+
+  it('should describe element and length constraints', () => {
+    const listType = new ListType(new FloatType(0, 1, 'single'), 1, 4);
+    expect(listType.toString()).toBe('List[Float32[>=0, <=1]](len>=1, len<=4)');
+    expect(listType.toString()).toBe(listType.toString());
+    expect(new ListType(new IntType(undefined, 9)).toString()).toBe('List[Int32[<=9]]');
+    expect(new ListType(new IntType(0, undefined, 64), 2).toString()).toBe(
+      'List[Int64[>=0]](len>=2)'
+    );
+  });
+
+  it('should stop checking elements at the first mismatch', () => {
+    let checked = 0;
+    const positive = {
+      matches: (value: unknown) => {
+        checked++;
+        return typeof value === 'number' && value > 0;
+      },
+      toString: () => 'Positive',
+      toLLVMType: () => 'i32',
+    };
+    expect(new ListType(positive).matches([1, -1, 2, 3])).toBe(false);
+    expect(checked).toBe(2);
+    expect(new ListType(new ListType(new IntType())).matches([[1], [2.5]])).toBe(false);
+  });
 });
 
 describe('inferType', () => {
@@ -122,8 +199,39 @@ describe('inferType', () => {
     expect(type).toBeInstanceOf(ListType);
   });
 
+  it('should infer element types of typed arrays', () => {
+    const intList = inferType(new Int32Array([1, 2, 3]));
+    expect(intList).toBeInstanceOf(ListType);
+    expect((intList as ListType).elementType.toString()).toBe('Int32');
+
+    const floatList = inferType(new Float32Array([1.5]));
+    expect((floatList as ListType).elementType.toString()).toBe('Float32');
+  });
+
   it('should default to Any for unknown types', () => {
     const type = inferType({ foo: 'bar' });
     expect(type).toBeInstanceOf(AnyType);
   });
+
+  it('should share the AnyType instance for untyped values', () => {
+    expect(inferType({ foo: 'bar' })).toBe(ANY_TYPE);
+    expect((inferType([]) as ListType).elementType).toBe(ANY_TYPE);
+    expect(new ListType().elementType).toBe(ANY_TYPE);
+  });
+
+  it('should return the same instance for equal inferences', () => {
+    expect(inferType(1)).toBe(inferType(2));
+    expect(inferType(1.5)).toBe(inferType(2.5));
+    expect(inferType(true)).toBe(inferType(false));
+    expect(inferType([1, 2])).toBe(inferType([3]));
+    expect(inferType([[1]])).toBe(inferType([[2, 3]]));
+    expect(inferType(new Float64Array(1))).toBe(inferType([1.5]));
+    expect(inferType([1])).not.toBe(inferType([1.5]));
+  });
+
+  it('should fall back to Any only when element classes differ', () => {
+    expect((inferType([1, 1.5]) as ListType).elementType).toBe(ANY_TYPE);
+    expect((inferType([1, true]) as ListType).elementType).toBe(ANY_TYPE);
+    expect((inferType([[1], [true]]) as ListType).elementType).toBe(inferType([1]));
+  });
 });
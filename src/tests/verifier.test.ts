@@ -3,7 +3,12 @@
  */
 
 import { describe, it, expect } from 'vitest';
-import { TerminationVerifier, DEFAULT_BUDGETS, estimateBudget } from '../core/verifier';
+import {
+  TerminationVerifier,
+  BudgetEnforcer,
+  DEFAULT_BUDGETS,
+  estimateBudget,
+} from '../core/verifier';
 import { ComplexityClass } from '../dsl/safe-types';
 
 describe('TerminationVerifier', () => {
@@ -974,3 +979,13 @@ describe('TerminationVerifier', () => {
     });
   });
 });
+
+describe('BudgetEnforcer', () => {
+  it('should sanitize the node id in wrapped code', () => {
+    const wrapped = BudgetEnforcer.wrapCode('return 1;', 'node-1', { maxIterations: 10 });
+
+    expect(wrapped).toContain('const _budget_node_1 = {');
+    expect(wrapped).toContain('maxIterations: 10,');
+    expect(wrapped).toContain('return 1;');
+  });
+});